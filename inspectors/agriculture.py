@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 
@@ -191,7 +190,7 @@ def report_from(result, page_url, year_range, report_type, agency_slug="agricult
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 from utils import utils, inspector
-from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
 
@@ -18,13 +17,12 @@ def run(options):
     max_pages = int(max_pages)
 
   for year in year_range:
-    page = 1
-    done = False
-    while not done:
+    paginator = inspector.Paginator(1, max_pages)
+    for page in paginator:
       url = url_for(options, page, year)
       body = utils.download(url)
 
-      doc = BeautifulSoup(body)
+      doc = utils.soup(body)
 
       next_page = page + 1
       found_next_page = False
@@ -34,18 +32,20 @@ def run(options):
           found_next_page = True
           break
       if not found_next_page:
-        done = True
-      if max_pages and (next_page > max_pages):
-        done = True
+        paginator.stop()
 
       results = doc.select("table.views-table > tbody > tr")
       for result in results:
         report = report_from(result)
+
+        # with --incremental, skip reports saved by an earlier run
+        if paginator.already_have(report_id=report['report_id'], year=inspector.year_from(report)):
+          continue
+
         inspector.save_report(report)
 
-      page = next_page
-      if not done:
-        logging.info('Moving to next page (%d)' % page)
+      if not paginator.stopped:
+        logging.info('Moving to next page (%d)' % next_page)
 
 def url_for(options, page = 1, year=None):
   if year:
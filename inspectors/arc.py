@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.arc.gov/oig
@@ -32,7 +31,7 @@ def run(options):
 
   # Pull the audit reports
   for report_type, url in REPORT_TYPES.items():
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.fetch_soup(url)
     results = doc.select("table p > a")
     for result in results:
       report = report_from(result, url, report_type, year_range)
@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.archives.gov/oig/
@@ -30,7 +29,7 @@ def run(options):
     if year < 2006:  # The oldest year for audit reports
       continue
     url = AUDIT_REPORTS_URL.format(year=year)
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.fetch_soup(url)
     results = doc.select("div#content li")
     for result in results:
       report = audit_report_from(result, url, year, year_range)
@@ -38,7 +37,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results = doc.select("div#content li")
   for result in results:
     report = semiannual_report_from(result, year_range)
@@ -46,7 +45,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the Peer Review
-  doc = BeautifulSoup(utils.download(PEER_REVIEWS_URL))
+  doc = utils.fetch_soup(PEER_REVIEWS_URL)
   result = doc.find("div", id='content').find("a", text=True)
   report = peer_review_from(result, year_range)
   inspector.save_report(report)
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.cncsoig.gov
@@ -42,14 +41,14 @@ def run(options):
   # Pull the reports
   for (reports_page, report_type) in REPORTS_URLS:
 
-    page = start
     last_page = options.get("end") # reset for each area
-    while True:
+    paginator = inspector.Paginator(start, int(last_page) if last_page else None)
+    for page in paginator:
       url = url_for(reports_page, page)
-      doc = BeautifulSoup(utils.download(url))
+      doc = utils.fetch_soup(url)
 
-      if last_page is None:
-        last_page = last_page_from(doc)
+      if paginator.last is None:
+        paginator.last = last_page_from(doc)
 
       if report_type == "case":
         results = doc.select("div#main div.grayBox2")
@@ -58,7 +57,7 @@ def run(options):
 
       if results:
         for result in results:
-          report = report_from(result, reports_page, report_type, year_range)
+          report = report_from(result, reports_page, report_type, year_range, paginator)
           if report:
             inspector.save_report(report)
       elif report_type != "case":
@@ -67,11 +66,6 @@ def run(options):
       else:
         pass
 
-      if int(page) >= int(last_page):
-        break
-      else:
-        page += 1
-
   # one hardcoded peer review, just always do it
   inspector.save_report(do_peer_review())
 
@@ -86,7 +80,7 @@ def last_page_from(doc):
     last = last[0]
     return int(last['href'].split("=")[-1])
 
-def report_from(result, reports_page, report_type, year_range):
+def report_from(result, reports_page, report_type, year_range, paginator):
   unreleased = False
   summary = None
   landing_url = None
@@ -98,6 +92,10 @@ def report_from(result, reports_page, report_type, year_range):
     landing_url = urljoin(reports_page, landing_a['href'])
     title = landing_a.text.strip()
 
+    # with --incremental, skip reports saved by an earlier run
+    if paginator.already_have(landing_url=landing_url):
+      return
+
     # PDF URL and summary are on the report's landing page
     report_url, summary, title_from_landing = extract_from_release_page(landing_url)
     if not report_url:
@@ -208,7 +206,7 @@ def do_peer_review():
 
 # gets URL and summary from a report's landing page
 def extract_from_release_page(landing_url):
-  doc = BeautifulSoup(utils.download(landing_url))
+  doc = utils.fetch_soup(landing_url)
   main = doc.select("#main #lefSide")[0]
 
   url_elem = main.select("div")[2].select("a")
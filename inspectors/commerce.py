@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.oig.doc.gov/Pages/Audits-Evaluations.aspx?YearStart=01/01/1996&YearEnd=12/31/2014
@@ -94,6 +93,10 @@ def report_from(result, topic, topic_url, year_range):
     link = result.select("a")[0]
     landing_url = link.get('href')
 
+    # with --incremental, skip reports saved by an earlier run
+    if inspector.already_have(landing_url=landing_url):
+      return
+
     landing_page = beautifulsoup_from_url(landing_url)
     try:
       report_url_relative = landing_page.select("div.oig_Publications a")[-1].get('href')
@@ -143,6 +146,6 @@ def report_from(result, topic, topic_url, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 utils.run(run) if (__name__ == "__main__") else None
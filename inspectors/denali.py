@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.oig.denali.gov/
@@ -70,7 +69,7 @@ REPORT_PUBLISHED_MAPPING = {
 def run(options):
   year_range = inspector.year_range(options, archive)
 
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.fetch_soup(REPORTS_URL)
   results = doc.select("#mainContent blockquote a")
   for result in results:
     report = report_from(result, year_range)
@@ -5,7 +5,6 @@ from urllib.parse import urljoin, urlencode
 import re
 import os
 import logging
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.dodig.mil/pubs/index.cfm
@@ -19,6 +18,8 @@ archive = 1986
 #
 #   skip_downloaded: skip over any reports whose PDFs have been downloaded.
 #      useful for resuming large fetches without making needless HTTP requests.
+#      (--incremental, which works for every scraper, does the same for
+#      reports saved by any earlier run.)
 #
 #   topics - limit reports fetched to one or more office, comma-separated.
 #            e.g. "IE,ISPA". These are the offices/"components" defined by the
@@ -111,11 +112,11 @@ def run(options):
 
   for url in urls_for(options, only):
     body = utils.download(url)
-    page = BeautifulSoup(body)
+    page = utils.soup(body, only='table[summary~="reports"]')
 
     report_table = page.select('table[summary~="reports"]')[0]
-    for tr in report_table.select('tr')[1:]:
-      tds = tr.select('td')
+    for tr in utils.select(report_table, 'tr')[1:]:
+      tds = utils.select(tr, 'td')
       if len(tds) == 1:
         # Page has no reports, simply a "No Data" indication for these dates.
         break
@@ -131,7 +132,7 @@ def report_from(tds, options):
     'agency_name': 'Department of Defense',
   }
 
-  title_link = tds[2].select('a')[0]
+  title_link = utils.select(tds[2], 'a')[0]
   title = title_link.text.strip().replace('\r\n', ' ')
   landing_url = urljoin(BASE_URL, title_link['href'])
 
@@ -140,7 +141,7 @@ def report_from(tds, options):
 
   topic = tds[1].text
 
-  report_id = tds[2].select('strong')
+  report_id = utils.select(tds[2], 'strong')
   if report_id:
     report_id = report_id[0].text.strip()
   else:
@@ -165,6 +166,10 @@ def report_from(tds, options):
       logging.warn("\tSkipping previously downloaded report, as asked.")
       return
 
+  # with --incremental, skip reports saved by an earlier run
+  if inspector.already_have(report_id=report_id, landing_url=landing_url, year=published_date.year):
+    return
+
   report_url, summary, maybe_unreleased, skip = fetch_from_landing_page(landing_url)
 
   if skip:
@@ -206,7 +211,7 @@ def fetch_from_landing_page(landing_url):
   skip = False
 
   body = utils.download(landing_url)
-  page = BeautifulSoup(body)
+  page = utils.soup(body)
 
   report_tables = page.select('table[summary~="reports"]')
   # in the rare case that doesn't work, have faith
@@ -287,7 +292,7 @@ def urls_for(options, only):
     yield url
 
     body = utils.download(url)
-    page = BeautifulSoup(body)
+    page = utils.soup(body)
 
     for url in get_pagination_urls(page):
       yield url
@@ -303,7 +308,7 @@ def get_pagination_urls(page):
       yield BASE_URL + link['href']
     elif link['href'].startswith('/pubs') and RE_NEXT_10.search(link.text):
       new_url = urljoin(BASE_URL, link['href'])
-      page = BeautifulSoup(utils.download(new_url))
+      page = utils.fetch_soup(new_url)
       for link in get_pagination_urls(page):
         yield link
 
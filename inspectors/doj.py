@@ -14,9 +14,8 @@ archive = 1996
 #               will be used to filter to a particular landing page.
 
 import re
-from bs4 import BeautifulSoup
 from datetime import datetime
-from utils import utils, inspector
+from utils import utils, inspector, dates
 import logging
 
 # accumulates information on reports as they're seen
@@ -129,30 +128,26 @@ def extract_info(content, directory, year_range):
         date_string = date_chopped[-2] + "," + date_chopped[-1]
 
     # check for missing commas
-    try:
-      date_string = datetime.strptime(date_string, "%B %d %Y")
-      date_string = datetime.strftime(date_string, "%B %d, %Y")
-    except ValueError:
-      pass
+    missing_comma = dates.strptime(date_string, "%B %d %Y")
+    if missing_comma:
+      date_string = datetime.strftime(missing_comma, "%B %d, %Y")
 
     # for dates without a day
     if date_string is not None:
       date_string = date_string.strip()
       if "," not in date_string:
         date_test = date_string.replace(" ", " 1, ")
-        try:
-          d = datetime.strptime(date_test, "%B %d, %Y")
+        if dates.strptime(date_test, "%B %d, %Y"):
           date_string = date_test
-        except ValueError:
-          pass
 
     # going through each link in a paragraph
     for l in b.find_all("a"):
       # most cases pass this test
-      try:
-        date = datetime.strptime(date_string, "%B %d, %Y")
+      parsed = dates.strptime(date_string, "%B %d, %Y")
+      if parsed:
+        date = parsed
       # these ones got to a coding purgatory called odd_link
-      except ValueError:
+      else:
         info = odd_link(b, date_string, l, directory, )
         # this should give better titles than "pdf" or "Press Release"
         real_title = info["real_title"]
@@ -493,7 +488,7 @@ def type_for(original_type):
 
 def get_content(url):
   page = utils.download(url)
-  page = BeautifulSoup(page)
+  page = utils.soup(page)
   content = page.select(".content-left")
   return content
 
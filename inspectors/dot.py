@@ -4,7 +4,6 @@ import datetime
 from urllib.parse import urljoin
 import os
 import logging
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.oig.dot.gov/
@@ -76,7 +75,7 @@ def run(options):
     for year_url in year_urls:
       body = utils.download(year_url)
 
-      doc = BeautifulSoup(body)
+      doc = utils.soup(body)
       results = doc.select(".view-business-areas .views-row")
 
       for result in results:
@@ -111,10 +110,14 @@ def report_from(result, year_range, topic, options):
     logging.debug("[%s] Skipping, not in requested range." % landing_url)
     return
 
+  # with --incremental, skip reports saved by an earlier run
+  if inspector.already_have(landing_url=landing_url):
+    return
+
   logging.debug("### Processing report %s" % landing_url)
 
   report_page_body = utils.download(landing_url)
-  report_page = BeautifulSoup(report_page_body)
+  report_page = utils.soup(report_page_body)
 
   # take an expansive view of the 'summary' -
   #   landing page title, and any paragraphs with summary text
@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.eac.gov/inspector_general/
@@ -39,7 +38,7 @@ def run(options):
 
   # Pull the reports
   for report_type, url in REPORT_URLS.items():
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.fetch_soup(url)
     results = doc.select("div.mainRegion p a")
     if not results:
       raise AssertionError("No report links found for %s" % url)
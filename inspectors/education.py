@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www2.ed.gov/about/offices/list/oig/areports.html
@@ -232,7 +231,7 @@ def report_from(result, url, report_type, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -3,7 +3,6 @@
 import datetime
 from urllib.parse import urljoin
 import re
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 archive = 1996
@@ -61,7 +60,7 @@ def run(options):
   index_body = utils.download(BASE_URL)
 
   current_year = None
-  index = BeautifulSoup(index_body)
+  index = utils.soup(index_body)
   tables = index.select('table.style1')
   for table in tables:
     trs = table.select('tr')
@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.fca.gov/home/inspector.html
@@ -30,7 +29,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the general reports
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.fetch_soup(REPORTS_URL)
   results = doc.select("div#mainContent li.mainContenttext a")
   for result in results:
     report = report_from(result, REPORTS_URL, year_range)
@@ -38,7 +37,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the archive reports
-  doc = BeautifulSoup(utils.download(REPORT_ARCHIVE_URL))
+  doc = utils.fetch_soup(REPORT_ARCHIVE_URL)
   results = doc.select("div#mainContent li.mainContenttext a") + doc.select("div#mainContent span.mainContenttext a")
   for result in results:
     if not result.text:
@@ -48,7 +47,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results = doc.select("div#mainContent li.mainContenttext a")
   for result in results:
     report = semiannual_report_from(result, year_range)
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://transition.fcc.gov/oig/oigreportsaudit.html
@@ -83,7 +82,7 @@ def report_from(result, page_url, report_type, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
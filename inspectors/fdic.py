@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.fdicoig.gov
@@ -26,7 +25,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the reports
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.fetch_soup(REPORTS_URL)
   results = doc.find("table", {"cellpadding": "5"}).select("tr")
   for index, result in enumerate(results):
     if index < 3 or not result.text.strip():
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://oig.federalreserve.gov/reports/allyearsboardcfpb.htm
@@ -51,8 +50,16 @@ def run(options):
   # Pull the audit reports
   doc = beautifulsoup_from_url(REPORTS_URL)
   results = doc.select("#rounded-corner > tr")
+
+  # fetch the landing pages for every report in range at once, except
+  # (with --incremental) for reports saved by an earlier run
+  landing_urls = [landing_url_for(result) for result in results
+                  if published_on_for(result).year in year_range
+                  and not inspector.already_have(landing_url=landing_url_for(result))]
+  landing_pages = dict(zip(landing_urls, utils.download_many(landing_urls)))
+
   for result in results:
-    report = report_from(result, year_range)
+    report = report_from(result, year_range, landing_pages)
     if report:
       inspector.save_report(report)
 
@@ -71,20 +78,30 @@ def run(options):
     inspector.save_report(report)
 
 
-def report_from(result, year_range):
+def landing_url_for(result):
+  return urljoin(BASE_PAGE_URL, result.select("a")[0].get('href'))
+
+def published_on_for(result):
+  published_on_text = result.select("td.Col_Date")[0].text
+  return datetime.datetime.strptime(published_on_text.strip(), '%m-%d-%Y')
+
+def report_from(result, year_range, landing_pages):
   title = result.select("a")[0].text
   agency = result.select("td.Col_Agency")[0].text
   topic = result.get('class')[0]
-  landing_url = urljoin(BASE_PAGE_URL, result.select("a")[0].get('href'))
-  published_on_text = result.select("td.Col_Date")[0].text
-  published_on = datetime.datetime.strptime(published_on_text.strip(), '%m-%d-%Y')
+  landing_url = landing_url_for(result)
+  published_on = published_on_for(result)
 
   if published_on.year not in year_range:
     logging.debug("[%s] Skipping, not in requested range." % landing_url)
     return
 
+  # already saved, see --incremental
+  if landing_url not in landing_pages:
+    return
+
   logging.debug("Scraping landing url: %s", landing_url)
-  landing_page = beautifulsoup_from_url(landing_url)
+  landing_page = utils.soup(landing_pages[landing_url])
 
   landing_page_text = landing_page.select("div.style-report-text")[0].text
 
@@ -136,6 +153,8 @@ def semiannual_report_from(report_url, year_range):
   if extension != '.pdf':
     # If this is not a PDF, then it is actually a link to a landing page.
     # Grab the real report_url and the published date
+    if inspector.already_have(report_id=report_id):
+      return
     landing_url = report_url
     landing_page = beautifulsoup_from_url(landing_url)
     report_url_relative = landing_page.select("div.report-header-container-aside a")[0].get('href')
@@ -173,7 +192,7 @@ def semiannual_report_from(report_url, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -4,7 +4,6 @@ import datetime
 import logging
 import os
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://fhfaoig.gov/
@@ -38,8 +37,9 @@ def run(options):
   pages = options.get('pages', ALL_PAGES)
 
   # Pull the audit reports. Pages are 0-indexed.
-  for page in range(0, int(pages) - 1):
-    doc = BeautifulSoup(utils.download(AUDIT_REPORTS_URL.format(page=page)))
+  paginator = inspector.Paginator(0, int(pages) - 2)
+  for page in paginator:
+    doc = utils.fetch_soup(AUDIT_REPORTS_URL.format(page=page))
     results = doc.select("span.field-content")
     if not results:
       # No more results, we must have hit the last page
@@ -47,12 +47,13 @@ def run(options):
 
     for result in results:
       report = report_from(result, year_range, report_type='audit')
-      if report:
+      # with --incremental, skip reports saved by an earlier run
+      if report and not paginator.already_have(report_id=report['report_id'], year=inspector.year_from(report)):
         inspector.save_report(report)
 
   # Grab the other reports
   for report_type, url in OTHER_REPORT_URLS.items():
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.fetch_soup(url)
     results = doc.select(".views-field")
     if not results:
       results = doc.select(".views-row")
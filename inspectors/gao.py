@@ -4,7 +4,6 @@ import datetime
 import logging
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.gao.gov/about/workforce/ig_reports.html
@@ -27,25 +26,45 @@ def run(options):
   for reports_url in [REPORTS_URL, SEMIANNUAL_REPORTS_URL]:
     doc = beautifulsoup_from_url(reports_url)
     results = doc.select("div.listing")
+
+    # fetch the landing pages for every report in range at once, except
+    # (with --incremental) for reports saved by an earlier run
+    landing_urls = [landing_url_for(result) for result in results
+                    if published_on_for(result).year in year_range
+                    and not inspector.already_have(landing_url=landing_url_for(result))]
+    landing_pages = dict(zip(landing_urls, utils.download_many(landing_urls)))
+
     for result in results:
-      report = report_from(result, year_range)
+      report = report_from(result, year_range, landing_pages)
       if report:
         inspector.save_report(report)
 
-def report_from(result, year_range):
+def landing_url_for(result):
+  link = result.select("a")[0]
+  return urljoin(REPORTS_URL, link.get('href'))
+
+def published_on_for(result):
+  published_node = result.select("div.release_info")[1]
+  return datetime.datetime.strptime(published_node.text, '%b %d, %Y')
+
+def report_from(result, year_range, landing_pages):
   link = result.select("a")[0]
   title = link.text
-  landing_url = urljoin(REPORTS_URL, link.get('href'))
+  landing_url = landing_url_for(result)
   report_id_node, published_node = result.select("div.release_info")
   report_id = report_id_node.text.strip().replace(",", "")
-  published_on = datetime.datetime.strptime(published_node.text, '%b %d, %Y')
+  published_on = published_on_for(result)
 
   if published_on.year not in year_range:
     logging.debug("[%s] Skipping, not in requested range." % landing_url)
     return
 
+  # already saved, see --incremental
+  if landing_url not in landing_pages:
+    return
+
   logging.debug("Scraping landing url: %s", landing_url)
-  landing_page = beautifulsoup_from_url(landing_url)
+  landing_page = utils.soup(landing_pages[landing_url])
   summary = landing_page.select("div.left_col")[0].text.strip()
 
   pdf_link = landing_page.select("#link_bar > a")[0]
@@ -71,7 +90,7 @@ def report_from(result, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 from utils import utils, inspector
-from bs4 import BeautifulSoup
 from datetime import datetime
 import re
 import logging
@@ -19,16 +18,15 @@ def crawl_index(base_url, options, is_meta_index=False):
   max_pages = options.get('pages')
   if max_pages:
     max_pages = int(max_pages)
-  page = 1
 
   only_id = options.get('report_id')
 
-  done = False
-  while not done:
+  paginator = inspector.Paginator(1, max_pages)
+  for page in paginator:
     url = url_for(base_url, page)
     body = utils.download(url)
 
-    doc = BeautifulSoup(body)
+    doc = utils.soup(body)
 
     next_page = page + 1
     found_next_page = False
@@ -38,9 +36,7 @@ def crawl_index(base_url, options, is_meta_index=False):
         found_next_page = True
         break
     if not found_next_page:
-      done = True
-    if max_pages and next_page > max_pages:
-      done = True
+      paginator.stop()
 
     results = doc.select("div#svPortal dl")
     for result in results:
@@ -59,11 +55,14 @@ def crawl_index(base_url, options, is_meta_index=False):
         if year not in year_range:
           continue
 
+        # with --incremental, skip reports saved by an earlier run
+        if paginator.already_have(report_id=report['report_id'], year=year):
+          continue
+
         inspector.save_report(report)
 
-    page = next_page
-    if not done:
-      logging.info('Moving to next page (%d)' % page)
+    if not paginator.stopped:
+      logging.info('Moving to next page (%d)' % next_page)
 
 def url_for(base_url, page = 1):
   return "%s?startRow=%d" % (base_url, page * 10 - 9)
@@ -5,8 +5,7 @@ import logging
 import os
 from urllib.parse import urljoin, urlparse, urlunparse
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, dates
 
 # https://oig.hhs.gov/reports-and-publications/index.asp
 archive = 1985
@@ -268,6 +267,10 @@ def report_from(result, year_range, topic, subtopic_url, subtopic=None):
     logging.debug("[%s] Skipping, not in requested range." % report_url)
     return
 
+  # with --incremental, skip reports saved by an earlier run
+  if inspector.already_have(report_id=report_id, year=published_on and published_on.year):
+    return
+
   if report_id in REPORT_PUBLISHED_MAPPING:
     published_on = REPORT_PUBLISHED_MAPPING[report_id]
   else:
@@ -335,6 +338,15 @@ def report_from_landing_url(report_url):
 def clean_published_text(published_text):
   return published_text.strip().replace(" ", "").replace("\xa0", "")
 
+TAG_DATE_FORMATS = (
+  '%m-%d-%Y',
+  '%m-%d-%y',
+  '%b%d,%Y',
+  '%B%d,%Y',
+  '%B,%d,%Y',
+  '%B%Y',
+)
+
 def get_published_date_from_tag(possible_tag):
   try:
     published_on_text = possible_tag.contents[0].split("|")[0]
@@ -342,87 +354,77 @@ def get_published_date_from_tag(possible_tag):
     published_on_text = possible_tag.text
 
   published_on_text = clean_published_text(published_on_text)
+  published_on = dates.strptime_any(published_on_text, TAG_DATE_FORMATS)
+  if published_on:
+    return published_on
 
-  date_formats = [
-    '%m-%d-%Y',
-    '%m-%d-%y',
-    '%b%d,%Y',
-    '%B%d,%Y',
-    '%B,%d,%Y',
-    '%B%Y',
-  ]
-  for date_format in date_formats:
-    try:
-      return datetime.datetime.strptime(published_on_text, date_format)
-    except ValueError:
-      pass
-
-  for date_format in date_formats:
-    try:
-      published_text = clean_published_text(possible_tag.contents[-1])
-      return datetime.datetime.strptime(published_text, date_format)
-    except (ValueError, TypeError, IndexError):
-      pass
+  try:
+    published_text = clean_published_text(possible_tag.contents[-1])
+  except (TypeError, IndexError):
+    return None
+  return dates.strptime_any(published_text, TAG_DATE_FORMATS)
 
 def published_on_from_inline_link(result, report_filename, title, report_id, report_url):
-  try:
-    published_on_text = result.find_previous("dt").text.strip()
-    published_on = datetime.datetime.strptime(published_on_text, "%m-%d-%Y")
-  except (ValueError, AttributeError):
-    try:
-      cite_text = result.find_next("cite").text
-      if ';' in cite_text:
-        published_on_text = cite_text.split(";")[-1].rstrip(")")
-      elif ':' in cite_text:
-        published_on_text = cite_text.split(":")[-1].rstrip(")")
-      else:
-        published_on_text = cite_text.split(",")[-1].rstrip(")")
-      published_on = datetime.datetime.strptime(published_on_text.strip(), '%m/%y')
-    except (AttributeError, ValueError):
-      try:
-        fiscal_year = int(result.text.split(":")[0].split()[1])
-        published_on = datetime.datetime(fiscal_year - 1, 10, 1)
-      except (ValueError, IndexError):
-        try:
-          fiscal_year = int(report_filename.split("-")[0])
-          published_on = datetime.datetime(fiscal_year - 1, 10, 1)
-        except ValueError:
-          try:
-            published_on = datetime.datetime.strptime(title.replace(": ", ":"), "Compendium:%B %Y Edition")
-          except ValueError:
-            try:
-              published_on = datetime.datetime.strptime(report_id.split("-")[-1], "%m%d%Y")
-            except ValueError:
-              try:
-                report_year = int(report_url.split("/")[-2:-1][0])
-                published_on = datetime.datetime(report_year, 1, 1)
-              except (ValueError, IndexError):
-                try:
-                  fiscal_year = int(title.replace("Fiscal Year ", ""))
-                  published_on = datetime.datetime(fiscal_year - 1, 10, 1)
-                except ValueError:
-                  # Try using the last-modified header
-                  response = utils.scraper.request(method='HEAD', url=report_url)
-                  last_modified = response.headers['Last-Modified']
-                  published_on = datetime.datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S %Z')
-                  if published_on.year < 2003:
-                    # We don't trust the last-modified for dates before 2003
-                    # since a lot of historical reports were published at this
-                    # time. For these reports, fallback to a hacky method based
-                    # on the report id. For example: oei-04-12-00490. These are
-                    # the dates that the report_id was assigned which is before
-                    # the report was actually published
-                    published_on_text = "-".join(report_id.split("-")[1:3])
-                    try:
-                      published_on = datetime.datetime.strptime(published_on_text, '%m-%y')
-                    except ValueError:
-                      pass
-                      # Fall back to the Last-Modified header
+  date_heading = result.find_previous("dt")
+  if date_heading:
+    published_on = dates.strptime(date_heading.text.strip(), "%m-%d-%Y")
+    if published_on:
+      return published_on
+
+  cite = result.find_next("cite")
+  if cite:
+    cite_text = cite.text
+    if ';' in cite_text:
+      published_on_text = cite_text.split(";")[-1].rstrip(")")
+    elif ':' in cite_text:
+      published_on_text = cite_text.split(":")[-1].rstrip(")")
+    else:
+      published_on_text = cite_text.split(",")[-1].rstrip(")")
+    published_on = dates.strptime(published_on_text.strip(), '%m/%y')
+    if published_on:
+      return published_on
+
+  # e.g. "FY 2014: ..."
+  words = result.text.split(":")[0].split()
+  published_on = (len(words) > 1) and dates.start_of_fiscal_year(words[1])
+  if published_on:
+    return published_on
+
+  published_on = (
+    dates.start_of_fiscal_year(report_filename.split("-")[0]) or
+    dates.strptime(title.replace(": ", ":"), "Compendium:%B %Y Edition") or
+    dates.strptime(report_id.split("-")[-1], "%m%d%Y")
+  )
+  if published_on:
+    return published_on
+
+  url_parts = report_url.split("/")
+  published_on = (
+    ((len(url_parts) > 1) and dates.start_of_year(url_parts[-2])) or
+    dates.start_of_fiscal_year(title.replace("Fiscal Year ", ""))
+  )
+  if published_on:
+    return published_on
+
+  # Try using the last-modified header
+  response = utils.scraper.request(method='HEAD', url=report_url)
+  last_modified = response.headers['Last-Modified']
+  published_on = datetime.datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S %Z')
+  if published_on.year < 2003:
+    # We don't trust the last-modified for dates before 2003
+    # since a lot of historical reports were published at this
+    # time. For these reports, fallback to a hacky method based
+    # on the report id. For example: oei-04-12-00490. These are
+    # the dates that the report_id was assigned which is before
+    # the report was actually published
+    published_on_text = "-".join(report_id.split("-")[1:3])
+    # Fall back to the Last-Modified header
+    published_on = dates.strptime(published_on_text, '%m-%y') or published_on
   return published_on
 
 def get_subtopic_map(topic_url):
   body = utils.download(topic_url)
-  doc = BeautifulSoup(body)
+  doc = utils.soup(body, only="#leftContentInterior")
 
   subtopic_map = {}
   for link in doc.select("#leftContentInterior li a"):
@@ -439,7 +441,7 @@ def beautifulsoup_from_url(url):
   body = utils.download(url)
   if body is None: return None
 
-  doc = BeautifulSoup(body)
+  doc = utils.soup(body)
 
   # Some of the pages will return meta refreshes
   if doc.find("meta") and doc.find("meta").attrs.get('http-equiv') == 'REFRESH':
@@ -4,7 +4,6 @@ import datetime
 import logging
 import os
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 archive = 2001
@@ -50,7 +49,7 @@ def run(options):
 
     url = url_for(year_range, page=page)
     index_body = utils.download(url)
-    index = BeautifulSoup(index_body)
+    index = utils.soup(index_body)
 
     rows = index.select('div.views-row')
 
@@ -88,10 +87,14 @@ def report_from(report_row, year_range):
     logging.debug("[%s] Skipping, not in requested range." % landing_url)
     return
 
+  # with --incremental, skip reports saved by an earlier run
+  if inspector.already_have(landing_url=landing_url):
+    return
+
   logging.debug("### Processing report %s" % landing_url)
 
   report_page_body = utils.download(landing_url)
-  report_page = BeautifulSoup(report_page_body)
+  report_page = utils.soup(report_page_body)
 
   article = report_page.select('article')[0]
 
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.doi.gov/oig/reports/index.cfm
@@ -37,7 +36,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   response = utils.scraper.urlopen(REPORT_SEARCH_URL, method='POST', body=POST_DATA)
-  doc = BeautifulSoup(response)
+  doc = utils.soup(response, only="div.report")
 
   results = doc.select("div.report")
   for result in results:
@@ -66,14 +65,14 @@ def report_type_from_text(report_type_text):
 
 
 def report_from(result, year_range):
-  title = result.select("a span")[0].text.strip()
+  title = utils.select(result, "a span")[0].text.strip()
 
-  report_url = urljoin(REPORT_URL_BASE, result.select("a")[0].get('href'))
+  report_url = urljoin(REPORT_URL_BASE, utils.select(result, "a")[0].get('href'))
   report_url = report_url.replace("---", "-")  # See note to IG team
   report_filename = report_url.split("/")[-1]
   report_id, extension = os.path.splitext(report_filename)
 
-  text_tuple = result.select("span")[1].text.split("|")
+  text_tuple = utils.select(result, "span")[1].text.split("|")
   published_on_text = text_tuple[0]
 
   report_type_text = text_tuple[-1]
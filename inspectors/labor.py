@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.oig.dol.gov/auditreports.htm
@@ -35,7 +34,8 @@ def run(options):
 
   # Pull the audit reports
   for year in year_range:
-    for page_number in range(0, 10000):
+    paginator = inspector.Paginator(0, 9999)
+    for page_number in paginator:
       year_url = url_for(year, page_number)
       doc = beautifulsoup_from_url(year_url)
       results = doc.select("ol li")
@@ -43,7 +43,8 @@ def run(options):
         break
       for result in results:
         report = report_from(result, year_url)
-        if report:
+        # with --incremental, skip reports saved by an earlier run
+        if report and not paginator.already_have(report_id=report['report_id'], year=inspector.year_from(report)):
           inspector.save_report(report)
 
   # Pull the semiannual reports
@@ -144,7 +145,7 @@ def url_for(year, page_number):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
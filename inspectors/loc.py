@@ -5,7 +5,6 @@ import logging
 from urllib.parse import urljoin
 import re
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.loc.gov/about/office-of-the-inspector-general/
@@ -76,7 +75,7 @@ class LibraryOfCongressScraper(object):
     # This page contains semianual reports as well as a few Audit reports for
     # Fiscal Year 2014 and links to sub-pages that contain links for other
     # fiscal years.
-    doc = BeautifulSoup(utils.download(REPORTS_BY_YEAR_URL))
+    doc = utils.fetch_soup(REPORTS_BY_YEAR_URL)
 
     # Get the semiannual reports to Congress.
     self.get_semiannual_reports_to_congress(doc)
@@ -90,14 +89,14 @@ class LibraryOfCongressScraper(object):
       link = li.find('a')
       if link:
         next_url = urljoin(REPORTS_BY_YEAR_URL, link['href'])
-        doc = BeautifulSoup(utils.download(next_url))
+        doc = utils.fetch_soup(next_url)
         uls = self.get_uls_past_audit_header(doc)
         assert len(uls) == 1, ('Mysterious additional ul data on page: %s' %
                                next_url)
         self.get_bare_reports(uls[0])
 
   def get_listed_reports(self, url):
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.fetch_soup(url)
     article = doc.select('.article')[0]
     for ul in article.find_all('ul'):
       self.get_bare_reports(ul)
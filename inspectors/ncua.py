@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.ncua.gov/about/Leadership/Pages/page_oig.aspx
@@ -29,7 +28,7 @@ def run(options):
   for year in year_range:
     if year < 2002:  # The oldest page for audit reports
       continue
-    doc = BeautifulSoup(utils.download(AUDIT_REPORTS_URL.format(year=year)))
+    doc = utils.fetch_soup(AUDIT_REPORTS_URL.format(year=year))
     results = doc.select("div.content table tr")
     for index, result in enumerate(results):
       if not index:
@@ -40,7 +39,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the FOIA reports
-  doc = BeautifulSoup(utils.download(FOIA_REPORTS_URL))
+  doc = utils.fetch_soup(FOIA_REPORTS_URL)
   results = doc.select("div.content table tr")
   for index, result in enumerate(results):
     if not index:
@@ -51,7 +50,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results = doc.select("div.content a")
   for result in results:
     report = semiannual_report_from(result, year_range)
@@ -5,7 +5,6 @@ import logging
 import os
 import re
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.nlrb.gov/who-we-are/inspector-general
@@ -37,7 +36,7 @@ def run(options):
 
   # Pull the audit and inspections reports
   for report_type, reports_url in REPORT_URLS.items():
-    doc = BeautifulSoup(utils.download(reports_url))
+    doc = utils.fetch_soup(reports_url)
     results = doc.select("div.field-item")
     for result in results:
       report = report_from(result, report_type, year_range)
@@ -45,7 +44,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results = doc.select("div.field-item")
   for result in results:
     report = semiannual_report_from(result, year_range)
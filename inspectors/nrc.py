@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.nrc.gov/insp-gen.html
@@ -49,7 +48,7 @@ def run(options):
   # Pull the audit reports
   for year in year_range:
     url = AUDITS_REPORTS_URL.format(year)
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.fetch_soup(url)
     results = doc.find("table", border="1").select("tr")
     for index, result in enumerate(results):
       if not index:
@@ -60,7 +59,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the congressional testimony
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   semiannual_reports_table = doc.find("table", border="1")
   for index, result in enumerate(semiannual_reports_table.select("tr")):
     if index < 2:
@@ -72,7 +71,7 @@ def run(options):
 
   # Pull the other reports
   for reports_url in OTHER_REPORT_URLS:
-    doc = BeautifulSoup(utils.download(reports_url))
+    doc = utils.fetch_soup(reports_url)
     results = doc.find("table", border="1").select("tr")
     for index, result in enumerate(results):
       if not index:
@@ -143,7 +142,7 @@ def semiannual_report_from(result, year_range):
   report_link = result.find("a")
   landing_url = urljoin(BASE_REPORT_URL, report_link.get('href'))
 
-  landing_page = BeautifulSoup(utils.download(landing_url))
+  landing_page = utils.fetch_soup(landing_url)
   title = " ".join(landing_page.select("#mainSubFull h1")[0].text.split())
 
   try:
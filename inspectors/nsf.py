@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.nsf.gov/oig/
@@ -41,7 +40,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the audit reports
-  doc = BeautifulSoup(utils.download(AUDIT_REPORTS_URL))
+  doc = utils.fetch_soup(AUDIT_REPORTS_URL)
   results = doc.select("td.text table tr")
   for result in results:
     # ignore divider lines
@@ -52,7 +51,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results = doc.select("td.text table tr")
   for result in results:
     if not result.text.strip():
@@ -66,7 +65,7 @@ def run(options):
     url=CASE_REPORTS_URL,
     data=CASE_REPORTS_DATA,
   )
-  doc = BeautifulSoup(response.content)
+  doc = utils.soup(response.content)
   results = doc.select("td.text table tr")
   for index, result in enumerate(results):
     if not index or not result.text.strip():  # Skip the header row and empty rows
@@ -76,7 +75,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the testimony
-  doc = BeautifulSoup(utils.download(TESTIMONY_REPORTS_URL))
+  doc = utils.fetch_soup(TESTIMONY_REPORTS_URL)
   results = doc.select("td.text table tr")
   for result in results:
     if not result.text.strip():
@@ -167,7 +166,7 @@ def semiannual_report_from(result, year_range):
     landing_page_response = utils.scraper.get(landing_url)
     landing_url = landing_page_response.url
 
-    landing_page = BeautifulSoup(landing_page_response.content)
+    landing_page = utils.soup(landing_page_response.content)
     report_link_text = landing_page.find(text=REPORT_LINK_TEXT)
     report_link = report_link_text.parent
     if report_link.get('href'):
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 from utils import utils, inspector
-from bs4 import BeautifulSoup
 import bs4
 import os
 import logging
@@ -34,7 +33,7 @@ def run(options):
   url = url_for()
   body = utils.download(url)
 
-  doc = BeautifulSoup(body)
+  doc = utils.soup(body)
   results = doc.select("section")
 
   for result in results:
@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://oig.pbgc.gov/
@@ -40,7 +39,7 @@ def run(options):
     if year < 1998:  # The earliest year for audit reports
       continue
     year_url = AUDIT_REPORTS_URL.format(year=year)
-    doc = BeautifulSoup(utils.download(year_url))
+    doc = utils.fetch_soup(year_url)
     results = doc.select("tr")
     for result in results:
       report = report_from(result, report_type='audit', year_range=year_range)
@@ -48,7 +47,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the congreesional requests
-  doc = BeautifulSoup(utils.download(CONGRESSIONAL_REQUESTS_URL))
+  doc = utils.fetch_soup(CONGRESSIONAL_REQUESTS_URL)
   results = doc.select("tr")
   for result in results:
     report = report_from(result, report_type='congress', year_range=year_range)
@@ -56,7 +55,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results =  doc.select("div.holder a")
   for result in results:
     report = semiannual_report_from(result, year_range)
@@ -64,7 +63,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the congressional testimony
-  doc = BeautifulSoup(utils.download(CONGRESSIONAL_TESTIMONY_URL))
+  doc = utils.fetch_soup(CONGRESSIONAL_TESTIMONY_URL)
   results =  doc.select("div.holder a")
   for result in results:
     report = testimony_report_from(result, year_range)
@@ -95,7 +94,10 @@ def report_from(result, report_type, year_range):
     landing_url = None
     summary = None
   else:
-    landing_page = BeautifulSoup(utils.download(landing_url))
+    # with --incremental, skip reports saved by an earlier run
+    if inspector.already_have(landing_url=landing_url):
+      return
+    landing_page = utils.fetch_soup(landing_url)
     summary = " ".join(landing_page.select("div.holder")[0].text.split())
     report_link = landing_page.find("a", href=PDF_REGEX)
     if report_link:
@@ -129,7 +131,7 @@ def semiannual_report_from(result, year_range):
   report_id_javascript = result.get('onclick')
   report_id = re.search("'(.*)'", report_id_javascript).groups()[0]
   landing_url  = "http://oig.pbgc.gov/sarc/{report_id}.html".format(report_id=report_id)
-  landing_page = BeautifulSoup(utils.download(landing_url))
+  landing_page = utils.fetch_soup(landing_url)
 
   title = " ".join(landing_page.select("h3")[0].text.split())
   relative_report_url = landing_page.find("a", text="Read Full Report").get('href')
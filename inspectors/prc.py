@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.prc.gov/prc-pages/about/offices/office.aspx?office=oig
@@ -29,7 +28,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Find the number of pages to iterate
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.fetch_soup(REPORTS_URL)
   page_count_text = doc.select("div.AspNet-GridView-Pagination")[0].text
   page_count = int(re.search('Page 1 of (\d+)', page_count_text).groups()[0])
 
@@ -42,7 +41,7 @@ def run(options):
       },
       cookies=COOKIES,
     )
-    doc = BeautifulSoup(response.content)
+    doc = utils.soup(response.content)
     results = doc.select("div.AspNet-GridView table tr")
     if not results:
       break
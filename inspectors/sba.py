@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.sba.gov/office-of-inspector-general
@@ -40,7 +39,8 @@ def run(options):
 
   # Suggested flow, for an IG which paginates results.
   pages = options.get('pages', ALL_PAGES)
-  for page in range(1, (int(pages) + 1)):
+  paginator = inspector.Paginator(1, int(pages))
+  for page in paginator:
     data = {
       'view_name': 'oig_nodes',
       'view_display_id': 'block_search_oig_reports',
@@ -56,7 +56,7 @@ def run(options):
         },
     )
     page_html = response.json()[1]['data']
-    doc = BeautifulSoup(page_html)
+    doc = utils.soup(page_html)
     results = doc.select("tr")
     if not results:
       break
@@ -65,7 +65,7 @@ def run(options):
       if not index:
         # Skip the header row
         continue
-      report = report_from(result, year_range)
+      report = report_from(result, year_range, paginator)
       if report:
         inspector.save_report(report)
 
@@ -93,7 +93,7 @@ def report_type_from_text(text):
   else:
     return 'other'
 
-def report_from(result, year_range):
+def report_from(result, year_range, paginator):
   published_on_text = result.select("td")[0].text.strip()
   try:
     published_on = datetime.datetime.strptime(published_on_text, '%Y-%m-%d')
@@ -113,8 +113,12 @@ def report_from(result, year_range):
 
   landing_url = urljoin(BASE_REPORT_URL, result.find("a").get('href'))
 
+  # with --incremental, skip reports saved by an earlier run
+  if paginator.already_have(landing_url=landing_url):
+    return
+
   landing_body = utils.download(landing_url)
-  landing_page = BeautifulSoup(landing_body)
+  landing_page = utils.soup(landing_body)
 
   try:
     report_url = urljoin(BASE_REPORT_URL, landing_page.select("#attachments a")[0].get('href'))
@@ -172,6 +176,7 @@ def report_from(result, year_range):
     'type': report_type,
     'report_id': report_id,
     'url': report_url,
+    'landing_url': landing_url,
     'title': title,
     'published_on': datetime.datetime.strftime(published_on, "%Y-%m-%d"),
   }
@@ -5,8 +5,7 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, dates
 
 # http://www.sec.gov/about/offices/oig/inspector_general_reppubs_testimony.shtml
 archive = 1994
@@ -163,7 +162,7 @@ def run(options):
   for topic in topics:
     topic_url = TOPIC_TO_URL[topic]
     body = utils.download(topic_url)
-    doc = BeautifulSoup(body)
+    doc = utils.soup(body)
 
     try:
       year_results = doc.select("#Listing")[0]
@@ -237,10 +236,9 @@ def add_common_fields(report):
 
 def find_first_matching_datetime_format_from_text(text_datetime_format_tuples):
   for text, datetime_format in text_datetime_format_tuples:
-    try:
-      return datetime.datetime.strptime(text, datetime_format)
-    except ValueError:
-      pass
+    published_on = dates.strptime(text, datetime_format)
+    if published_on:
+      return published_on
 
 def published_date_for_report(published_on_text, title, report_url, last_published_on):
   "There are multiple different ways we try to extract the published date"
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.sigar.mil/
@@ -40,7 +39,7 @@ def run(options):
 
   # Pull the reports
   for report_type, report_url in REPORT_URLS.items():
-    doc = BeautifulSoup(utils.download(report_url))
+    doc = utils.fetch_soup(report_url)
     results = doc.select("item")
     for result in results:
       report = report_from(result, report_url, report_type, year_range)
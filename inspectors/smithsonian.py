@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.si.edu/OIG
@@ -41,7 +40,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # # Pull the RSS feed
-  doc = BeautifulSoup(utils.download(RSS_URL))
+  doc = utils.fetch_soup(RSS_URL)
   results = doc.select("item")
   for result in results:
     report = rss_report_from(result, year_range)
@@ -49,7 +48,7 @@ def run(options):
       inspector.save_report(report)
 
   # # Pull the recent audit reports.
-  doc = BeautifulSoup(utils.download(RECENT_AUDITS_URL))
+  doc = utils.fetch_soup(RECENT_AUDITS_URL)
   results = doc.select("div.block > a")
   for result in results:
     report = report_from(result, year_range)
@@ -57,7 +56,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the archive audit reports
-  doc = BeautifulSoup(utils.download(AUDIT_ARCHIVE_URL))
+  doc = utils.fetch_soup(AUDIT_ARCHIVE_URL)
   results = doc.select("div.block a")
   for result in results:
     report = report_from(result, year_range)
@@ -65,7 +64,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the other reports
-  doc = BeautifulSoup(utils.download(OTHER_REPORTS_URl))
+  doc = utils.fetch_soup(OTHER_REPORTS_URl)
   results = doc.select("div.block > a")
   for result in results:
     report = report_from(result, year_range)
@@ -136,7 +135,7 @@ def report_from(result, year_range):
   summary = None
   if not report_url.endswith(".pdf"):
     # Some reports link to other page which link to the full report
-    report_page = BeautifulSoup(utils.download(report_url))
+    report_page = utils.fetch_soup(report_url)
     relative_report_url = report_page.select("div.block a")[0].get('href')
     report_url = urljoin(report_url, relative_report_url)
     # Strip extra path adjustments
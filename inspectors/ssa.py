@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://oig.ssa.gov/
@@ -57,7 +56,7 @@ def run(options):
 
 def reports_from_page(url_format, page, report_type, year_range, year=''):
   url = url_format.format(page=page, year=year)
-  doc = BeautifulSoup(utils.download(url))
+  doc = utils.fetch_soup(url)
   results = doc.select("td.views-field")
   if not results:
     results = doc.select("div.views-row")
@@ -90,7 +89,11 @@ def report_from(result, report_type, year_range):
   except IndexError:
     report_id = landing_url.split("/")[-1]
 
-  landing_page = BeautifulSoup(utils.download(landing_url))
+  # with --incremental, skip reports saved by an earlier run
+  if inspector.already_have(report_id=report_id, landing_url=landing_url, year=published_on.year):
+    return
+
+  landing_page = utils.fetch_soup(landing_url)
 
   unreleased = False
   if "Limited Distribution" in title:
@@ -5,7 +5,6 @@ import logging
 import os
 import re
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://oig.state.gov/lbry/index.htm
@@ -176,7 +175,7 @@ def extract_reports_for_subtopic(subtopic_url, year_range, topic, subtopic=None)
     subtopic_url = subtopic_url.replace("http://http", "")
 
   body = utils.download(subtopic_url)
-  doc = BeautifulSoup(body)
+  doc = utils.soup(body)
   results = doc.select("#body-row02-col02andcol03 a")
 
   if not results:
@@ -317,7 +316,7 @@ def get_page_highlights(page_url):
   }
   """
   body = utils.download(page_url)
-  doc = BeautifulSoup(body)
+  doc = utils.soup(body)
 
   # Each page on the site is given an id that is used to find the highlights
   page_id = re.search("item_id = '(\d+)';", doc.find(language='javascript').text).groups()[0]
@@ -340,6 +339,6 @@ def get_page_highlights(page_url):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.treasury.gov/tigta/publications_semi.shtml
@@ -46,7 +45,7 @@ def run(options):
       parse_result_from_js_url(url, "iereports", year, year_range, report_type='inspection')
 
   # Pull the congressional testimony
-  doc = BeautifulSoup(utils.download(CONGRESSIONAL_TESTIMONY_REPORTS_URL))
+  doc = utils.fetch_soup(CONGRESSIONAL_TESTIMONY_REPORTS_URL)
   results = doc.findAll("ul", type='disc')[0].select("li")
   for result in results:
     report = congressional_testimony_report_from(result, year_range)
@@ -54,7 +53,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results = doc.findAll("ul", type='disc')[0].select("li")
   for result in results:
     report = semiannual_report_from(result, year_range)
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://oig.usaid.gov
@@ -34,7 +33,7 @@ def run(options):
   for report_type, report_url_format in PAGINATED_REPORT_FORMATS.items():
     for page in range(0, 999):
       url = report_url_format.format(page=page)
-      doc = BeautifulSoup(utils.download(url))
+      doc = utils.fetch_soup(url)
       results = doc.select("li.views-row")
       if not results:
         break
@@ -45,7 +44,7 @@ def run(options):
           inspector.save_report(report)
 
   # Pull the semiannual reports (no pagination)
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.fetch_soup(SEMIANNUAL_REPORTS_URL)
   results = doc.select("li.views-row")
   for result in results:
     report = semiannual_report_from(result, year_range)
@@ -122,7 +121,7 @@ def semiannual_report_from(result, year_range):
     return
 
   landing_url = urljoin(SEMIANNUAL_REPORTS_URL, link.get('href'))
-  landing_page = BeautifulSoup(utils.download(landing_url))
+  landing_page = utils.fetch_soup(landing_url)
 
   report_url = landing_page.select("div.filefield-file a")[0].get('href')
   report_filename = report_url.split("/")[-1]
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 from utils import utils, inspector
-from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
 
@@ -37,7 +36,8 @@ def run(options):
   begin = int(options.get('begin', 1))
 
   max_page = None
-  for page in range(begin, (int(pages) + 1)):
+  paginator = inspector.Paginator(begin, int(pages))
+  for page in paginator:
     if max_page and (page > max_page):
       logging.debug("End of pages!")
       break
@@ -45,7 +45,7 @@ def run(options):
     logging.debug("## Downloading page %i" % page)
     url = url_for(options, page)
     body = utils.download(url)
-    doc = BeautifulSoup(body)
+    doc = utils.soup(body, only=[".views-row", "li.pager-item"])
 
     # When the USPS restores their page controls, we can use this again,
     # which saves one network call each time.
@@ -62,6 +62,10 @@ def run(options):
         logging.warn("[%s] Skipping report, not in requested range." % report['report_id'])
         continue
 
+      # with --incremental, skip reports saved by an earlier run
+      if paginator.already_have(report_id=report['report_id'], year=inspector.year_from(report)):
+        continue
+
       inspector.save_report(report)
 
 
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import requests
+
+from .throttle import host_for
+
+# A circuit breaker per host, so a site that's down costs seconds
+# instead of hours of timeouts and retries.
+#
+# After `failures` consecutive failed attempts at a host (connection
+# errors, timeouts, 5xx or 429 responses), the breaker opens, and requests
+# to that host fail immediately with HostUnavailable. Once `cooldown`
+# seconds have passed, one request is let through to try the host again:
+# if it works the breaker closes, otherwise it stays open for another
+# cooldown. Configure in admin.yml:
+#
+#   circuit_breaker:
+#     failures: 5
+#     cooldown: 300
+
+DEFAULT_FAILURES = 5
+DEFAULT_COOLDOWN = 300
+
+
+# not a requests.ConnectionError, so that scrapelib doesn't retry it
+class HostUnavailable(requests.RequestException):
+  pass
+
+
+def is_failure(response):
+  return (response.status_code >= 500) or (response.status_code == 429)
+
+
+class CircuitBreaker(object):
+  def __init__(self, config=None):
+    config = config or {}
+    self.threshold = int(config.get('failures', DEFAULT_FAILURES))
+    self.cooldown = int(config.get('cooldown', DEFAULT_COOLDOWN))
+    self.failures = {}
+    self.opened_at = {}
+    self.trial = set()
+    self.stats = {}
+    self.lock = threading.Lock()
+
+  def count(self, host, stat):
+    counts = self.stats.setdefault(host, {'opened': 0, 'rejected': 0})
+    counts[stat] += 1
+
+  # raise HostUnavailable if requests to url's host should fail fast
+  def check(self, url):
+    host = host_for(url)
+    with self.lock:
+      opened_at = self.opened_at.get(host)
+      if opened_at is None:
+        return
+
+      # after the cooldown, let a single trial request through
+      if (time.monotonic() - opened_at) >= self.cooldown and host not in self.trial:
+        self.trial.add(host)
+        return
+
+      self.count(host, 'rejected')
+    raise HostUnavailable("%s is not responding, not trying %s" % (host, url))
+
+  # open the breaker right away, e.g. for a host that asked us to stay
+  # away for longer than we're willing to wait
+  def trip(self, url):
+    host = host_for(url)
+    with self.lock:
+      self.trial.discard(host)
+      self.opened_at[host] = time.monotonic()
+      self.count(host, 'opened')
+
+  # a request ended in a way that says nothing about the host (e.g. too
+  # many redirects), but if it was the trial, another can be let through
+  def abandon(self, url):
+    host = host_for(url)
+    with self.lock:
+      self.trial.discard(host)
+
+  def success(self, url):
+    host = host_for(url)
+    with self.lock:
+      self.failures.pop(host, None)
+      self.opened_at.pop(host, None)
+      self.trial.discard(host)
+
+  def failure(self, url):
+    host = host_for(url)
+    with self.lock:
+      failures = self.failures.get(host, 0) + 1
+      self.failures[host] = failures
+
+      if host in self.trial:
+        # the trial request failed, so stay open for another cooldown
+        self.trial.discard(host)
+        self.opened_at[host] = time.monotonic()
+      elif (failures >= self.threshold) and (host not in self.opened_at):
+        self.opened_at[host] = time.monotonic()
+        self.count(host, 'opened')
+
+  def is_open(self, host):
+    with self.lock:
+      return host in self.opened_at
+
+  # per host: how many times the breaker opened, and how many requests
+  # failed fast because of it, since the last reset
+  def breaker_stats(self):
+    with self.lock:
+      return dict((host, dict(counts)) for host, counts in self.stats.items())
+
+  def reset(self):
+    with self.lock:
+      self.stats = {}
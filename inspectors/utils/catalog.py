@@ -0,0 +1,166 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import packed
+
+# A catalog of every report in the data directory, kept in SQLite next to
+# the reports themselves:
+#
+#   data/catalog.sqlite
+#
+# Each time a report's JSON is written, its row in the catalog is written
+# too, so questions about what's been collected don't need a walk over
+# every report.json:
+#
+#   SELECT report_id, title FROM reports
+#     WHERE inspector = 'hhs' AND year = 2014;
+#
+#   SELECT inspector, count(*) FROM reports
+#     WHERE has_text = 0 AND unreleased = 0 GROUP BY inspector;
+#
+# The catalog can always be built again from the report.json files, loose
+# or packed (see packed.py), with ./rebuild-catalog, e.g. for a data
+# directory from before it existed.
+
+FILENAME = "catalog.sqlite"
+
+# columns, in order, after the key (inspector, year, report_id)
+COLUMNS = (
+  ("agency", "TEXT"),
+  ("agency_name", "TEXT"),
+  ("type", "TEXT"),
+  ("title", "TEXT"),
+  ("published_on", "TEXT"),
+  ("url", "TEXT"),
+  ("file_type", "TEXT"),
+  ("unreleased", "INTEGER"),
+  ("has_text", "INTEGER"),
+  ("text_path", "TEXT"),
+  ("file_size", "INTEGER"),
+  ("text_size", "INTEGER"),
+  ("source_hash", "TEXT"),
+  ("config_hash", "TEXT"),
+  ("updated_at", "REAL"),
+)
+
+INDEXED = ("agency", "year", "type", "published_on", "file_type", "unreleased", "has_text")
+
+FIELDS = ["inspector", "year", "report_id"] + [name for name, kind in COLUMNS]
+INSERT = "INSERT OR REPLACE INTO reports (%s) VALUES (%s)" % (", ".join(FIELDS), ", ".join("?" for field in FIELDS))
+
+
+def size_of(path):
+  try:
+    return os.path.getsize(path)
+  except OSError:
+    return None
+
+# The catalog row for a report, given the directory its files are in (and
+# how to find their sizes, for packed reports).
+def row_for(report, report_dir, size=size_of):
+  file_size = None
+  if report.get('file_type') and not report.get('unreleased'):
+    file_size = size(os.path.join(report_dir, "report.%s" % report['file_type']))
+
+  text_size = None
+  if report.get('text_path'):
+    text_size = size(os.path.join(report_dir, os.path.basename(report['text_path'])))
+
+  extracted_with = report.get('extracted_with') or {}
+  values = {
+    'inspector': report.get('inspector'),
+    'year': report.get('year'),
+    'report_id': report.get('report_id'),
+    'unreleased': 1 if report.get('unreleased') else 0,
+    'has_text': 1 if text_size is not None else 0,
+    'file_size': file_size,
+    'text_size': text_size,
+    'source_hash': extracted_with.get('source_hash'),
+    'config_hash': extracted_with.get('config_hash'),
+    'updated_at': time.time(),
+  }
+  for field in FIELDS:
+    if field not in values:
+      values[field] = report.get(field)
+  return tuple(values[field] for field in FIELDS)
+
+# Rows for every report.json of one inspector's, loose or packed. Runs in
+# worker processes during a rebuild.
+def scan(data_dir, inspector):
+  store = packed.Store(data_dir)
+  rows = []
+  for report_dir in store.report_dirs(inspector):
+    try:
+      report = store.read_json(os.path.join(report_dir, "report.json"))
+    except (IOError, ValueError) as exception:
+      logging.warn("Couldn't read %s: %s" % (report_dir, exception))
+      continue
+    rows.append(row_for(report, report_dir, store.size))
+  store.close()
+  return rows
+
+
+class Catalog(object):
+  def __init__(self, path):
+    self.path = path
+    self.local = threading.local()
+
+  # one connection per thread, and per process
+  def connection(self):
+    conn = getattr(self.local, 'conn', None)
+    if (conn is None) or (self.local.pid != os.getpid()):
+      os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+      conn = sqlite3.connect(self.path, timeout=60)
+      # several scrapers can be writing at once, and the catalog can
+      # always be rebuilt, so favor concurrency over durability
+      conn.execute("PRAGMA journal_mode=WAL")
+      conn.execute("PRAGMA synchronous=NORMAL")
+      self.create(conn)
+      self.local.conn = conn
+      self.local.pid = os.getpid()
+    return conn
+
+  def create(self, conn):
+    columns = ", ".join("%s %s" % column for column in COLUMNS)
+    with conn:
+      conn.execute(
+        "CREATE TABLE IF NOT EXISTS reports (inspector TEXT NOT NULL, year INTEGER NOT NULL, "
+        "report_id TEXT NOT NULL, %s, PRIMARY KEY (inspector, year, report_id))" % columns
+      )
+      for column in INDEXED:
+        conn.execute("CREATE INDEX IF NOT EXISTS reports_%s ON reports (%s)" % (column, column))
+
+  # add or update a report, given the directory its files are in
+  def upsert(self, report, report_dir):
+    conn = self.connection()
+    with conn:
+      conn.execute(INSERT, row_for(report, report_dir))
+
+  # Build the catalog again from the report.json files in data_dir, for
+  # every inspector or just the ones given, scanning them in `jobs`
+  # processes at once. Returns how many reports are in it afterwards.
+  def rebuild(self, data_dir, inspectors=None, jobs=None):
+    everything = inspectors is None
+    if everything:
+      inspectors = sorted(name for name in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, name)))
+    present = [inspector for inspector in inspectors if os.path.isdir(os.path.join(data_dir, inspector))]
+
+    conn = self.connection()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+      with conn:
+        if everything:
+          conn.execute("DELETE FROM reports")
+        for inspector in inspectors:
+          conn.execute("DELETE FROM reports WHERE inspector = ?", (inspector,))
+        for inspector, rows in zip(present, executor.map(scan, [data_dir] * len(present), present)):
+          conn.executemany(INSERT, rows)
+          logging.warn("%s: %i reports" % (inspector, len(rows)))
+
+    return self.count()
+
+  def count(self):
+    return self.connection().execute("SELECT count(*) FROM reports").fetchone()[0]
@@ -0,0 +1,253 @@
+import calendar
+import collections
+import datetime
+import functools
+import re
+import time
+
+# Date parsing for the formats IG sites use, without strptime chains.
+#
+# Scrapers tend to try format after format with datetime.strptime,
+# catching a ValueError for each one that doesn't fit, which is slow
+# enough to matter when it happens for every report on every run. Here,
+# each format is compiled once into a regular expression that matches
+# exactly what strptime would accept, and a string is checked against
+# each pattern without raising anything. Results are memoized, since the
+# same date strings come up over and over on listing pages.
+#
+#   dates.strptime("11-30-2012", "%m-%d-%Y")
+#     => datetime(2012, 11, 30), or None if it doesn't fit
+#   dates.strptime_any("Sep 2014", ("%B %Y", "%b %Y"))
+#     => the first format that fits, or None
+#   dates.parse("FY 2014 Annual Plan")
+#     => ParsedDate(datetime=datetime(2013, 10, 1), precision="fiscal_year")
+#
+# Only English month and day names are understood.
+
+DAY = "day"
+MONTH = "month"
+YEAR = "year"
+FISCAL_YEAR = "fiscal_year"
+
+ParsedDate = collections.namedtuple("ParsedDate", ["datetime", "precision"])
+
+# formats for dates found on their own, e.g. in a listing's date column,
+# most specific first
+COMMON_FORMATS = (
+  "%B %d, %Y",
+  "%b %d, %Y",
+  "%B %d %Y",
+  "%b %d %Y",
+  "%d %B %Y",
+  "%m/%d/%Y",
+  "%m/%d/%y",
+  "%m-%d-%Y",
+  "%m-%d-%y",
+  "%Y-%m-%d",
+  "%m.%d.%Y",
+  "%m.%d.%y",
+  "%B %Y",
+  "%b %Y",
+  "%B, %Y",
+  "%m/%Y",
+  "%Y",
+)
+
+SEPT = re.compile(r"\bSept\b", re.IGNORECASE)
+FISCAL_YEAR_PATTERN = re.compile(r"\b(?:FY|Fiscal\s+Year)\s*((?:19|20)\d\d)\b", re.IGNORECASE)
+
+MEMO_SIZE = 4096
+
+
+def names(values):
+  values = sorted((value.lower() for value in values if value), key=len, reverse=True)
+  return "|".join(re.escape(value) for value in values)
+
+# the same patterns strptime builds for each directive
+DIRECTIVES = {
+  'd': r"(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+  'm': r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+  'y': r"(?P<y>\d\d)",
+  'Y': r"(?P<Y>\d\d\d\d)",
+  'H': r"(?P<H>2[0-3]|[0-1]\d|\d)",
+  'I': r"(?P<I>1[0-2]|0[1-9]|[1-9])",
+  'M': r"(?P<M>[0-5]\d|\d)",
+  'S': r"(?P<S>6[0-1]|[0-5]\d|\d)",
+  'p': r"(?P<p>am|pm)",
+  'a': r"(?P<a>%s)" % names(calendar.day_abbr),
+  'A': r"(?P<A>%s)" % names(calendar.day_name),
+  'b': r"(?P<b>%s)" % names(calendar.month_abbr),
+  'B': r"(?P<B>%s)" % names(calendar.month_name),
+  'Z': r"(?P<Z>%s)" % names(["utc", "gmt"] + list(time.tzname)),
+  '%': "%",
+}
+
+MONTHS = dict((name.lower(), number) for number, name in enumerate(calendar.month_name) if name)
+MONTHS.update((name.lower(), number) for number, name in enumerate(calendar.month_abbr) if name)
+
+
+# A strptime format compiled into a regular expression.
+class Format(object):
+  def __init__(self, format):
+    self.format = format
+    pattern = []
+    directives = set()
+    pieces = re.split(r"(%.)", format)
+    for piece in pieces:
+      if piece.startswith("%") and len(piece) == 2:
+        if piece[1] not in DIRECTIVES:
+          raise ValueError("Unsupported directive %s in %r" % (piece, format))
+        pattern.append(DIRECTIVES[piece[1]])
+        directives.add(piece[1])
+      else:
+        # like strptime, any run of whitespace matches any other
+        pattern.append(r"\s+".join(re.escape(part) for part in re.split(r"\s+", piece)))
+    self.pattern = re.compile("".join(pattern), re.IGNORECASE)
+
+    if 'd' in directives:
+      self.precision = DAY
+    elif directives & set("mbB"):
+      self.precision = MONTH
+    else:
+      self.precision = YEAR
+
+  # the datetime strptime would return, or None where it would raise
+  def match(self, text):
+    match = self.pattern.fullmatch(text)
+    if not match:
+      return None
+    fields = match.groupdict()
+
+    year = 1900
+    if fields.get('Y'):
+      year = int(fields['Y'])
+    elif fields.get('y'):
+      year = int(fields['y'])
+      year += 2000 if year <= 68 else 1900
+
+    month = 1
+    if fields.get('m'):
+      month = int(fields['m'])
+    elif fields.get('B') or fields.get('b'):
+      month = MONTHS[(fields.get('B') or fields.get('b')).lower()]
+
+    hour = int(fields.get('H') or 0)
+    if fields.get('I'):
+      hour = int(fields['I'])
+      ampm = (fields.get('p') or "").lower()
+      if ampm == "am" and hour == 12:
+        hour = 0
+      elif ampm == "pm" and hour != 12:
+        hour += 12
+
+    try:
+      return datetime.datetime(
+        year, month, int(fields.get('d') or 1), hour,
+        int(fields.get('M') or 0), int(fields.get('S') or 0)
+      )
+    except ValueError:
+      # e.g. February 30th, which strptime rejects too
+      return None
+
+
+@functools.lru_cache(maxsize=None)
+def compiled(format):
+  return Format(format)
+
+# like datetime.strptime, but returns None instead of raising
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def strptime(text, format):
+  if not isinstance(text, str):
+    return None
+  return compiled(format).match(text)
+
+# the first of several formats that fits, or None
+def strptime_any(text, formats):
+  for format in formats:
+    result = strptime(text, format)
+    if result:
+      return result
+  return None
+
+# Parse a date out of a string, trying `formats` (a tuple) in order, then
+# looking for a fiscal year anywhere in it. Fiscal years start on October
+# 1st of the year before. Returns a ParsedDate, or None.
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def parse(text, formats=COMMON_FORMATS):
+  if not isinstance(text, str):
+    return None
+  # "Sept" is common, but isn't an abbreviation strptime knows
+  text = SEPT.sub("Sep", text.strip())
+
+  for format in formats:
+    result = strptime(text, format)
+    if result:
+      return ParsedDate(result, compiled(format).precision)
+
+  match = FISCAL_YEAR_PATTERN.search(text)
+  if match:
+    return ParsedDate(start_of_fiscal_year(match.group(1)), FISCAL_YEAR)
+  return None
+
+# January 1st of the year in text, or None if it isn't one
+def start_of_year(text):
+  text = text.strip()
+  if text.isdecimal() and (datetime.MINYEAR <= int(text) <= datetime.MAXYEAR):
+    return datetime.datetime(int(text), 1, 1)
+  return None
+
+# October 1st of the year before the fiscal year in text, or None
+def start_of_fiscal_year(text):
+  text = text.strip()
+  if text.isdecimal() and (datetime.MINYEAR < int(text) <= datetime.MAXYEAR):
+    return datetime.datetime(int(text) - 1, 10, 1)
+  return None
+
+def clear():
+  strptime.cache_clear()
+  parse.cache_clear()
+
+
+# Micro-benchmark against a strptime try/except chain:
+#
+#   python inspectors/utils/dates.py
+if __name__ == "__main__":
+  import timeit
+
+  samples = [
+    "11-30-2012", "March 3, 2014", "Sep 30, 2011", "02/14/13", "June 2010",
+    "2014-05-06", "FY 2013", "no date here", "12.01.2009", "Jan 5 2015",
+  ] * 50
+
+  def strptime_chain(text):
+    for format in COMMON_FORMATS:
+      try:
+        return datetime.datetime.strptime(text.strip(), format)
+      except ValueError:
+        pass
+
+  for sample in set(samples):
+    expected = strptime_chain(sample)
+    result = parse(sample)
+    if expected and (not result or result.datetime != expected):
+      raise Exception("%r: strptime gives %s, parse gives %s" % (sample, expected, result))
+
+  # compiled patterns alone, without memoizing anything
+  def compiled_only():
+    for sample in samples:
+      for format in COMMON_FORMATS:
+        if compiled(format).match(sample.strip()):
+          break
+
+  def warm():
+    for sample in samples:
+      parse(sample)
+
+  def chain():
+    for sample in samples:
+      strptime_chain(sample)
+
+  runs = 20
+  for name, function in (("strptime chain", chain), ("compiled patterns", compiled_only), ("compiled, memoized", warm)):
+    seconds = timeit.timeit(function, number=runs)
+    print("%-20s %8.1fus per string" % (name, 1000000 * seconds / (runs * len(samples))))
@@ -0,0 +1,226 @@
+import functools
+import hashlib
+import html
+import json
+import logging
+import platform
+import re
+import subprocess
+
+import bs4
+
+from . import dates
+
+# The tools and libraries used to get text and metadata out of reports.
+#
+# Each command line tool is looked for once per process, rather than on
+# every report, and its version is kept so it can be recorded next to
+# the text it produced (as `extracted_with` in report.json). That way,
+# reports can be found and extracted again when a tool changes.
+#
+# PDFs can also be extracted in-process with PyMuPDF, if it's installed
+# (pip install pymupdf). By default pdftotext is used when it's around,
+# since that's what existing text was made with; force a backend with
+# --pdf-backend=pdftotext or --pdf-backend=pymupdf.
+#
+# HTML is extracted by streaming it through Python's HTMLParser (see
+# html_text.py), which gives the same text as the old BeautifulSoup
+# extraction without building a tree; --html-backend=beautifulsoup
+# goes back to building one.
+
+try:
+  import fitz
+except ImportError:
+  fitz = None
+
+# how to ask each tool for its version
+TOOLS = {
+  "pdftotext": ["pdftotext", "-v"],
+  "pdfinfo": ["pdfinfo", "-v"],
+  "abiword": ["abiword", "--version"],
+  "file": ["file", "-v"],
+}
+
+# where to get each tool from, for the warning when it's missing
+INSTALL_HINTS = {
+  "pdftotext": "Install pdftotext to extract text!",
+  "pdfinfo": "Install pdfinfo to extract metadata!",
+  "abiword": "Install AbiWord to extract text!",
+  "file": "Install file to extract metadata!",
+}
+
+# text backends for each kind of file, preferred first
+TEXT_BACKENDS = {
+  "pdf": ("pdftotext", "pymupdf"),
+  "doc": ("abiword",),
+  "html": ("htmlstream", "beautifulsoup"),
+}
+
+VERSION_RE = re.compile(r"(\d+(?:\.\d+)+)")
+
+
+# The version of a command line tool, "" if it's there but won't say,
+# or None if it isn't installed. Only asked once per process.
+@functools.lru_cache(maxsize=None)
+def tool_version(name):
+  try:
+    process = subprocess.Popen(TOOLS[name], shell=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = process.communicate()[0].decode('utf-8', errors='replace')
+  except (FileNotFoundError, PermissionError):
+    return None
+
+  match = VERSION_RE.search(output)
+  return match.group(1) if match else ""
+
+# whether a tool is installed, warning (once) if it isn't
+@functools.lru_cache(maxsize=None)
+def has_tool(name):
+  if tool_version(name) is None:
+    logging.warn("%s The %s executable must be in a directory that is in your PATH environment variable." % (INSTALL_HINTS[name], name))
+    return False
+  return True
+
+def version_of(backend):
+  if backend in TOOLS:
+    return tool_version(backend)
+  elif backend == "pymupdf":
+    return fitz and (getattr(fitz, '__version__', None) or getattr(fitz, 'VersionBind', ""))
+  elif backend == "beautifulsoup":
+    return bs4.__version__
+  elif backend == "htmlstream":
+    # html.parser comes with Python, and entities are decoded like bs4 does
+    return "%s/%s" % (platform.python_version(), bs4.__version__)
+  return None
+
+def is_available(backend):
+  if backend in TOOLS:
+    return tool_version(backend) is not None
+  elif backend == "pymupdf":
+    return fitz is not None
+  return True
+
+# The backend to get text out of a kind of file with, or None if none of
+# them are available. `forced` picks one by name.
+@functools.lru_cache(maxsize=None)
+def text_backend(file_type, forced=None):
+  backends = TEXT_BACKENDS.get(file_type, ())
+  if forced and forced in backends:
+    backends = (forced,)
+
+  for backend in backends:
+    if is_available(backend):
+      return backend
+
+  # say which tool to install
+  if backends and backends[0] in TOOLS:
+    has_tool(backends[0])
+  return None
+
+# what to record in report.json about how text was extracted
+def described(backend):
+  return {'backend': backend, 'version': version_of(backend)}
+
+# Bump when the way reports are extracted here changes, so that reports
+# extracted the old way are extracted again.
+EXTRACTION_VERSION = 2
+
+# A hash of everything that decides what extracting a kind of file
+# produces: the backend, its version, and how it's run. If it and the
+# source file are unchanged, extracting again would give the same text.
+def config_hash(kind, backend):
+  config = {
+    'extraction_version': EXTRACTION_VERSION,
+    'kind': kind,
+    'backend': backend,
+    'version': version_of(backend),
+  }
+  return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+def file_hash(path):
+  digest = hashlib.sha256()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+# write the text of a PDF to text_path, in-process
+def text_with_pymupdf(pdf_path, text_path):
+  text, info = pdf_with_pymupdf(pdf_path)
+  with open(text_path, 'w', encoding='utf-8') as f:
+    f.write(text)
+
+
+# Single pass extraction: text and document info from one open of a PDF,
+# returned as (text, info). info has the page count, and the title,
+# author, keywords and creation/modification dates that are set, with
+# dates as raw PDF date strings ("D:20150105100203-05'00'").
+
+PDF_INFO_FIELDS = {
+  "Title": "title",
+  "Author": "author",
+  "Keywords": "keywords",
+  "CreationDate": "creation_date",
+  "ModDate": "modification_date",
+}
+
+def pdf_with_pymupdf(pdf_path):
+  document = fitz.open(pdf_path)
+  try:
+    pages = [page.get_text() for page in document]
+    metadata = document.metadata or {}
+  finally:
+    document.close()
+
+  info = {'page_count': len(pages)}
+  for name, key in (("title", "title"), ("author", "author"), ("keywords", "keywords"),
+                    ("creationDate", "creation_date"), ("modDate", "modification_date")):
+    if metadata.get(name):
+      info[key] = metadata[name]
+  # end every page with a form feed, like pdftotext does
+  return "".join(page + "\f" for page in pages), info
+
+# with -htmlmeta, pdftotext wraps the text in an HTML page that also
+# carries the document info, so one run gets both
+PDFTOTEXT_TITLE_RE = re.compile(r"<title>(.*?)</title>", re.S)
+PDFTOTEXT_META_RE = re.compile(r'<meta name="([^"]+)" content="([^"]*)"/?>')
+PDFTOTEXT_PRE_RE = re.compile(r"<pre>\n?(.*)</pre>", re.S)
+
+# `limits` runs the tool (see limits.py), if given
+def pdf_with_pdftotext(pdf_path, limits=None):
+  command = ["pdftotext", "-layout", "-htmlmeta", pdf_path, "-"]
+  if limits:
+    output = limits.run(command)
+  else:
+    output = subprocess.check_output(command, shell=False)
+  output = output.decode('utf-8', errors='replace')
+
+  head, separator, body = output.partition("<body>")
+  text_match = PDFTOTEXT_PRE_RE.search(body)
+  text = text_match.group(1) if text_match else ""
+
+  # pdftotext ends every page with a form feed
+  info = {'page_count': text.count("\f")}
+  title_match = PDFTOTEXT_TITLE_RE.search(head)
+  if title_match and title_match.group(1):
+    info['title'] = html.unescape(title_match.group(1))
+  for name, value in PDFTOTEXT_META_RE.findall(head):
+    if (name in PDF_INFO_FIELDS) and value:
+      info[PDF_INFO_FIELDS[name]] = html.unescape(value)
+  return text, info
+
+def pdf_with(backend, pdf_path, limits=None):
+  if backend == "pymupdf":
+    return pdf_with_pymupdf(pdf_path)
+  return pdf_with_pdftotext(pdf_path, limits)
+
+PDF_DATE_RE = re.compile(r"^(?:D:)?(\d{4})(\d{2})?(\d{2})?")
+
+# "D:20150105100203-05'00'" => "2015-01-05"
+def pdf_date(raw):
+  match = PDF_DATE_RE.match(raw.strip())
+  if not match:
+    return None
+  year, month, day = match.groups()
+  parsed = dates.strptime(year + (month or "01") + (day or "01"), "%Y%m%d")
+  return parsed and parsed.strftime("%Y-%m-%d")
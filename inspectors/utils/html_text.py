@@ -0,0 +1,211 @@
+import re
+from html.parser import HTMLParser
+
+from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+from bs4.dammit import EntitySubstitution
+
+# Streaming extraction of text from HTML reports.
+#
+# Gives the same text as building a BeautifulSoup tree with html.parser,
+# removing its <script> and <style> elements, and stripping and joining
+# the lines of what's left (see utils.text_from_html), but without
+# building the tree: the file is fed to an HTMLParser a chunk at a time,
+# text inside <script> and <style> is dropped as it goes by, and lines
+# are written out as soon as they're complete.
+#
+# HTMLParser doesn't always wait for the rest of a tag that's cut off by
+# the end of a chunk: cut off in a quoted attribute value, it gives up on
+# the tag, and reads it differently than it would have whole. So each
+# chunk is only fed to it up to the last "<" that isn't inside a tag (see
+# feed_end), and the rest is held back for the next one.
+#
+# To match BeautifulSoup exactly, this follows how it turns parser events
+# into strings: text between two tags is one string, a string that's only
+# whitespace becomes a single newline or space (except inside <pre> and
+# <textarea>), entities are decoded the way bs4 decodes them, and comments,
+# doctypes and processing instructions aren't text.
+
+CHUNK_SIZE = 64 * 1024
+# past this much, held back text is fed anyway
+MAX_HELD = 16 * CHUNK_SIZE
+
+SKIPPED_TAGS = ("script", "style")
+PRESERVE_WHITESPACE_TAGS = ("pre", "textarea")
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class TextExtractor(HTMLParser):
+  def __init__(self, output):
+    HTMLParser.__init__(self, convert_charrefs=False)
+    self.output = output
+    self.wrote_line = False
+    # the text of the current string, and the line it's part of
+    self.data = []
+    self.line = ""
+    # open tags, and how many of them are skipped or keep whitespace
+    self.open_tags = []
+    self.skipping = 0
+    self.preserving = 0
+
+  def handle_starttag(self, tag, attrs):
+    self.end_data()
+    self.open_tags.append(tag)
+    self.count(tag, 1)
+
+  def handle_startendtag(self, tag, attrs):
+    self.handle_starttag(tag, attrs)
+    self.handle_endtag(tag)
+
+  def handle_endtag(self, tag):
+    self.end_data()
+    # close everything left open inside it, if it's open at all
+    if tag in self.open_tags:
+      while True:
+        closed = self.open_tags.pop()
+        self.count(closed, -1)
+        if closed == tag:
+          break
+
+  def count(self, tag, change):
+    if tag in SKIPPED_TAGS:
+      self.skipping += change
+    if tag in PRESERVE_WHITESPACE_TAGS:
+      self.preserving += change
+
+  def handle_data(self, data):
+    self.data.append(data)
+
+  def handle_charref(self, name):
+    # newer versions of bs4 follow the HTML spec for these, and
+    # say what else came along after a malformed one
+    if hasattr(BeautifulSoupHTMLParser, '_dereference_numeric_character_reference'):
+      data, replaced, extra = BeautifulSoupHTMLParser._dereference_numeric_character_reference(name)
+      for text in (data, extra):
+        if text is not None:
+          self.handle_data(text)
+      return
+
+    if name.startswith(('x', 'X')):
+      code = int(name.lstrip('xX'), 16)
+    else:
+      code = int(name)
+
+    # numeric references under 256 are often meant as windows-1252
+    data = None
+    if code < 256:
+      try:
+        data = bytearray([code]).decode('windows-1252')
+      except UnicodeDecodeError:
+        pass
+    if not data:
+      try:
+        data = chr(code)
+      except (ValueError, OverflowError):
+        pass
+    self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+  def handle_entityref(self, name):
+    character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+    if character is None:
+      # not an entity, so it was meant literally
+      character = "&%s" % name
+    self.handle_data(character)
+
+  # comments, doctypes and processing instructions end a string,
+  # but aren't text themselves
+  def handle_comment(self, data):
+    self.end_data()
+
+  def handle_decl(self, data):
+    self.end_data()
+
+  def handle_pi(self, data):
+    self.end_data()
+
+  def unknown_decl(self, data):
+    self.end_data()
+    if data.upper().startswith("CDATA["):
+      self.data.append(data[len("CDATA["):])
+    self.end_data()
+
+  # finish the current string
+  def end_data(self):
+    if not self.data:
+      return
+    data = "".join(self.data)
+    self.data = []
+
+    if not self.preserving and not data.strip(ASCII_SPACES):
+      data = "\n" if "\n" in data else " "
+    if not self.skipping:
+      self.add_text(data)
+
+  # write out any lines that are complete
+  def add_text(self, text):
+    lines = (self.line + text).splitlines(True)
+    self.line = ""
+    if not lines:
+      return
+
+    # the last line isn't complete unless it ends in a line break, and
+    # even then a \r could turn out to be the start of \r\n
+    last = lines[-1]
+    if (last.splitlines() == [last]) or last.endswith("\r"):
+      self.line = lines.pop()
+    for line in lines:
+      self.write_line(line)
+
+  def write_line(self, line):
+    line = line.strip()
+    if not line:
+      return
+    if self.wrote_line:
+      self.output.write("\n")
+    self.output.write(line)
+    self.wrote_line = True
+
+  def close(self):
+    HTMLParser.close(self)
+    self.end_data()
+    self.write_line(self.line)
+    self.line = ""
+
+
+# the start of a tag, or what might be the end or a quote of one
+MARKUP = re.compile(r"""<[a-zA-Z]?|>|['"]""")
+
+# How much of text can be fed to the parser without cutting off a tag:
+# up to its last "<" that isn't inside a tag, assuming text doesn't start
+# inside one. Any quote in a tag is taken to start a quoted value, which
+# can only hold back more than needed, never less.
+def feed_end(text):
+  end = 0
+  in_tag = False
+  quote = None
+  for match in MARKUP.finditer(text):
+    token = match.group()
+    if quote:
+      if token == quote:
+        quote = None
+    elif in_tag:
+      if token == ">":
+        in_tag = False
+      elif token in ("'", '"'):
+        quote = token
+    elif token.startswith("<"):
+      end = match.start()
+      in_tag = (len(token) == 2)
+  return end
+
+# extract the text of the HTML file at html_path to text_path
+def extract(html_path, text_path):
+  with open(html_path, encoding='utf-8') as source, open(text_path, 'w', encoding='utf-8') as output:
+    parser = TextExtractor(output)
+    held = ""
+    for chunk in iter(lambda: source.read(CHUNK_SIZE), ""):
+      held += chunk
+      end = len(held) if (len(held) > MAX_HELD) else feed_end(held)
+      parser.feed(held[:end])
+      held = held[end:]
+    parser.feed(held)
+    parser.close()
@@ -1,18 +1,23 @@
 from utils import utils
 import os
+import json
 import re
 import logging
 import datetime
+import time
 import urllib.parse
 
 # Save a report to disk, provide output along the way.
 #
 # 1) download report to disk
-# 2) extract text from downloaded report using report['file_type']
+# 2) queue extraction of text from downloaded report using report['file_type']
 # 3) write report metadata to disk
 #
+# Extraction happens in a pool of worker processes while the scraper goes
+# on, and the report's metadata is written again once it's done.
+#
 # fields used: file_type, url, inspector, year, report_id
-# fields added: report_path, text_path
+# fields added: text_path, and pdf or doc metadata (after extraction)
 
 def save_report(report):
   options = utils.options()
@@ -29,10 +34,15 @@ def save_report(report):
 
   logging.warn("[%s][%s][%s]" % (report['type'], report['published_on'], report['report_id']))
 
+  # with packed storage, a report saved before is worked on loose again
+  if utils.packed_storage() and not options.get('dry_run'):
+    utils.data_store().unpack_report(report['inspector'], report['year'], report['report_id'])
+
+  extract_later = False
   if options.get('dry_run'):
     logging.warn('\tdry run: skipping download and extraction')
     if (not options.get('quick')) and report.get('url'):
-      utils.check_report_url(report['url'])
+      utils.url_checker.queue(report['url'])
   elif report.get('unreleased', False) is True:
     logging.warn('\tno download/extraction of unreleased report')
   else:
@@ -42,21 +52,108 @@ def save_report(report):
       return False
 
     logging.warn("\treport: %s" % report_path)
+    extract_later = True
 
-    metadata = extract_metadata(report)
-    if metadata:
-      for key, value in metadata.items():
-        logging.debug("\t%s: %s" % (key, value))
-
-    text_path = extract_report(report)
-    logging.warn("\ttext: %s" % text_path)
+    # carry over what an earlier run extracted, to reuse if unchanged
+    report.update(previous_extraction(report))
 
   data_path = write_report(report)
   logging.warn("\tdata: %s" % data_path)
 
+  # for --incremental, remember saving it
+  if extract_later or report.get('unreleased', False) is True:
+    utils.manifest_for(report['inspector']).seen(report, data_path)
+
+  # written again with text_path and metadata once extracted
+  if extract_later:
+    utils.extraction_pool.queue(extract, dict(report), finish_extraction)
+
   return True
 
 
+# With --incremental, whether a report was saved by an earlier run (and
+# is still on disk), found by any of its report_id, URL or landing page
+# URL. Scrapers can check before fetching a report's landing page, or
+# anything else they'd only need to save it again:
+#
+#   if inspector.already_have(landing_url=landing_url):
+#     return None
+#
+# Report IDs can come back in later years, so scrapers that know the
+# report's year should give it too.
+#
+# Without --incremental, it's always False.
+def already_have(report_id=None, url=None, landing_url=None, year=None, inspector=None):
+  if not utils.options().get('incremental'):
+    return False
+
+  manifest = utils.manifest_for(inspector or utils.current_inspector)
+  known = manifest.find(report_id=report_id, url=url, landing_url=landing_url, year=year)
+  if (not known) or not utils.data_store().exists(known['data_path']):
+    return False
+
+  logging.debug("[%s] Already have it, skipping." % known['report_id'])
+  manifest.touch(known['report_id'], known['year'])
+  return True
+
+
+# The page numbers of a listing that's sorted newest first, from `first`
+# through `last` (or until stop() is called):
+#
+#   pages = inspector.Paginator(1, 200)
+#   for page in pages:
+#     results = ...the reports listed on that page...
+#     if not results:
+#       pages.stop()
+#     for result in results:
+#       if pages.already_have(report_id=...):
+#         continue
+#       ...
+#
+# pages.already_have is inspector.already_have, but also keeps count. With
+# --incremental, once a page has only reports saved by earlier runs, the
+# rest of the listing can only be older, so the pages stop there. Extra
+# pages can be walked first with `grace` (or --grace-pages), for listings
+# that aren't strictly in order.
+class Paginator(object):
+  def __init__(self, first=1, last=None, grace=None):
+    self.first = first
+    self.last = last
+    if grace is None:
+      grace = utils.options().get('grace-pages', 0)
+    self.grace = int(grace)
+    self.stopped = False
+    # reports on the current page that were and weren't saved before
+    self.known = 0
+    self.new = 0
+
+  def __iter__(self):
+    page = self.first
+    known_pages = 0
+    while (not self.stopped) and ((self.last is None) or (page <= self.last)):
+      self.known = self.new = 0
+      yield page
+
+      if self.known and not self.new:
+        known_pages += 1
+        if known_pages > self.grace:
+          logging.warn("Stopping at page %s, already have everything from there on." % page)
+          break
+      else:
+        known_pages = 0
+      page += 1
+
+  def stop(self):
+    self.stopped = True
+
+  def already_have(self, report_id=None, url=None, landing_url=None, year=None):
+    if already_have(report_id=report_id, url=url, landing_url=landing_url, year=year):
+      self.known += 1
+      return True
+    self.new += 1
+    return False
+
+
 # Preprocess before validation, to catch cases where inference didn't work.
 # So, fields may be absent at this time.
 def preprocess_report(report):
@@ -153,6 +250,128 @@ def download_report(report):
   else:
     return None
 
+# Runs in an extraction worker: pull metadata and text out of a
+# downloaded report, and return the report with them added, along with
+# how it went and how long it took, in seconds (or None if skipped).
+# The status is one of:
+#
+#   extracted: metadata and text were extracted, as far as possible
+#   unchanged: the report file and the way it would be extracted are
+#     both unchanged since it was last extracted, so it was skipped
+#   over_limits: an extraction tool went over its limits (see limits.py)
+#   quarantined: the report file has gone over the limits too many
+#     times before, so it was skipped
+#
+# --force-extract extracts unchanged and quarantined reports anyway.
+def extract(report):
+  force = utils.options().get('force-extract')
+  kind = text_kind(report['file_type'])
+  report_path = path_for(report, report['file_type'])
+  hashes = None
+  if kind:
+    hashes = {
+      'source_hash': utils.file_hash(report_path),
+      'config_hash': utils.extraction_config_hash(kind),
+    }
+    if is_extracted(report, hashes) and not force:
+      logging.debug("\tunchanged, not extracting: %s" % report_path)
+      index_pages(report, kind)
+      index_text(report)
+      return report, "unchanged", None
+    if utils.extraction_quarantine.is_quarantined(hashes['source_hash']) and not force:
+      logging.warn("\tquarantined, not extracting: %s" % report_path)
+      return report, "quarantined", None
+
+  for field in EXTRACTION_FIELDS:
+    report.pop(field, None)
+
+  started = time.time()
+  try:
+    if report['file_type'].lower() == "pdf":
+      metadata, text_path = extract_pdf(report)
+    else:
+      metadata = extract_metadata(report)
+      text_path = extract_report(report)
+  except utils.limits.LimitExceeded as exception:
+    logging.warn("\tover extraction limits: %s (%s)" % (report_path, exception))
+    if hashes:
+      utils.extraction_quarantine.record(hashes['source_hash'], report_path, exception)
+    return report, "over_limits", time.time() - started
+  seconds = time.time() - started
+
+  if hashes:
+    utils.extraction_quarantine.release(hashes['source_hash'])
+
+  if metadata:
+    for key, value in metadata.items():
+      logging.debug("\t%s: %s" % (key, value))
+  if text_path:
+    report['text_path'] = text_path
+    if hashes and report.get('extracted_with'):
+      report['extracted_with'].update(hashes)
+    index_pages(report, kind)
+    index_text(report)
+  return report, "extracted", seconds
+
+# with --page-index, write where each page of a PDF's text starts
+def index_pages(report, kind):
+  if (kind != "pdf") or not utils.options().get('page-index'):
+    return
+  # still there from when the text was extracted
+  index_path = report.get('page_index_path')
+  if index_path and os.path.exists(os.path.join(utils.data_dir(), index_path)):
+    return
+  report['page_index_path'] = utils.page_index_for(report['text_path'])
+
+# with --search-index, add the report's text to the full-text index
+def index_text(report):
+  if not utils.options().get('search-index'):
+    return
+  index = utils.search_index()
+  if not index.is_indexed(report):
+    index.index(report, utils.data_dir())
+
+# Back in the scraper, once a report is extracted
+def finish_extraction(result):
+  report, status, seconds = result
+  utils.count_extraction(status, report['inspector'], path_for(report, report['file_type']), seconds)
+  if status == "over_limits":
+    logging.warn("[%s][%s][%s] over extraction limits, no text" % (report['type'], report['published_on'], report['report_id']))
+  elif status == "quarantined":
+    logging.warn("[%s][%s][%s] quarantined, no text" % (report['type'], report['published_on'], report['report_id']))
+  elif status == "unchanged":
+    logging.info("[%s][%s][%s] text unchanged: %s" % (report['type'], report['published_on'], report['report_id'], report.get('text_path')))
+  else:
+    logging.warn("[%s][%s][%s] text: %s" % (report['type'], report['published_on'], report['report_id'], report.get('text_path')))
+  data_path = write_report(report)
+
+  source_hash = (report.get('extracted_with') or {}).get('source_hash')
+  if source_hash:
+    utils.manifest_for(report['inspector']).seen(report, data_path, source_hash)
+
+# fields that extraction adds to a report
+EXTRACTION_FIELDS = ("text_path", "page_index_path", "pdf", "doc", "extracted_with")
+
+# the extraction fields from the report's JSON on disk, if any
+def previous_extraction(report):
+  data_path = os.path.join(utils.data_dir(), path_for(report, "json"))
+  try:
+    with open(data_path, encoding='utf-8') as f:
+      previous = json.load(f)
+  except (IOError, ValueError):
+    return {}
+  return dict((field, previous[field]) for field in EXTRACTION_FIELDS if field in previous)
+
+# whether the report's text was extracted from this same file,
+# the same way, and is still there
+def is_extracted(report, hashes):
+  extracted_with = report.get('extracted_with') or {}
+  for key, value in hashes.items():
+    if extracted_with.get(key) != value:
+      return False
+  text_path = report.get('text_path')
+  return bool(text_path) and os.path.exists(os.path.join(utils.data_dir(), text_path))
+
 FILE_EXTENSIONS_HTML = ("htm", "html", "cfm", "php", "asp", "aspx")
 
 def extract_metadata(report):
@@ -175,28 +394,53 @@ def extract_metadata(report):
     logging.warn("Unknown file type, don't know how to extract metadata!")
     return None
 
-# relies on putting text next to report_path
+# metadata and text from a PDF in a single pass
+def extract_pdf(report):
+  report_path = path_for(report, report['file_type'])
+  text_path, metadata = utils.text_and_metadata_from_pdf(report_path)
+  if metadata:
+    report['pdf'] = metadata
+  if text_path:
+    report['extracted_with'] = utils.extracted_with("pdf")
+  return metadata, text_path
+
+# what kind of file text is extracted from ("pdf", "doc" or "html"),
+# or None if there's no way to extract text from it
+def text_kind(file_type):
+  file_type_lower = file_type.lower()
+  if file_type_lower in ("pdf", "doc"):
+    return file_type_lower
+  elif file_type_lower in FILE_EXTENSIONS_HTML:
+    return "html"
+  return None
+
+# relies on putting text next to report_path, and records
+# which backend (and version of it) extracted the text
 def extract_report(report):
   report_path = path_for(report, report['file_type'])
 
-  file_type_lower = report['file_type'].lower()
-  if file_type_lower == "pdf":
-    return utils.text_from_pdf(report_path)
-  elif file_type_lower == "doc":
-    return utils.text_from_doc(report_path)
-  elif file_type_lower in FILE_EXTENSIONS_HTML:
-    return utils.text_from_html(report_path)
+  kind = text_kind(report['file_type'])
+  if kind == "pdf":
+    text_path = utils.text_from_pdf(report_path)
+  elif kind == "doc":
+    text_path = utils.text_from_doc(report_path)
+  elif kind == "html":
+    text_path = utils.text_from_html(report_path)
   else:
     logging.warn("Unknown file type, don't know how to extract text!")
     return None
 
+  if text_path:
+    report['extracted_with'] = utils.extracted_with(kind)
+  return text_path
+
+# writes the report's JSON, and updates its row in the catalog
 def write_report(report):
   data_path = path_for(report, "json")
+  real_data_path = os.path.join(utils.data_dir(), data_path)
 
-  utils.write(
-    utils.json_for(report),
-    os.path.join(utils.data_dir(), data_path)
-  )
+  utils.write(utils.json_for(report), real_data_path)
+  utils.report_catalog().upsert(report, os.path.dirname(real_data_path))
   return data_path
 
 
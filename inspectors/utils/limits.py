@@ -0,0 +1,168 @@
+import functools
+import logging
+import os
+import re
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+# Limits on the tools that extract text and metadata from reports.
+#
+# pdftotext, pdfinfo, abiword and file each run with a wall-clock timeout
+# and a cap on their address space, so one pathological file can't hang
+# or swamp a whole run. A tool that goes over either is killed, and the
+# file is noted in a quarantine list kept with the cache. Once a file has
+# gone over the limits a few times, later runs don't try it at all
+# (unless --force-extract is given). A file that changes gets a new hash,
+# and so a fresh start. Configure in admin.yml:
+#
+#   extraction:
+#     timeout: 300      # seconds per tool run
+#     memory: 2048      # megabytes of address space per tool run
+#     max_failures: 3   # times over the limits before a file is skipped
+#
+# The memory cap is set by running each tool through prlimit, or a shell
+# that sets `ulimit -v` before starting it, rather than in the forked
+# child before exec: scrapers run threads, and a forked copy of them
+# can't safely run Python code. On Windows, tools only get a timeout.
+#
+# A tool that crashes some other way (say, with a segfault) isn't over
+# the limits, and its file isn't quarantined: that's ToolCrashed, which
+# is reported like any other failed tool.
+
+DEFAULT_TIMEOUT = 5 * 60
+DEFAULT_MEMORY = 2048
+DEFAULT_MAX_FAILURES = 3
+
+# what tools say on their way out when they can't allocate memory
+OUT_OF_MEMORY = re.compile(
+  r"out of memory|cannot allocate memory|not enough memory|failed to allocate|bad_alloc",
+  re.IGNORECASE
+)
+
+
+# A tool took too long, or ran out of memory, while working on a file.
+class LimitExceeded(Exception):
+  pass
+
+# A tool was killed by a signal, other than for going over the limits.
+class ToolCrashed(subprocess.CalledProcessError):
+  def __str__(self):
+    return "Command '%s' crashed with %s" % (self.cmd[0], signal_name(-self.returncode))
+
+
+def signal_name(number):
+  try:
+    return signal.Signals(number).name
+  except (AttributeError, ValueError):
+    return "signal %i" % number
+
+@functools.lru_cache(maxsize=None)
+def prlimit():
+  return shutil.which("prlimit")
+
+
+class Limits(object):
+  def __init__(self, config=None):
+    config = config or {}
+    self.timeout = int(config.get('timeout', DEFAULT_TIMEOUT))
+    self.memory = int(config.get('memory', DEFAULT_MEMORY))
+    self.max_failures = int(config.get('max_failures', DEFAULT_MAX_FAILURES))
+
+  # the command, run so that it can't use more than the memory limit
+  def limited(self, command):
+    if (os.name != "posix") or (self.memory <= 0):
+      return command
+    if prlimit():
+      return [prlimit(), "--as=%i" % (self.memory * 1024 * 1024), "--"] + command
+    # if the limit can't be set, the tool still runs, just without it
+    return ["sh", "-c", 'ulimit -v %i 2>/dev/null; exec "$@"' % (self.memory * 1024), "sh"] + command
+
+  # Like subprocess.check_output, but within the limits: returns the
+  # tool's output, raises CalledProcessError if it fails (ToolCrashed if
+  # it crashes), and raises LimitExceeded if it runs too long or out of
+  # memory.
+  def run(self, command):
+    # in a process group of its own, so anything it starts is killed too
+    process = subprocess.Popen(self.limited(command), shell=False,
+      stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=(os.name == "posix"))
+    try:
+      output, errors = process.communicate(timeout=(self.timeout if self.timeout > 0 else None))
+    except subprocess.TimeoutExpired:
+      kill(process)
+      process.communicate()
+      raise LimitExceeded("%s took longer than %is" % (command[0], self.timeout))
+
+    # tools' warnings still go where they always did
+    errors = errors.decode('utf-8', errors='replace')
+    if errors:
+      sys.stderr.write(errors)
+
+    if process.returncode == 0:
+      return output
+    if (process.returncode == -getattr(signal, 'SIGKILL', 9)) or OUT_OF_MEMORY.search(errors):
+      # SIGKILL, from outside, is most likely the kernel's OOM killer
+      raise LimitExceeded("%s ran out of memory (limit %iMB)" % (command[0], self.memory))
+    if process.returncode < 0:
+      raise ToolCrashed(process.returncode, command, output)
+    raise subprocess.CalledProcessError(process.returncode, command, output)
+
+
+def kill(process):
+  if os.name == "posix":
+    try:
+      os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+      pass
+  else:
+    process.kill()
+
+
+# Files that have gone over the limits, by the hash of their contents.
+class Quarantine(object):
+  def __init__(self, path, max_failures=DEFAULT_MAX_FAILURES):
+    self.path = path
+    self.max_failures = max_failures
+    self.conn = None
+    self.pid = None
+
+  # extraction workers are separate processes, and each needs its own
+  def connection(self):
+    if (self.conn is None) or (self.pid != os.getpid()):
+      os.makedirs(os.path.dirname(self.path), exist_ok=True)
+      self.conn = sqlite3.connect(self.path, timeout=60)
+      self.conn.execute("CREATE TABLE IF NOT EXISTS quarantine (source_hash TEXT PRIMARY KEY, path TEXT, failures INTEGER, reason TEXT, failed_at REAL)")
+      self.conn.commit()
+      self.pid = os.getpid()
+    return self.conn
+
+  def failures(self, source_hash):
+    row = self.connection().execute(
+      "SELECT failures FROM quarantine WHERE source_hash = ?", (source_hash,)
+    ).fetchone()
+    return row[0] if row else 0
+
+  def is_quarantined(self, source_hash):
+    return self.failures(source_hash) >= self.max_failures
+
+  # note another time a file went over the limits, and return how many
+  # times it has now
+  def record(self, source_hash, path, reason):
+    failures = self.failures(source_hash) + 1
+    conn = self.connection()
+    with conn:
+      conn.execute("INSERT OR REPLACE INTO quarantine VALUES (?, ?, ?, ?, ?)",
+        (source_hash, path, failures, str(reason), time.time()))
+    if failures >= self.max_failures:
+      logging.warn("\tquarantined after %i failures, won't extract again: %s" % (failures, path))
+    return failures
+
+  # a file that was extracted fine after all
+  def release(self, source_hash):
+    if self.failures(source_hash):
+      conn = self.connection()
+      with conn:
+        conn.execute("DELETE FROM quarantine WHERE source_hash = ?", (source_hash,))
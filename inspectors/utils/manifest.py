@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import threading
+import time
+
+# A record of the reports each inspector's scraper has saved, kept in the
+# cache directory:
+#
+#   cache/usps/manifest.sqlite
+#
+# Each report is listed by its report_id and year (the same report_id can
+# be used again in another year), along with its URL and landing page
+# URL, where its JSON was written, the hash of its file once it's
+# extracted, and when it was first and last seen. With --incremental,
+# scrapers look reports up here (with inspector.already_have) before
+# fetching their landing pages, and skip the ones they already have.
+
+FILENAME = "manifest.sqlite"
+
+FIELDS = ("report_id", "url", "landing_url", "year", "data_path", "source_hash", "first_seen", "last_seen")
+
+
+class Manifest(object):
+  def __init__(self, path):
+    self.path = path
+    self.local = threading.local()
+    # lookups this run that found a report
+    self.hits = 0
+
+  # one connection per thread, and per process
+  def connection(self):
+    conn = getattr(self.local, 'conn', None)
+    if (conn is None) or (self.local.pid != os.getpid()):
+      os.makedirs(os.path.dirname(self.path), exist_ok=True)
+      conn = sqlite3.connect(self.path, timeout=60)
+      with conn:
+        # manifests from before the year was part of the key
+        if keyed_by_report_id(conn):
+          conn.execute("ALTER TABLE reports RENAME TO reports_by_id")
+          conn.execute("DROP INDEX IF EXISTS reports_url")
+          conn.execute("DROP INDEX IF EXISTS reports_landing_url")
+        conn.execute(
+          "CREATE TABLE IF NOT EXISTS reports (report_id TEXT, url TEXT, landing_url TEXT, "
+          "year INTEGER, data_path TEXT, source_hash TEXT, first_seen REAL, last_seen REAL, "
+          "PRIMARY KEY (report_id, year))"
+        )
+        if table_exists(conn, "reports_by_id"):
+          conn.execute("INSERT OR REPLACE INTO reports SELECT %s FROM reports_by_id" % ", ".join(FIELDS))
+          conn.execute("DROP TABLE reports_by_id")
+        conn.execute("CREATE INDEX IF NOT EXISTS reports_url ON reports (url)")
+        conn.execute("CREATE INDEX IF NOT EXISTS reports_landing_url ON reports (landing_url)")
+      self.local.conn = conn
+      self.local.pid = os.getpid()
+    return conn
+
+  # The report with any of the given report_id, url or landing_url, as a
+  # dict, or None if there isn't one. If a year is given, only a report
+  # from that year counts.
+  def find(self, report_id=None, url=None, landing_url=None, year=None):
+    for field, value in (("report_id", report_id), ("url", url), ("landing_url", landing_url)):
+      if value is None:
+        continue
+      query = "SELECT %s FROM reports WHERE %s = ?" % (", ".join(FIELDS), field)
+      params = (value,)
+      if year is not None:
+        query += " AND year = ?"
+        params += (int(year),)
+      row = self.connection().execute(query, params).fetchone()
+      if row:
+        return dict(zip(FIELDS, row))
+    return None
+
+  # note that a report was saved (or seen again), keeping the hash of its
+  # file from before if none is given
+  def seen(self, report, data_path, source_hash=None):
+    now = time.time()
+    year = int(report['year'])
+    conn = self.connection()
+    with conn:
+      conn.execute(
+        "INSERT OR REPLACE INTO reports (%s) VALUES (?, ?, ?, ?, ?, "
+        "COALESCE(?, (SELECT source_hash FROM reports WHERE report_id = ? AND year = ?)), "
+        "COALESCE((SELECT first_seen FROM reports WHERE report_id = ? AND year = ?), ?), ?)" % ", ".join(FIELDS),
+        (report['report_id'], report.get('url'), report.get('landing_url'), year, data_path,
+         source_hash, report['report_id'], year, report['report_id'], year, now, now)
+      )
+
+  def touch(self, report_id, year):
+    conn = self.connection()
+    with conn:
+      conn.execute("UPDATE reports SET last_seen = ? WHERE report_id = ? AND year = ?", (time.time(), report_id, year))
+    self.hits += 1
+
+def table_exists(conn, name):
+  return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+# whether the reports table is keyed by report_id alone
+def keyed_by_report_id(conn):
+  keys = [row[1] for row in conn.execute("PRAGMA table_info(reports)") if row[5]]
+  return keys == ["report_id"]
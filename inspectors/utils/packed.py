@@ -0,0 +1,447 @@
+import json
+import logging
+import os
+import shutil
+import struct
+import threading
+import warnings
+import zipfile
+import zlib
+
+from . import pages
+
+# Packed storage for the data directory. Instead of a directory for every
+# report, each inspector's year of reports is kept in one zip file:
+#
+#   data/usps/2014/14-002/report.json       (loose)
+#   data/usps/2014.zip -> 14-002/report.json (packed)
+#
+# so that copying, backing up or scanning the data is a few large,
+# sequential reads rather than a stat of every small file, and doesn't use
+# up inodes. A zip's central directory is an index of where each file
+# starts, so any one file can be read without reading the rest.
+#
+# Packs are only ever appended to. A report is added as a directory entry
+# ("14-002/") followed by its files, and a later copy of the same report
+# replaces everything from before it. The space used by old copies is
+# reclaimed with ./pack-data --compact. Appending writes a new central
+# directory over the old one, so it's done to a copy of the pack that
+# replaces it once it's complete: a run cut off partway leaves the old
+# pack as it was, and the loose copies are only removed after that.
+#
+# A report's text is stored uncompressed when it has a page index (see
+# pages.py), so its pages can be read straight from the pack.
+#
+# Reports are read through a Store, by the same paths as when they're
+# loose ("usps/2014/14-002/report.txt"). A loose copy of a report wins
+# over a packed one once it has its report.json; until then it's only a
+# partial download. With `storage: packed` in admin.yml, scrapers unpack
+# a report they're saving again, work on it loose like always, and pack
+# everything loose at the end of the run, leaving out reports whose packed
+# copy is unchanged. ./pack-data converts a data directory from one layout
+# to the other.
+
+EXTENSION = ".zip"
+
+# files that are already compressed are stored as-is
+COMPRESSED = (".pdf", ".doc", ".docx", ".ppt", ".pptx", ".zip", ".jpg", ".png")
+
+# files from an interrupted download, which stay loose
+PARTIAL = (".part", ".part.json")
+
+
+# how to store a file, given the names of the others in its report
+def compression_for(name, filenames=()):
+  if name.lower().endswith(COMPRESSED):
+    return zipfile.ZIP_STORED
+  if pages.index_path_for(name) in filenames:
+    return zipfile.ZIP_STORED
+  return zipfile.ZIP_DEFLATED
+
+# whether a report directory holds a report, rather than only the start of
+# a download
+def is_loose(report_dir):
+  return os.path.isfile(os.path.join(report_dir, "report.json"))
+
+# the names of the files in a report directory that get packed
+def packable_files(report_dir):
+  return sorted(
+    filename for filename in os.listdir(report_dir)
+    if os.path.isfile(os.path.join(report_dir, filename)) and not filename.endswith(PARTIAL)
+  )
+
+# write a file out to disk before it's swapped in for another
+def sync(path):
+  with open(path, 'ab') as f:
+    os.fsync(f.fileno())
+
+def file_crc(path):
+  crc = 0
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+      crc = zlib.crc32(chunk, crc)
+  return crc
+
+
+# One inspector's year of reports, in one zip.
+class Pack(object):
+  def __init__(self, path):
+    self.path = path
+    self.zip = None
+    # report_id -> {filename: ZipInfo}, for each report's latest copy
+    self.reports = {}
+
+  def open(self):
+    if self.zip is None:
+      self.zip = zipfile.ZipFile(self.path)
+      self.reports = live_reports(self.zip.infolist())
+    return self
+
+  def close(self):
+    if self.zip is not None:
+      self.zip.close()
+      self.zip = None
+
+  def info(self, report_id, filename):
+    return self.open().reports.get(report_id, {}).get(filename)
+
+  def report_ids(self):
+    return sorted(report_id for report_id, files in self.open().reports.items() if files)
+
+  def filenames(self, report_id):
+    return sorted(self.open().reports.get(report_id, {}))
+
+  def read(self, report_id, filename):
+    return self.open().zip.read(self.info(report_id, filename))
+
+  # Up to `length` bytes of a file from `start`. Files stored uncompressed
+  # are read from there directly, others are decompressed up to it.
+  def read_range(self, report_id, filename, start, length):
+    info = self.info(report_id, filename)
+    length = max(0, min(length, info.file_size - start))
+    if info.compress_type == zipfile.ZIP_STORED:
+      with open(self.path, 'rb') as f:
+        f.seek(info.header_offset)
+        header = f.read(zipfile.sizeFileHeader)
+        # the file's data follows its local header, name and extra field
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        f.seek(info.header_offset + len(header) + name_length + extra_length + start)
+        return f.read(length)
+    with self.open().zip.open(info) as f:
+      while start > 0:
+        skipped = len(f.read(min(start, 1024 * 1024)))
+        if not skipped:
+          break
+        start -= skipped
+      return f.read(length)
+
+  # whether a report's latest copy has the same files as report_dir
+  def holds(self, report_id, report_dir):
+    filenames = packable_files(report_dir)
+    if filenames != self.filenames(report_id):
+      return False
+    for filename in filenames:
+      path = os.path.join(report_dir, filename)
+      info = self.info(report_id, filename)
+      if (os.path.getsize(path) != info.file_size) or (file_crc(path) != info.CRC):
+        return False
+    return True
+
+  # write a report's latest copy out to report_dir
+  def extract(self, report_id, report_dir):
+    os.makedirs(report_dir, exist_ok=True)
+    for filename in self.filenames(report_id):
+      with open(os.path.join(report_dir, filename), 'wb') as f:
+        f.write(self.read(report_id, filename))
+
+  # Append the files in some report directories, named by report_id,
+  # leaving out any with nothing to pack. Returns the paths of the files
+  # that were packed.
+  def add(self, report_dirs):
+    self.close()
+    new_path = self.path + ".new"
+    if os.path.exists(self.path):
+      shutil.copyfile(self.path, new_path)
+    packed = []
+    try:
+      with warnings.catch_warnings():
+        # later copies of a report use the same names on purpose
+        warnings.simplefilter("ignore", UserWarning)
+        with zipfile.ZipFile(new_path, 'a') as zip:
+          for report_id, report_dir in report_dirs:
+            filenames = packable_files(report_dir)
+            if not filenames:
+              continue
+            zip.writestr(zipfile.ZipInfo(report_id + "/"), b"")
+            for filename in filenames:
+              path = os.path.join(report_dir, filename)
+              zip.write(path, "%s/%s" % (report_id, filename), compression_for(filename, filenames))
+              packed.append(path)
+      sync(new_path)
+    except BaseException:
+      if os.path.exists(new_path):
+        os.remove(new_path)
+      raise
+    os.replace(new_path, self.path)
+    return packed
+
+  # Write the pack again with only each report's latest copy. Returns how
+  # many bytes that saved.
+  def compact(self):
+    self.open()
+    before = os.path.getsize(self.path)
+    compact_path = self.path + ".compact"
+    try:
+      with zipfile.ZipFile(compact_path, 'w') as zip:
+        for report_id in self.report_ids():
+          zip.writestr(zipfile.ZipInfo(report_id + "/"), b"")
+          for filename in self.filenames(report_id):
+            info = self.info(report_id, filename)
+            zip.writestr(info, self.zip.read(info), info.compress_type)
+      sync(compact_path)
+    except BaseException:
+      if os.path.exists(compact_path):
+        os.remove(compact_path)
+      raise
+    self.close()
+    os.replace(compact_path, self.path)
+    return before - os.path.getsize(self.path)
+
+
+# The latest copy of each report in a zip's entries, in the order they
+# were written.
+def live_reports(infos):
+  reports = {}
+  for info in infos:
+    report_id, _, filename = info.filename.partition("/")
+    if not filename:
+      reports[report_id] = {}
+    else:
+      reports.setdefault(report_id, {})[filename] = info
+  return reports
+
+
+# Reads a data directory whether its reports are loose, packed or both, by
+# their paths relative to it.
+class Store(object):
+  def __init__(self, data_dir):
+    self.data_dir = data_dir
+    self.local = threading.local()
+
+  # open packs, one set per thread, and per process
+  def packs(self):
+    packs = getattr(self.local, 'packs', None)
+    if (packs is None) or (self.local.pid != os.getpid()):
+      packs = {}
+      self.local.packs = packs
+      self.local.pid = os.getpid()
+    return packs
+
+  def pack_path(self, inspector, year):
+    return os.path.join(self.data_dir, inspector, "%s%s" % (year, EXTENSION))
+
+  # The open pack for an inspector's year, or None if there isn't one. A
+  # pack that can't be read is logged, and left out like a missing one.
+  def pack(self, inspector, year):
+    path = self.pack_path(inspector, year)
+    try:
+      stat = os.stat(path)
+    except OSError:
+      return None
+    packs = self.packs()
+    key = (stat.st_mtime, stat.st_size)
+    if (path not in packs) or (packs[path][0] != key):
+      if (path in packs) and packs[path][1]:
+        packs[path][1].close()
+      try:
+        packs[path] = (key, Pack(path).open())
+      except zipfile.BadZipFile as exception:
+        logging.warn("Can't read %s, leaving it out: %s" % (path, exception))
+        packs[path] = (key, None)
+    return packs[path][1]
+
+  def close(self):
+    for key, pack in self.packs().values():
+      if pack:
+        pack.close()
+    self.packs().clear()
+
+  # The pack, report_id and filename for a path to a report's file, if
+  # that report is read from its pack, or None if it's read loose. All of
+  # a report's files come from the same copy of it, so a file that's only
+  # loose (or only packed) doesn't count for the other.
+  def packed(self, path):
+    parts = os.path.normpath(path).split(os.sep)
+    if len(parts) != 4:
+      return None
+    inspector, year, report_id, filename = parts
+    if is_loose(os.path.join(self.data_dir, inspector, year, report_id)):
+      return None
+    pack = self.pack(inspector, year)
+    if pack and pack.filenames(report_id):
+      return pack, report_id, filename
+    return None
+
+  def exists(self, path):
+    found = self.packed(path)
+    if found:
+      pack, report_id, filename = found
+      return pack.info(report_id, filename) is not None
+    return os.path.exists(os.path.join(self.data_dir, path))
+
+  # a file's contents, as bytes
+  def read(self, path):
+    found = self.packed(path)
+    if not found:
+      with open(os.path.join(self.data_dir, path), 'rb') as f:
+        return f.read()
+    pack, report_id, filename = found
+    if not pack.info(report_id, filename):
+      raise IOError("No such report file: %s" % path)
+    return pack.read(report_id, filename)
+
+  # up to `length` bytes of a file from `start`
+  def read_range(self, path, start, length):
+    found = self.packed(path)
+    if not found:
+      with open(os.path.join(self.data_dir, path), 'rb') as f:
+        f.seek(start)
+        return f.read(max(0, length))
+    pack, report_id, filename = found
+    if not pack.info(report_id, filename):
+      raise IOError("No such report file: %s" % path)
+    return pack.read_range(report_id, filename, start, length)
+
+  def read_text(self, path, errors='strict'):
+    return self.read(path).decode('utf-8', errors)
+
+  def read_json(self, path):
+    return json.loads(self.read_text(path))
+
+  # a file's size in bytes, or None if it isn't there
+  def size(self, path):
+    found = self.packed(path)
+    if found:
+      pack, report_id, filename = found
+      info = pack.info(report_id, filename)
+      return info.file_size if info else None
+    try:
+      return os.path.getsize(os.path.join(self.data_dir, path))
+    except OSError:
+      return None
+
+  # the years an inspector has reports for, loose or packed
+  def years(self, inspector):
+    inspector_dir = os.path.join(self.data_dir, inspector)
+    if not os.path.isdir(inspector_dir):
+      return []
+    years = set()
+    for name in os.listdir(inspector_dir):
+      if name.endswith(EXTENSION):
+        years.add(name[:-len(EXTENSION)])
+      elif os.path.isdir(os.path.join(inspector_dir, name)):
+        years.add(name)
+    return sorted(years)
+
+  # The directory of each of an inspector's reports, relative to the data
+  # directory ("usps/2014/14-002"), whether it's loose or packed.
+  def report_dirs(self, inspector):
+    for year in self.years(inspector):
+      report_ids = set()
+      year_dir = os.path.join(self.data_dir, inspector, year)
+      if os.path.isdir(year_dir):
+        report_ids.update(name for name in os.listdir(year_dir) if os.path.isdir(os.path.join(year_dir, name)))
+      pack = self.pack(inspector, year)
+      if pack:
+        report_ids.update(pack.report_ids())
+      for report_id in sorted(report_ids):
+        yield os.path.join(inspector, year, report_id)
+
+  # Make a loose copy of a packed report, to work on it. Returns whether
+  # there was one.
+  def unpack_report(self, inspector, year, report_id):
+    report_dir = os.path.join(self.data_dir, inspector, str(year), report_id)
+    if is_loose(report_dir):
+      return False
+    pack = self.pack(inspector, str(year))
+    if not (pack and pack.filenames(report_id)):
+      return False
+    pack.extract(report_id, report_dir)
+    return True
+
+  # Append an inspector's loose reports to its packs, and remove the loose
+  # copies (unless `keep`). Reports the packs already hold as they are
+  # aren't appended again, and partial downloads stay loose. Returns how
+  # many reports were packed.
+  def pack_inspector(self, inspector, keep=False):
+    count = 0
+    for year in self.years(inspector):
+      year_dir = os.path.join(self.data_dir, inspector, year)
+      if not os.path.isdir(year_dir):
+        continue
+      report_dirs = [(report_id, os.path.join(year_dir, report_id)) for report_id in sorted(os.listdir(year_dir))]
+      report_dirs = [(report_id, report_dir) for report_id, report_dir in report_dirs if is_loose(report_dir)]
+
+      pack = self.pack(inspector, year)
+      if (not pack) and os.path.exists(self.pack_path(inspector, year)):
+        # can't be read, so leave everything loose rather than add to it
+        continue
+      changed, unchanged = [], []
+      for report_id, report_dir in report_dirs:
+        if pack and pack.holds(report_id, report_dir):
+          unchanged.append(report_dir)
+        else:
+          changed.append((report_id, report_dir))
+
+      if pack:
+        pack.close()
+      packed = []
+      if changed:
+        packed = Pack(self.pack_path(inspector, year)).add(changed)
+        count += len(changed)
+      if not keep:
+        for report_dir in unchanged:
+          packed.extend(os.path.join(report_dir, filename) for filename in packable_files(report_dir))
+        for path in packed:
+          os.remove(path)
+        remove_empty(year_dir)
+    return count
+
+  # Write an inspector's packed reports out loose, and remove the packs
+  # (unless `keep`). Reports that are already loose are left alone.
+  # Returns how many reports were unpacked.
+  def unpack_inspector(self, inspector, keep=False):
+    count = 0
+    for year in self.years(inspector):
+      pack = self.pack(inspector, year)
+      if not pack:
+        continue
+      for report_id in pack.report_ids():
+        if self.unpack_report(inspector, year, report_id):
+          count += 1
+      pack.close()
+      if not keep:
+        os.remove(pack.path)
+        logging.info("Removed %s" % pack.path)
+    self.close()
+    return count
+
+  def compact_inspector(self, inspector):
+    saved = 0
+    for year in self.years(inspector):
+      pack = self.pack(inspector, year)
+      if pack:
+        saved += pack.compact()
+    self.close()
+    return saved
+
+
+# remove a directory and the empty directories in it, leaving anything
+# still in it (like a partial download)
+def remove_empty(path):
+  for name in os.listdir(path):
+    sub_path = os.path.join(path, name)
+    if os.path.isdir(sub_path):
+      remove_empty(sub_path)
+  if not os.listdir(path):
+    os.rmdir(path)
@@ -0,0 +1,85 @@
+import json
+import os
+
+# Page-level access to extracted text.
+#
+# pdftotext ends each page of text with a form feed, so a report's text
+# file keeps its page boundaries. With --page-index, an index of where each
+# page starts is written next to it:
+#
+#   data/usps/2014/sar-2014-1/report.txt
+#   data/usps/2014/sar-2014-1/report.pages.json
+#
+# The index is a JSON list of byte offsets, one per page plus the end of
+# the last page, so page n (counting from 1) is the bytes from offsets[n-1]
+# up to offsets[n], not including its form feed. Reading a page seeks
+# straight to it:
+#
+#   pages.page_text("data/.../report.txt", 12)        # page 12
+#   pages.page_text("data/.../report.txt", 12, 15)    # pages 12 to 15
+#
+# To read reports that may be packed (see packed.py), give a Store and
+# paths relative to its data directory, like the text_path in report.json:
+#
+#   pages.page_text(report['text_path'], 12, store=utils.data_store())
+
+PAGE_BREAK = b"\f"
+CHUNK_SIZE = 1024 * 1024
+
+
+def index_path_for(text_path):
+  return "%s.pages.json" % os.path.splitext(text_path)[0]
+
+# byte offsets of the start of each page, and the end of the last one
+def offsets_for(text_path):
+  offsets = [0]
+  position = 0
+  with open(text_path, 'rb') as f:
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+      start = 0
+      while True:
+        found = chunk.find(PAGE_BREAK, start)
+        if found < 0:
+          break
+        offsets.append(position + found + 1)
+        start = found + 1
+      position += len(chunk)
+
+  # text after the last page break is one more page, if there is any
+  if position > offsets[-1]:
+    offsets.append(position + 1)
+  return offsets
+
+def write_index(text_path, index_path=None):
+  index_path = index_path or index_path_for(text_path)
+  with open(index_path, 'w') as f:
+    json.dump(offsets_for(text_path), f, separators=(",", ":"))
+  return index_path
+
+def read_index(text_path, index_path=None, store=None):
+  index_path = index_path or index_path_for(text_path)
+  if store:
+    return store.read_json(index_path)
+  with open(index_path) as f:
+    return json.load(f)
+
+def page_count(text_path, index_path=None, store=None):
+  return len(read_index(text_path, index_path, store)) - 1
+
+# the text of pages first through last, joined by form feeds
+def page_text(text_path, first, last=None, index_path=None, store=None):
+  offsets = read_index(text_path, index_path, store)
+  last = last or first
+  if (first < 1) or (last < first) or (last >= len(offsets)):
+    raise IndexError("No pages %i-%i in %s, which has %i" % (first, last, text_path, len(offsets) - 1))
+
+  start = offsets[first - 1]
+  # leave off the last page's form feed
+  end = offsets[last] - 1
+  if store:
+    text = store.read_range(text_path, start, end - start)
+  else:
+    with open(text_path, 'rb') as f:
+      f.seek(start)
+      text = f.read(max(0, end - start))
+  return text.decode('utf-8', errors='replace')
@@ -0,0 +1,158 @@
+import functools
+import re
+import threading
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+# HTML parsing for scrapers, through one helper (utils.soup) instead of
+# calling BeautifulSoup directly, so that:
+#
+# * every page is built with the same tree builder, named once per run
+#   instead of left to whatever bs4 picks page by page. That's lxml when
+#   it's installed, which is several times faster than Python's
+#   html.parser. Without it, parsers are tried in bs4's own order
+#   (html5lib, then html.parser), so a page's tree only changes if the
+#   parser is forced with --parser, e.g. --parser=html.parser.
+# * CSS selectors are compiled once per process, not on every select().
+# * scrapers can ask for just the region of a page they read, see below.
+# * time spent building trees is counted, and reported at the end of a run.
+
+# bs4's own order of preference
+PARSERS = ("lxml", "html5lib", "html.parser")
+
+
+class ParserUnavailable(Exception):
+  pass
+
+
+@functools.lru_cache(maxsize=None)
+def is_installed(parser):
+  return builder_registry.lookup(parser) is not None
+
+def default_parser():
+  for parser in PARSERS:
+    if is_installed(parser):
+      return parser
+  raise ParserUnavailable("No HTML parser is installed for BeautifulSoup")
+
+# the parser to use, honoring a forced one
+def parser_for(forced=None):
+  if not forced:
+    return default_parser()
+  if not is_installed(forced):
+    raise ParserUnavailable("HTML parser %s is not installed" % forced)
+  return forced
+
+
+# Compiled CSS selectors, for bs4 versions that match through soupsieve.
+try:
+  import soupsieve
+except ImportError:
+  soupsieve = None
+
+@functools.lru_cache(maxsize=512)
+def compiled(selector):
+  return soupsieve.compile(selector)
+
+def select(node, selector):
+  if soupsieve is None:
+    return node.select(selector)
+  return compiled(selector).select(node)
+
+def select_one(node, selector):
+  if soupsieve is None:
+    results = node.select(selector)
+    return results[0] if results else None
+  return compiled(selector).select_one(node)
+
+
+# Region filters, so only the part of a page a scraper reads is built
+# into a tree. A region is given as a simple selector:
+#
+#   "#leftContentInterior", "div#CS_Element_eximpagemaincontent",
+#   ".views-row", "li.pager-item", 'table[summary~="reports"]'
+#
+# Every element matching it is kept, along with everything inside it, and
+# the rest of the page is skipped. Several regions can be given in a list
+# if they're picked out by the same attribute. That's matched loosely
+# (["li.pager-item", "div.views-row"] also keeps any li.views-row), which
+# is fine as long as scrapers still select() what they want afterwards.
+#
+# html5lib can't skip parts of a page, and builds the whole tree anyway.
+
+SIMPLE_SELECTOR = re.compile(
+  r'^([a-zA-Z][\w-]*)?'
+  r'(?:#([\w-]+)|\.([\w-]+)|\[([\w-]+)(~?=)"?([^"\]]*)"?\])?$'
+)
+
+# the attribute a simple selector matches on, and the value it wants
+def region_from(selector):
+  match = SIMPLE_SELECTOR.match(selector.strip())
+  if not match or not any(match.groups()):
+    raise ValueError("Can't filter a page down to %r, use a simple selector" % selector)
+
+  name, element_id, class_name, attribute, operator, value = match.groups()
+  if element_id:
+    return name, 'id', element_id, False
+  elif class_name:
+    return name, 'class', class_name, True
+  elif attribute:
+    return name, attribute, value, (operator == "~=")
+  else:
+    return name, None, None, False
+
+@functools.lru_cache(maxsize=128)
+def strainer(regions):
+  if isinstance(regions, str):
+    regions = (regions,)
+  regions = [region_from(region) for region in regions]
+
+  attributes = set(attribute for name, attribute, value, word in regions)
+  if len(attributes) > 1:
+    names = ", ".join(sorted(str(attribute) for attribute in attributes))
+    raise ValueError("Regions must all be picked out by the same attribute, not %s" % names)
+  attribute = attributes.pop()
+
+  names = [name for name, attribute, value, word in regions]
+  if None in names:
+    names = None
+
+  attrs = {}
+  if attribute:
+    values = "|".join(sorted(set(re.escape(value) for name, attribute, value, word in regions)))
+    if any(word for name, attribute, value, word in regions):
+      # one of a space-separated list of words, e.g. class="views-row odd"
+      attrs[attribute] = re.compile(r"(^|\s)(%s)(\s|$)" % values)
+    else:
+      attrs[attribute] = re.compile(r"^(%s)$" % values)
+
+  return SoupStrainer(names, attrs=attrs)
+
+
+# Counts pages parsed and time spent parsing them, per parser.
+class ParseTimer(object):
+  def __init__(self):
+    self.stats = {}
+    self.lock = threading.Lock()
+
+  def parse(self, body, parser, **kwargs):
+    started = time.perf_counter()
+    doc = BeautifulSoup(body, parser, **kwargs)
+    elapsed = time.perf_counter() - started
+
+    with self.lock:
+      counts = self.stats.setdefault(parser, {'pages': 0, 'seconds': 0.0, 'slowest': 0.0})
+      counts['pages'] += 1
+      counts['seconds'] += elapsed
+      counts['slowest'] = max(counts['slowest'], elapsed)
+    return doc
+
+  def parse_stats(self):
+    with self.lock:
+      return dict((parser, dict(counts)) for parser, counts in self.stats.items())
+
+  def reset(self):
+    with self.lock:
+      self.stats = {}
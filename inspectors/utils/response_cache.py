@@ -0,0 +1,303 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+import requests
+
+# A persistent cache of HTTP responses for listing and landing pages.
+#
+# Entries are keyed by a hash of the request's method, URL and body, and
+# point at response bodies stored by the hash of their content, so pages
+# that come back identical are only stored once:
+#
+#   cache/http/index.sqlite
+#   cache/http/bodies/3f/3f9a...
+#
+# An entry is only served as-is while it is younger than the TTL in effect
+# for the running inspector. Once it's older, the page is requested again
+# with If-None-Match/If-Modified-Since built from the stored ETag and
+# Last-Modified headers, and a 304 is answered from the stored body.
+#
+# The total size of stored bodies is capped, with the least recently used
+# entries evicted first. Configure in admin.yml:
+#
+#   http_cache:
+#     ttl: 43200        # seconds, default for all inspectors
+#     max_size: 512     # megabytes
+#     inspectors:
+#       gao: 86400
+
+DEFAULT_TTL = 12 * 60 * 60
+DEFAULT_MAX_SIZE = 512
+
+# only text responses are cached; reports themselves are saved to data/
+TEXT_TYPES = ("text/", "html", "xml", "json", "javascript")
+
+# these describe the response on the wire, not the decoded body we store
+DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+# Return a cache key for a request, or None if it shouldn't be cached.
+def key_for(method, url, **kwargs):
+  if method.upper() not in ("GET", "POST") or kwargs.get('stream'):
+    return None
+  return request_key(method, url, **kwargs)
+
+# the request as it will go out, with the full URL and encoded body
+def prepare(method, url, **kwargs):
+  # form data in a dict has no stable order, so sort it before encoding
+  data = kwargs.get('data')
+  if isinstance(data, dict):
+    data = sorted(data.items())
+
+  return requests.Request(
+    method=method.upper(), url=url, params=kwargs.get('params'),
+    data=data, json=kwargs.get('json'), headers=kwargs.get('headers')
+  ).prepare()
+
+def body_of(prepared):
+  body = prepared.body or b""
+  if isinstance(body, str):
+    body = body.encode('utf-8')
+  return body
+
+# a hash of a request's method, URL and body, and its Range header if it
+# asks for part of the response
+def request_key(method, url, **kwargs):
+  prepared = prepare(method, url, **kwargs)
+
+  digest = hashlib.sha256()
+  digest.update(prepared.method.encode('utf-8') + b"\n")
+  digest.update(prepared.url.encode('utf-8') + b"\n")
+  digest.update(body_of(prepared))
+  if prepared.headers.get('Range'):
+    digest.update(b"\nRange: " + prepared.headers['Range'].encode('utf-8'))
+  return digest.hexdigest()
+
+def is_text(response):
+  content_type = response.headers.get('content-type', "").lower()
+  return any(text_type in content_type for text_type in TEXT_TYPES)
+
+
+class ResponseCache(object):
+  def __init__(self, directory, config=None):
+    config = config or {}
+    self.directory = directory
+    self.default_ttl = int(config.get('ttl', DEFAULT_TTL))
+    self.inspector_ttls = config.get('inspectors') or {}
+    self.max_size = int(config.get('max_size', DEFAULT_MAX_SIZE)) * 1024 * 1024
+    self.size = None
+    self.statuses = {}
+    self.local = threading.local()
+    self.lock = threading.Lock()
+
+  def ttl_for(self, inspector):
+    return int(self.inspector_ttls.get(inspector, self.default_ttl))
+
+  # one connection per thread, created on first use
+  def connection(self):
+    conn = getattr(self.local, 'conn', None)
+    if conn is None:
+      os.makedirs(os.path.join(self.directory, "bodies"), exist_ok=True)
+      conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=60)
+      conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY, url TEXT, status INTEGER, encoding TEXT,
+        headers TEXT, digest TEXT, size INTEGER,
+        fetched_at REAL, used_at REAL
+      )""")
+      conn.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+      conn.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+      conn.commit()
+      self.local.conn = conn
+    return conn
+
+  def body_path(self, digest):
+    return os.path.join(self.directory, "bodies", digest[:2], digest)
+
+  # Return the cached response for key, however old it is. Its age
+  # in seconds is set as `response.age`.
+  def get(self, key):
+    if not key:
+      return None
+
+    conn = self.connection()
+    row = conn.execute(
+      "SELECT url, status, encoding, headers, digest, fetched_at FROM entries WHERE key = ?",
+      (key,)
+    ).fetchone()
+    if not row:
+      return None
+
+    url, status, encoding, headers, digest, fetched_at = row
+    try:
+      with open(self.body_path(digest), 'rb') as f:
+        content = f.read()
+    except IOError:
+      return None
+
+    with conn:
+      conn.execute("UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+
+    response = requests.Response()
+    response._content = content
+    response.status_code = status
+    response.encoding = encoding
+    response.headers = requests.structures.CaseInsensitiveDict(json.loads(headers))
+    response.url = url
+    response.fromcache = True
+    response.age = time.time() - fetched_at
+    return response
+
+  # conditional request headers to revalidate a cached response
+  def validators(self, response):
+    headers = {}
+    if response.headers.get('etag'):
+      headers['If-None-Match'] = response.headers['etag']
+    if response.headers.get('last-modified'):
+      headers['If-Modified-Since'] = response.headers['last-modified']
+    return headers
+
+  # the server says a cached response is still current
+  def revalidated(self, key):
+    now = time.time()
+    conn = self.connection()
+    with conn:
+      conn.execute("UPDATE entries SET fetched_at = ?, used_at = ? WHERE key = ?", (now, now, key))
+
+  # count the status codes of requests for cacheable pages, per host
+  def count(self, url, status_code):
+    host = urllib.parse.urlparse(url).hostname
+    with self.lock:
+      counts = self.statuses.setdefault(host, {})
+      counts[status_code] = counts.get(status_code, 0) + 1
+
+  def status_counts(self):
+    with self.lock:
+      return dict((host, dict(counts)) for host, counts in self.statuses.items())
+
+  def reset(self):
+    with self.lock:
+      self.statuses = {}
+
+  def set(self, key, response):
+    if not key or response.status_code != 200 or not is_text(response):
+      return
+
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()
+    path = self.body_path(digest)
+    new_body = not os.path.exists(path)
+    if new_body:
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      temp_path = "%s.%i.%i.tmp" % (path, os.getpid(), threading.get_ident())
+      with open(temp_path, 'wb') as f:
+        f.write(content)
+      os.replace(temp_path, path)
+
+    headers = dict((name, value) for name, value in response.headers.items()
+                   if name.lower() not in DROPPED_HEADERS)
+    now = time.time()
+    conn = self.connection()
+    with conn:
+      conn.execute(
+        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, response.url, response.status_code, response.encoding,
+         json.dumps(headers), digest, len(content), now, now)
+      )
+
+    self.grow(len(content) if new_body else 0)
+    if self.size > self.max_size:
+      self.evict()
+
+  # keep a running total of stored bytes, counted once per process
+  def grow(self, size):
+    with self.lock:
+      if self.size is None:
+        self.size = self.total_size()
+      else:
+        self.size += size
+
+  def total_size(self):
+    row = self.connection().execute(
+      "SELECT SUM(size) FROM (SELECT DISTINCT digest, size FROM entries)"
+    ).fetchone()
+    return row[0] or 0
+
+  # drop least recently used entries (and bodies no longer referenced)
+  # until the cache is back under 90% of its size cap
+  def evict(self):
+    conn = self.connection()
+    with self.lock:
+      total = self.total_size()
+      target = self.max_size * 0.9
+      rows = conn.execute("SELECT key, digest, size FROM entries ORDER BY used_at").fetchall()
+      evicted = 0
+      for key, digest, size in rows:
+        if total <= target:
+          break
+        with conn:
+          conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        evicted += 1
+        if not conn.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+          try:
+            os.remove(self.body_path(digest))
+          except OSError:
+            pass
+          total -= size
+      self.size = total
+    logging.info("## Evicted %i entries from the response cache" % evicted)
+
+
+# An in-process memo of downloaded pages, so that a scraper fetching the
+# same page twice in one run (e.g. once to find pagination links, and again
+# to read its reports) only fetches it once. Least recently used pages are
+# dropped once the memo holds more than max_size characters.
+class Memo(object):
+  def __init__(self, max_size):
+    self.max_size = max_size
+    self.size = 0
+    self.pages = OrderedDict()
+    self.hits = {}
+    self.misses = 0
+    self.lock = threading.Lock()
+
+  def get(self, url):
+    with self.lock:
+      body = self.pages.get(url)
+      if body is None:
+        self.misses += 1
+        return None
+      self.pages.move_to_end(url)
+      host = urllib.parse.urlparse(url).hostname
+      self.hits[host] = self.hits.get(host, 0) + 1
+      return body
+
+  def set(self, url, body):
+    if len(body) > self.max_size:
+      return
+    with self.lock:
+      if url in self.pages:
+        self.size -= len(self.pages.pop(url))
+      self.pages[url] = body
+      self.size += len(body)
+      while self.size > self.max_size:
+        old_url, old_body = self.pages.popitem(last=False)
+        self.size -= len(old_body)
+
+  # hits per host, and total misses, since the last clear
+  def stats(self):
+    with self.lock:
+      return dict(self.hits), self.misses
+
+  def clear(self):
+    with self.lock:
+      self.pages = OrderedDict()
+      self.size = 0
+      self.hits = {}
+      self.misses = 0
@@ -0,0 +1,209 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import packed
+
+# A full-text index of the text extracted from reports, using SQLite's
+# FTS5 extension, kept next to the reports:
+#
+#   data/search.sqlite
+#
+# With --search-index, scrapers add each report's text as it's extracted.
+# An index for reports already on disk can be built with
+# ./rebuild-search-index, and searched with ./search-reports:
+#
+#   ./search-reports "hurricane sandy" --inspector=dhs --year=2014
+#
+# Queries use FTS5's syntax: words must all appear, "quoted phrases" must
+# appear as written, and OR, NOT and prefix* work as expected. Hits are
+# ranked by BM25, with a snippet of the text around the match.
+
+FILENAME = "search.sqlite"
+
+# report fields kept alongside the text, to filter and show results by
+FIELDS = ("inspector", "year", "report_id", "type", "title", "published_on", "text_path", "source_hash")
+
+# reports read by a worker at a time when building the whole index, and
+# indexed in one transaction
+CHUNK_SIZE = 100
+
+
+class FTSUnavailable(Exception):
+  pass
+
+
+# The fields and text of the reports in some directories (relative to
+# data_dir, loose or packed) that have text, as (fields, text). Runs in
+# worker processes during a rebuild.
+def read(report_dirs, data_dir):
+  store = packed.Store(data_dir)
+  documents = []
+  for report_dir in report_dirs:
+    try:
+      report = store.read_json(os.path.join(report_dir, "report.json"))
+    except (IOError, ValueError):
+      continue
+    text = text_for(report, data_dir, store)
+    if text is not None:
+      documents.append((fields_for(report), text))
+  store.close()
+  return documents
+
+def fields_for(report):
+  source_hash = (report.get('extracted_with') or {}).get('source_hash')
+  return tuple(source_hash if field == "source_hash" else report.get(field) for field in FIELDS)
+
+def text_for(report, data_dir, store=None):
+  if not report.get('text_path'):
+    return None
+  store = store or packed.Store(data_dir)
+  try:
+    return store.read_text(report['text_path'], errors='replace')
+  except IOError:
+    return None
+
+
+class SearchIndex(object):
+  def __init__(self, path):
+    self.path = path
+    self.local = threading.local()
+
+  # one connection per thread, and per process
+  def connection(self):
+    conn = getattr(self.local, 'conn', None)
+    if (conn is None) or (self.local.pid != os.getpid()):
+      os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+      conn = sqlite3.connect(self.path, timeout=60)
+      conn.execute("PRAGMA journal_mode=WAL")
+      conn.execute("PRAGMA synchronous=NORMAL")
+      self.create(conn)
+      self.local.conn = conn
+      self.local.pid = os.getpid()
+    return conn
+
+  # Reports are rows in `documents`, and their text is the row in `texts`
+  # with the same rowid. Filtering and replacing reports is done on
+  # `documents`, which can be indexed normally.
+  def create(self, conn):
+    try:
+      with conn:
+        conn.execute(
+          "CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY, %s, "
+          "UNIQUE (inspector, year, report_id))" % ", ".join(FIELDS)
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS documents_year ON documents (year)")
+        conn.execute("CREATE INDEX IF NOT EXISTS documents_type ON documents (type)")
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS texts USING fts5(title, text, tokenize='porter unicode61')")
+    except sqlite3.OperationalError as exception:
+      if "fts5" in str(exception):
+        raise FTSUnavailable("The SQLite library Python uses wasn't built with FTS5, needed for the search index.")
+      raise
+
+  # whether the report's text is indexed, from the same report file
+  def is_indexed(self, report):
+    inspector, year, report_id = report.get('inspector'), report.get('year'), report.get('report_id')
+    row = self.connection().execute(
+      "SELECT source_hash FROM documents WHERE inspector = ? AND year = ? AND report_id = ?",
+      (inspector, year, report_id)
+    ).fetchone()
+    return bool(row) and (row[0] == fields_for(report)[FIELDS.index("source_hash")])
+
+  def add(self, conn, fields, text):
+    key = fields[:3]
+    row = conn.execute("SELECT id FROM documents WHERE inspector = ? AND year = ? AND report_id = ?", key).fetchone()
+    if row:
+      conn.execute("DELETE FROM texts WHERE rowid = ?", row)
+      conn.execute("DELETE FROM documents WHERE id = ?", row)
+    cursor = conn.execute(
+      "INSERT INTO documents (%s) VALUES (%s)" % (", ".join(FIELDS), ", ".join("?" for field in FIELDS)),
+      fields
+    )
+    conn.execute("INSERT INTO texts (rowid, title, text) VALUES (?, ?, ?)",
+      (cursor.lastrowid, fields[FIELDS.index("title")], text))
+
+  # add or replace a report's text, reading it from its text_path
+  def index(self, report, data_dir):
+    text = text_for(report, data_dir)
+    if text is None:
+      return False
+    conn = self.connection()
+    with conn:
+      self.add(conn, fields_for(report), text)
+    return True
+
+  # Build the index again from the report.json and text files in
+  # data_dir, for every inspector or just the ones given. Reading text is
+  # spread over `jobs` worker processes; SQLite does the indexing itself,
+  # in this one. Returns how many reports are in it afterwards.
+  def rebuild(self, data_dir, inspectors=None, jobs=None):
+    everything = inspectors is None
+    if everything:
+      inspectors = sorted(name for name in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, name)))
+
+    conn = self.connection()
+    with conn:
+      if everything:
+        conn.execute("DELETE FROM texts")
+        conn.execute("DELETE FROM documents")
+      for inspector in inspectors:
+        ids = conn.execute("SELECT id FROM documents WHERE inspector = ?", (inspector,)).fetchall()
+        conn.executemany("DELETE FROM texts WHERE rowid = ?", ids)
+        conn.execute("DELETE FROM documents WHERE inspector = ?", (inspector,))
+
+    store = packed.Store(data_dir)
+    dirs = [report_dir for inspector in inspectors for report_dir in store.report_dirs(inspector)]
+    store.close()
+    chunks = [dirs[start:start + CHUNK_SIZE] for start in range(0, len(dirs), CHUNK_SIZE)]
+
+    # only a few chunks are read ahead of what's been indexed, so the
+    # text of the whole corpus is never in memory at once
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+      ahead = 2 * (jobs or os.cpu_count() or 1)
+      pending = deque()
+      for number, chunk in enumerate(chunks + [None]):
+        if chunk:
+          pending.append(executor.submit(read, chunk, data_dir))
+        while pending and ((len(pending) >= ahead) or (chunk is None)):
+          with conn:
+            for fields, text in pending.popleft().result():
+              self.add(conn, fields, text)
+        if number and (number % 100 == 0):
+          logging.warn("Read %i of %i reports" % (number * CHUNK_SIZE, len(dirs)))
+
+    # merge the index's segments, for faster queries
+    with conn:
+      conn.execute("INSERT INTO texts (texts) VALUES ('optimize')")
+    return self.count()
+
+  def count(self):
+    return self.connection().execute("SELECT count(*) FROM documents").fetchone()[0]
+
+  # The best matches for an FTS5 query, optionally only for an inspector,
+  # year or type of report. Returns dicts of the report's fields, with a
+  # `snippet` of text around the match, best match first.
+  def search(self, query, inspector=None, year=None, type=None, limit=20):
+    filters, values = [], [query]
+    for field, value in (("inspector", inspector), ("year", year), ("type", type)):
+      if value is not None:
+        filters.append("AND documents.%s = ?" % field)
+        values.append(int(value) if field == "year" else value)
+    values.append(limit)
+
+    rows = self.connection().execute(
+      "SELECT %s, snippet(texts, -1, '[', ']', '...', 16) FROM texts "
+      "JOIN documents ON documents.id = texts.rowid "
+      "WHERE texts MATCH ? %s ORDER BY rank LIMIT ?" % (
+        ", ".join("documents.%s" % field for field in FIELDS), " ".join(filters)),
+      values
+    ).fetchall()
+
+    results = []
+    for row in rows:
+      result = dict(zip(FIELDS, row))
+      result['snippet'] = " ".join(row[-1].split())
+      results.append(result)
+    return results
@@ -0,0 +1,150 @@
+import threading
+import time
+import urllib.parse
+import email.utils
+
+# Per-host rate limiting for outgoing requests.
+#
+# Every host gets its own token bucket, so a slow or strict IG site only
+# holds back requests to itself. Rates are in requests per minute, and can
+# be set per host in admin.yml:
+#
+#   rate_limits:
+#     default: 120
+#     hosts:
+#       oig.hhs.gov: 60
+#       www.dodig.mil: 30
+#
+# A rate of 0 turns off rate limiting for that host.
+#
+# When a host asks us to back off with a Retry-After header, all requests
+# to it are held until then, for up to `max_retry_after` seconds (set under
+# rate_limits, 300 by default). A host that asks for longer is treated as
+# down, by the circuit breaker (see breaker.py).
+
+DEFAULT_REQUESTS_PER_MINUTE = 120
+DEFAULT_MAX_RETRY_AFTER = 300
+
+
+def host_for(url):
+  return (urllib.parse.urlparse(url).hostname or "").lower()
+
+# seconds to wait from a Retry-After header, which can either
+# be a number of seconds or an HTTP date
+def retry_after_seconds(value):
+  if not value:
+    return None
+  value = value.strip()
+  if value.isdigit():
+    return int(value)
+  parsed = email.utils.parsedate_tz(value)
+  if parsed:
+    return max(0, email.utils.mktime_tz(parsed) - time.time())
+  return None
+
+
+class TokenBucket(object):
+  def __init__(self, requests_per_minute, burst=1):
+    self.rate = requests_per_minute / 60.0
+    self.capacity = burst
+    self.tokens = burst
+    self.updated = time.monotonic()
+    self.held_until = 0
+    self.lock = threading.Lock()
+
+  def refill(self, now):
+    elapsed = now - self.updated
+    self.tokens = min(self.capacity, self.tokens + (elapsed * self.rate))
+    self.updated = now
+
+  # Take a token and return how many seconds the caller has to sleep
+  # before it may use it. The bucket can go negative, which reserves
+  # slots in order for concurrent callers.
+  def reserve(self):
+    with self.lock:
+      now = time.monotonic()
+      held = max(0, self.held_until - now)
+      if self.rate <= 0:
+        return held
+      self.refill(now)
+      self.tokens -= 1
+      if self.tokens >= 0:
+        return held
+      return max(held, -self.tokens / self.rate)
+
+  # how long a request made right now would have to wait
+  def delay(self):
+    with self.lock:
+      now = time.monotonic()
+      held = max(0, self.held_until - now)
+      if self.rate <= 0:
+        return held
+      self.refill(now)
+      if self.tokens >= 1:
+        return held
+      return max(held, (1 - self.tokens) / self.rate)
+
+  # don't hand out tokens for the next `seconds`, and keep requests
+  # evenly spaced after that instead of letting them all go at once
+  def hold(self, seconds):
+    with self.lock:
+      now = time.monotonic()
+      self.held_until = max(self.held_until, now + seconds)
+      if self.rate > 0:
+        self.refill(now)
+        # a full token again right when the hold is over
+        self.tokens = min(self.tokens, 1 - (seconds * self.rate))
+
+
+class HostThrottle(object):
+  def __init__(self, config=None):
+    config = config or {}
+    self.default = config.get('default', DEFAULT_REQUESTS_PER_MINUTE)
+    self.max_retry_after = int(config.get('max_retry_after', DEFAULT_MAX_RETRY_AFTER))
+    self.hosts = dict((host.lower(), rate) for host, rate in (config.get('hosts') or {}).items())
+    self.buckets = {}
+    self.slept = {}
+    self.lock = threading.Lock()
+
+  def requests_per_minute(self, host):
+    return self.hosts.get(host, self.default)
+
+  def bucket_for(self, host):
+    with self.lock:
+      bucket = self.buckets.get(host)
+      if bucket is None:
+        bucket = TokenBucket(self.requests_per_minute(host))
+        self.buckets[host] = bucket
+      return bucket
+
+  # block until a request to url's host is allowed
+  def wait(self, url):
+    host = host_for(url)
+    seconds = self.bucket_for(host).reserve()
+    if seconds > 0:
+      with self.lock:
+        self.slept[host] = self.slept.get(host, 0) + seconds
+      time.sleep(seconds)
+    return seconds
+
+  # Honor a host's request (e.g. Retry-After) to wait before trying
+  # again. Returns False, without holding, if it's asking for longer than
+  # max_retry_after.
+  def hold(self, url, seconds):
+    if seconds > self.max_retry_after:
+      return False
+    self.bucket_for(host_for(url)).hold(seconds)
+    return True
+
+  # seconds a new request to this host would currently wait
+  def current_wait(self, host):
+    return self.bucket_for(host.lower()).delay()
+
+  # total seconds slept per host since the last reset
+  def wait_times(self):
+    with self.lock:
+      return dict(self.slept)
+
+  def reset(self):
+    with self.lock:
+      self.slept = {}
@@ -0,0 +1,98 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .throttle import host_for
+
+# Checks that report URLs work during a --dry_run, without holding up
+# the scraper: checks run on a thread pool in the background, with a few
+# at a time per host, and are collected at the end of the run.
+#
+# URLs that checked out fine are remembered for a while, so repeated dry
+# runs skip them. Configure in admin.yml:
+#
+#   url_checks:
+#     ttl: 604800       # seconds to trust a good result for
+#     per_host: 4       # checks in flight per host
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_PER_HOST = 4
+WORKERS = 16
+
+
+class URLChecker(object):
+  # `check` should raise an exception if a URL is bad
+  def __init__(self, path, check, config=None):
+    config = config or {}
+    self.path = path
+    self.check = check
+    self.ttl = int(config.get('ttl', DEFAULT_TTL))
+    self.per_host = int(config.get('per_host', DEFAULT_PER_HOST))
+    self.executor = None
+    self.pending = []
+    self.queued = set()
+    self.slots = {}
+    self.local = threading.local()
+    self.lock = threading.Lock()
+
+  def connection(self):
+    conn = getattr(self.local, 'conn', None)
+    if conn is None:
+      os.makedirs(os.path.dirname(self.path), exist_ok=True)
+      conn = sqlite3.connect(self.path, timeout=60)
+      conn.execute("CREATE TABLE IF NOT EXISTS good_urls (url TEXT PRIMARY KEY, checked_at REAL)")
+      conn.commit()
+      self.local.conn = conn
+    return conn
+
+  def recently_checked(self, url):
+    row = self.connection().execute(
+      "SELECT checked_at FROM good_urls WHERE url = ?", (url,)
+    ).fetchone()
+    return bool(row) and (time.time() - row[0]) <= self.ttl
+
+  def remember(self, url):
+    conn = self.connection()
+    with conn:
+      conn.execute("INSERT OR REPLACE INTO good_urls VALUES (?, ?)", (url, time.time()))
+
+  # check a URL in the background
+  def queue(self, url):
+    if (url in self.queued) or self.recently_checked(url):
+      logging.debug("\tchecked recently: %s" % url)
+      return
+
+    with self.lock:
+      self.queued.add(url)
+      if self.executor is None:
+        self.executor = ThreadPoolExecutor(max_workers=WORKERS)
+      host = host_for(url)
+      if host not in self.slots:
+        self.slots[host] = threading.BoundedSemaphore(self.per_host)
+      self.pending.append((url, self.executor.submit(self.run_check, url)))
+
+  def run_check(self, url):
+    with self.slots[host_for(url)]:
+      self.check(url)
+    self.remember(url)
+
+  # wait for all queued checks, and return (url, error) for the bad ones
+  def finish(self):
+    with self.lock:
+      pending, self.pending = self.pending, []
+      self.queued = set()
+      executor, self.executor = self.executor, None
+
+    bad = []
+    for url, future in pending:
+      try:
+        future.result()
+      except Exception as exception:
+        bad.append((url, exception))
+
+    if executor:
+      executor.shutdown()
+    return bad
@@ -3,27 +3,284 @@ import re, html.entities
 import json
 import logging
 import yaml
-from bs4 import BeautifulSoup
 from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# scraper should be instantiated at class-load time, so that it can rate limit appropriately
+from . import admin
+from . import response_cache
+from . import url_checks
+from . import warc
+from . import parsing
+from . import dates
+from . import workers
+from . import extractors
+from . import pages
+from . import html_text
+from . import limits
+from . import catalog
+from . import search
+from . import manifest
+from . import packed
+from .throttle import HostThrottle, host_for, retry_after_seconds
+from .breaker import CircuitBreaker, HostUnavailable, is_failure
+
+# requests are rate limited per host, see throttle.py for configuration
+throttle = HostThrottle(admin.config and admin.config.get('rate_limits'))
+
+# hosts that keep failing are given a rest, see breaker.py
+breaker = CircuitBreaker(admin.config and admin.config.get('circuit_breaker'))
+
+import requests
 import scrapelib
-scraper = scrapelib.Scraper(requests_per_minute=120, retry_attempts=3)
-scraper.user_agent = "unitedstates/inspectors-general (https://github.com/unitedstates/inspectors-general)"
+class Scraper(scrapelib.Scraper):
+  def request(self, method, url, **kwargs):
+    # cache=False keeps a response out of the response cache
+    cache = kwargs.pop('cache', True)
+
+    # --replay answers everything from a capture, never the network
+    if replayer:
+      response = replayer.response_for(method, url, **kwargs)
+      if self.raise_errors and not self.accept_response(response):
+        raise scrapelib.HTTPError(response)
+      return response
 
-from . import admin
+    try:
+      response = self.fetch(method, url, cache, **kwargs)
+    except scrapelib.HTTPError as e:
+      if recorder:
+        recorder.record(method, url, kwargs, e.response)
+      raise
+
+    if recorder:
+      recorder.record(method, url, kwargs, response)
+    return response
+
+  # answer from the response cache if possible, otherwise the network
+  def fetch(self, method, url, cache=True, **kwargs):
+    cache_key = response_cache.key_for(method, url, **kwargs) if cache else None
+    cached = http_cache.get(cache_key)
+    if cached:
+      if cached.age <= cache_ttl():
+        logging.debug("## Cached response: %s" % url)
+        return cached
+
+      # too old to use blindly, ask the server whether it has changed
+      headers = dict(kwargs.get('headers') or {})
+      headers.update(http_cache.validators(cached))
+      kwargs['headers'] = headers
+
+    response = super(Scraper, self).request(method, url, **kwargs)
+    if cache_key:
+      http_cache.count(url, response.status_code)
+
+    if cached and response.status_code == 304:
+      logging.debug("## Not modified: %s" % url)
+      http_cache.revalidated(cache_key)
+      return cached
+
+    http_cache.set(cache_key, response)
+    return response
+
+  # every attempt on the wire goes through here, including scrapelib's
+  # retries and redirects, so this is where hosts are throttled and
+  # their failures counted
+  def send(self, request, **kwargs):
+    breaker.check(request.url)
+    throttle.wait(request.url)
+
+    try:
+      response = super(Scraper, self).send(request, **kwargs)
+    except (requests.ConnectionError, requests.Timeout):
+      breaker.failure(request.url)
+      raise
+    except Exception:
+      breaker.abandon(request.url)
+      raise
+
+    retry_after = retry_after_seconds(response.headers.get('retry-after'))
+    if retry_after and response.status_code in (429, 503):
+      if throttle.hold(request.url, retry_after):
+        logging.warn("## %s asked us to wait %is" % (host_for(request.url), retry_after))
+      else:
+        logging.warn("## %s asked us to wait %is, longer than we will, so giving it a rest" % (host_for(request.url), retry_after))
+        breaker.trip(request.url)
+        return response
+
+    if is_failure(response):
+      breaker.failure(request.url)
+    else:
+      breaker.success(request.url)
+    return response
+
+# scraper should be instantiated at class-load time, so that it can rate limit appropriately
+# (scrapelib's own global throttle is turned off in favor of the per-host one)
+scraper = Scraper(requests_per_minute=0, retry_attempts=3)
+scraper.user_agent = "unitedstates/inspectors-general (https://github.com/unitedstates/inspectors-general)"
 
 
 # will pass correct options on to individual scrapers whether
 # run through ./igs or individually, because argv[1:] is the same
+#
+# returns True if the scraper finished without an uncaught exception
 def run(run_method):
+  global current_inspector, recorder, replayer
+  current_inspector = inspector_name(run_method)
+
   cli_options = options()
   configure_logging(cli_options)
 
+  extraction_pool.workers = cli_options.get('extract-workers')
+
+  if cli_options.get('replay'):
+    replayer = warc.Replayer(cli_options['replay'])
+  elif cli_options.get('record'):
+    recorder = warc.Recorder(cli_options['record'], current_inspector)
+
+  success = True
   try:
     run_method(cli_options)
   except Exception as exception:
     admin.notify(exception)
+    success = False
+
+  # reports are extracted in the background, wait for the last of them
+  failed_extractions = extraction_pool.finish()
+  if failed_extractions:
+    admin.notify(failed_extractions_report(failed_extractions))
+    success = False
+
+  bad_urls = url_checker.finish()
+  if bad_urls:
+    admin.notify(bad_urls_report(bad_urls))
+    success = False
+
+  if packed_storage() and not cli_options.get('dry_run'):
+    count = data_store().pack_inspector(current_inspector)
+    if count:
+      logging.warn("Packed %i reports" % count)
+
+  if recorder:
+    recorder.close()
+    logging.warn("Recorded HTTP traffic to %s" % recorder.path)
+    recorder = None
+  replayer = None
+
+  log_wait_times()
+  log_cache_statuses()
+  log_breaker_stats()
+  log_memo_stats()
+  log_parse_stats()
+  log_extraction_counts()
+  log_manifest_hits()
+  return success
+
+# report where the run spent its time sleeping on rate limits
+def log_wait_times():
+  wait_times = throttle.wait_times()
+  if wait_times:
+    logging.warn("Time spent waiting on rate limits:")
+    for host in sorted(wait_times, key=wait_times.get, reverse=True):
+      logging.warn("\t%s: %.1fs" % (host, wait_times[host]))
+  throttle.reset()
+
+# report how many page fetches were saved by reusing pages in the run
+def log_memo_stats():
+  hits, misses = page_memo.stats()
+  if hits:
+    logging.warn("Pages reused instead of fetched again: %i (%i fetched)" % (sum(hits.values()), misses))
+    for host in sorted(hits, key=hits.get, reverse=True):
+      logging.warn("\t%s: %i" % (host, hits[host]))
+  page_memo.clear()
+
+# report how long it took to build trees for the pages parsed in the run
+def log_parse_stats():
+  stats = parse_timer.parse_stats()
+  for parser in sorted(stats):
+    counts = stats[parser]
+    logging.warn("Parsed %i pages with %s in %.1fs (%.0fms per page, slowest %.0fms)" % (
+      counts['pages'], parser, counts['seconds'],
+      1000 * counts['seconds'] / counts['pages'], 1000 * counts['slowest']))
+  parse_timer.reset()
+
+# How many reports were extracted this run, and how many weren't: because
+# they hadn't changed since they were last extracted, because a tool went
+# over its limits, or because they'd gone over them too often before.
+# Statuses are those returned by inspector.extract.
+EXTRACTION_STATUSES = ("extracted", "unchanged", "over_limits", "quarantined")
+extraction_counts = dict((status, 0) for status in EXTRACTION_STATUSES)
+extraction_counts_lock = threading.Lock()
+
+# the slowest extractions for each inspector, as (seconds, path)
+SLOWEST_EXTRACTIONS = 5
+slowest_extractions = {}
+
+def count_extraction(status, inspector=None, path=None, seconds=None):
+  with extraction_counts_lock:
+    extraction_counts[status] += 1
+    if seconds is not None:
+      slowest = slowest_extractions.setdefault(inspector, [])
+      slowest.append((seconds, path))
+      slowest.sort(reverse=True)
+      del slowest[SLOWEST_EXTRACTIONS:]
+
+def log_extraction_counts():
+  with extraction_counts_lock:
+    if any(extraction_counts.values()):
+      logging.warn("Reports extracted: %i (%i skipped as unchanged, %i over limits, %i skipped as quarantined)" % tuple(
+        extraction_counts[status] for status in EXTRACTION_STATUSES))
+    for status in EXTRACTION_STATUSES:
+      extraction_counts[status] = 0
+
+    for inspector in sorted(slowest_extractions, key=str):
+      logging.warn("Slowest extractions for %s:" % inspector)
+      for seconds, path in slowest_extractions[inspector]:
+        logging.warn("\t%.1fs: %s" % (seconds, path))
+    slowest_extractions.clear()
+
+# report how many reports --incremental skipped, as saved by earlier runs
+def log_manifest_hits():
+  for inspector in sorted(manifests, key=str):
+    if manifests[inspector].hits:
+      logging.warn("[%s] Reports already saved, skipped: %i" % (inspector, manifests[inspector].hits))
+      manifests[inspector].hits = 0
+
+# report hosts that stopped responding during the run
+def log_breaker_stats():
+  stats = breaker.breaker_stats()
+  if stats:
+    logging.warn("Hosts that stopped responding:")
+    for host in sorted(stats):
+      state = "still down" if breaker.is_open(host) else "recovered"
+      logging.warn("\t%s: %s (gave up %i times, %i requests failed fast)" % (
+        host, state, stats[host]['opened'], stats[host]['rejected']))
+  breaker.reset()
+
+# report how often pages were unchanged (304) versus sent in full (200)
+def log_cache_statuses():
+  statuses = http_cache.status_counts()
+  if statuses:
+    logging.warn("Page requests by host (304 not modified / 200 full):")
+    for host in sorted(statuses):
+      counts = statuses[host]
+      logging.warn("\t%s: %i / %i" % (host, counts.get(304, 0), counts.get(200, 0)))
+  http_cache.reset()
+
+# handle of the inspector whose scraper is running, e.g. "usps"
+current_inspector = None
+
+# worker processes for extracting text from reports, see workers.py
+extraction_pool = workers.WorkerPool()
+
+# set up by run() for --record and --replay
+recorder = None
+replayer = None
+
+def inspector_name(run_method):
+  name = run_method.__module__
+  if name == "__main__":
+    name = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+  return name
 
 # read options from the command line
 #   e.g. ./inspectors/usps.py --since=2012-03-04 --debug
@@ -58,12 +315,30 @@ def configure_logging(options=None):
   logging.basicConfig(format='%(message)s', level=log_level.upper())
 
 
+# pages downloaded during this run, up to 50 million characters of them
+MEMO_MAX_SIZE = 50 * 1000 * 1000
+page_memo = response_cache.Memo(MEMO_MAX_SIZE)
+
 # download the data at url
 def download(url, destination=None, options=None):
   options = {} if not options else options
   cache = options.get('cache', True) # default to caching
   binary = options.get('binary', False) # default to assuming text
 
+  # a page already fetched during this run is reused as-is
+  memoize = cache and (not binary) and (not destination)
+  if memoize:
+    body = page_memo.get(url)
+    if body is not None:
+      logging.debug("## Already fetched: %s" % url)
+      return body
+
+  body = download_uncached(url, destination, cache, binary)
+  if memoize and (body is not None):
+    page_memo.set(url, body)
+  return body
+
+def download_uncached(url, destination, cache, binary):
   # check cache first
   if destination and cache and os.path.exists(destination):
     logging.info("## Cached: (%s, %s)" % (destination, url))
@@ -86,17 +361,24 @@ def download(url, destination=None, options=None):
         raise Exception("A destination path is required for downloading a binary file")
       try:
         mkdir_p(os.path.dirname(destination))
-        scraper.urlretrieve(url, destination)
-      except scrapelib.HTTPError as e:
+        retrieve(url, destination)
+      except (scrapelib.HTTPError, IncompleteDownload) as e:
         log_http_error(e, url)
         return None
+      except HostUnavailable as e:
+        logging.warn("## %s" % e)
+        return None
     else: # text
       try:
         if destination: logging.info("## \tto: %s" % destination)
-        response = scraper.urlopen(url)
+        # a report saved to data/ isn't kept in the response cache too
+        response = scraper.urlopen(url, cache=(not destination))
       except scrapelib.HTTPError as e:
         log_http_error(e, url)
         return None
+      except HostUnavailable as e:
+        logging.warn("## %s" % e)
+        return None
 
       body = response
       if not isinstance(body, str): raise ValueError("Content not decoded.")
@@ -116,6 +398,139 @@ def download(url, destination=None, options=None):
     # whether from disk or web, unescape HTML entities
     return unescape(body)
 
+class IncompleteDownload(Exception):
+  pass
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Stream a binary file to "<destination>.part" and only move it into place
+# once it's complete, so a file at the destination can always be trusted.
+#
+# If an earlier run was interrupted, the partial file is resumed with a
+# Range request. The validator (ETag or Last-Modified) of the original
+# response is kept in "<destination>.part.json" and sent as If-Range, so
+# if the file changed in the meantime, the server sends all of it again.
+#
+# A partial file that's actually whole (from a run that stopped just
+# before moving it into place) is answered with a 416, and moved into
+# place then. Any other 416 means the partial file can't be resumed, so
+# it's thrown away and the download starts over.
+def retrieve(url, destination):
+  partial_path = "%s.part" % destination
+  state_path = "%s.part.json" % destination
+
+  # bytes must match Content-Length, and ranges must mean the same thing
+  headers = {'Accept-Encoding': 'identity'}
+
+  offset = 0
+  if os.path.exists(partial_path) and os.path.exists(state_path):
+    with open(state_path, encoding='utf-8') as f:
+      state = json.load(f)
+    if state.get('url') == url and state.get('validator'):
+      offset = os.path.getsize(partial_path)
+  if offset:
+    headers['Range'] = "bytes=%i-" % offset
+    headers['If-Range'] = state['validator']
+
+  try:
+    response = scraper.request('GET', url, headers=headers, stream=True)
+  except scrapelib.HTTPError as e:
+    if not (offset and e.response.status_code == 416):
+      raise
+    if content_range_total(e.response.headers.get('content-range')) == offset:
+      logging.info("## \talready complete")
+      os.replace(partial_path, destination)
+      os.remove(state_path)
+      return
+    logging.info("## \tcan't resume, starting over")
+    os.remove(partial_path)
+    os.remove(state_path)
+    return retrieve(url, destination)
+
+  try:
+    if offset and response.status_code == 206:
+      logging.info("## \tresuming from byte %i" % offset)
+      mode = 'ab'
+      expected = content_range_total(response.headers.get('content-range'))
+    else:
+      offset = 0
+      mode = 'wb'
+      expected = response.headers.get('content-length')
+      expected = int(expected) if expected and expected.isdigit() else None
+      validator = response.headers.get('etag') or response.headers.get('last-modified')
+      write(json.dumps({'url': url, 'validator': validator}), state_path)
+
+    with open(partial_path, mode) as f:
+      try:
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+          f.write(chunk)
+      except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+        raise IncompleteDownload("Connection dropped downloading %s, will resume next time: %s" % (url, e))
+  finally:
+    response.close()
+
+  size = os.path.getsize(partial_path)
+  if (expected is not None) and (size != expected):
+    raise IncompleteDownload("Got %i of %i bytes for %s, will resume next time" % (size, expected, url))
+
+  os.replace(partial_path, destination)
+  os.remove(state_path)
+
+# total length from e.g. "bytes 1000-4999/5000" (or "bytes */5000")
+def content_range_total(content_range):
+  if content_range and "/" in content_range:
+    total = content_range.split("/")[-1].strip()
+    if total.isdigit():
+      return int(total)
+  return None
+
+# most requests download_many() will have in flight to any one host
+DOWNLOAD_MANY_PER_HOST = 4
+DOWNLOAD_MANY_WORKERS = 16
+
+# download a batch of pages concurrently, returning their bodies in the
+# same order as the urls. each one goes through download(), so caching,
+# unescaping and error handling are all the same (failed pages are None).
+def download_many(urls, options=None, per_host=DOWNLOAD_MANY_PER_HOST):
+  urls = list(urls)
+  if not urls:
+    return []
+
+  slots = {}
+  for url in urls:
+    host = host_for(url)
+    if host not in slots:
+      slots[host] = threading.BoundedSemaphore(per_host)
+
+  def fetch(url):
+    with slots[host_for(url)]:
+      return download(url, options=options)
+
+  workers = min(len(urls), per_host * len(slots), DOWNLOAD_MANY_WORKERS)
+  with ThreadPoolExecutor(max_workers=workers) as executor:
+    return list(executor.map(fetch, urls))
+
+parse_timer = parsing.ParseTimer()
+
+# parse a page's body with BeautifulSoup. uses lxml if it's installed
+# (see parsing.py), unless a parser is passed in or forced with --parser.
+#
+# `only` limits parsing to a region of the page, by a simple selector
+# or a list of them (see parsing.py), e.g. only="#leftContentInterior"
+def soup(body, parser=None, only=None):
+  kwargs = {}
+  if only:
+    kwargs['parse_only'] = parsing.strainer(only if isinstance(only, str) else tuple(only))
+  return parse_timer.parse(body, parsing.parser_for(parser or options().get('parser')), **kwargs)
+
+# download a page, and parse it with soup()
+def fetch_soup(url, parser=None, only=None):
+  return soup(download(url), parser=parser, only=only)
+
+# CSS selection with selectors compiled once per process
+select = parsing.select
+select_one = parsing.select_one
+
 def log_http_error(e, url):
   # intentionally print instead of using logging,
   # so that all 404s get printed at the end of the log
@@ -126,15 +541,20 @@ def log_http_error(e, url):
   else:
     print(admin.config, admin.config.get("slack"))
 
-# uses BeautifulSoup to do a naive extraction of text from HTML,
+# does a naive extraction of text from HTML, streaming it through
+# html_text.py (or with BeautifulSoup, if --html-backend=beautifulsoup),
 # then writes it and returns the /data-relative path.
 def text_from_html(html_path):
   real_html_path = os.path.join(data_dir(), html_path)
   text_path = "%s.txt" % os.path.splitext(html_path)[0]
   real_text_path = os.path.join(data_dir(), text_path)
 
+  if text_backend("html") == "htmlstream":
+    html_text.extract(real_html_path, real_text_path)
+    return text_path
+
   html = open(real_html_path, encoding='utf-8').read()
-  doc = BeautifulSoup(html)
+  doc = soup(html)
 
   for node in doc.findAll(['script', 'style']):
     node.extract()
@@ -150,24 +570,52 @@ def text_from_html(html_path):
   return text_path
 
 
-# uses pdftotext to get text out of PDFs,
+# the backend text is extracted with for a kind of file ("pdf", "doc" or
+# "html"), see extractors.py
+def text_backend(kind):
+  return extractors.text_backend(kind, options().get('%s-backend' % kind))
+
+# what to record in a report about how its text was extracted
+def extracted_with(kind):
+  return extractors.described(text_backend(kind))
+
+# see extractors.config_hash
+def extraction_config_hash(kind):
+  return extractors.config_hash(kind, text_backend(kind))
+
+def file_hash(path):
+  return extractors.file_hash(os.path.join(data_dir(), path))
+
+# writes an index of where each page starts next to extracted text
+# (see pages.py), and returns its /data-relative path
+def page_index_for(text_path):
+  index_path = pages.index_path_for(text_path)
+  pages.write_index(os.path.join(data_dir(), text_path), os.path.join(data_dir(), index_path))
+  return index_path
+
+# uses pdftotext (or PyMuPDF) to get text out of PDFs,
 # then writes it and returns the /data-relative path.
 def text_from_pdf(pdf_path):
-  try:
-    subprocess.Popen(["pdftotext", "-v"], shell=False, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT).communicate()
-  except FileNotFoundError:
-    logging.warn("Install pdftotext to extract text! The pdftotext executable must be in a directory that is in your PATH environment variable.")
+  backend = text_backend("pdf")
+  if not backend:
     return None
 
   real_pdf_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), pdf_path)))
   text_path = "%s.txt" % os.path.splitext(pdf_path)[0]
   real_text_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), text_path)))
 
-  try:
-    subprocess.check_call(["pdftotext", "-layout", real_pdf_path, real_text_path], shell=False)
-  except subprocess.CalledProcessError as exc:
-    logging.warn("Error extracting text to %s:\n\n%s" % (text_path, format_exception(exc)))
-    return None
+  if backend == "pymupdf":
+    try:
+      extractors.text_with_pymupdf(real_pdf_path, real_text_path)
+    except Exception as exc:
+      logging.warn("Error extracting text to %s:\n\n%s" % (text_path, format_exception(exc)))
+      return None
+  else:
+    try:
+      extraction_limits.run(["pdftotext", "-layout", real_pdf_path, real_text_path])
+    except subprocess.CalledProcessError as exc:
+      logging.warn("Error extracting text to %s:\n\n%s" % (text_path, format_exception(exc)))
+      return None
 
   if os.path.exists(real_text_path):
     return text_path
@@ -176,10 +624,7 @@ def text_from_pdf(pdf_path):
     return None
 
 def text_from_doc(doc_path):
-  try:
-    subprocess.Popen(["abiword", "-?"], shell=False, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT).communicate()
-  except FileNotFoundError:
-    logging.warn("Install AbiWord to extract text! The abiword executable must be in a directory that is in your PATH environment variable.")
+  if not text_backend("doc"):
     return None
 
   real_doc_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), doc_path)))
@@ -187,7 +632,7 @@ def text_from_doc(doc_path):
   real_text_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), text_path)))
 
   try:
-    subprocess.check_call(["abiword", real_doc_path, "--to", "txt"], shell=False)
+    extraction_limits.run(["abiword", real_doc_path, "--to", "txt"])
   except subprocess.CalledProcessError as exc:
     logging.warn("Error extracting text to %s:\n\n%s" % (text_path, format_exception(exc)))
     return None
@@ -205,20 +650,16 @@ PDF_TITLE_RE = re.compile("Title: +([^\r\n]*)\r?\n")
 PDF_KEYWORDS_RE = re.compile("Keywords: +([^\r\n]*)\r?\n")
 PDF_AUTHOR_RE = re.compile("Author: +([^\r\n]*)\r?\n")
 
+PDF_DATE_FORMATS = (
+  '%m/%d/%y %H:%M:%S',
+  '%a %b %d %H:%M:%S %Y',
+  '%A, %B %d, %Y %I:%M:%S %p',
+)
+
 def parse_pdf_datetime(raw):
     if raw.strip() == "":
       return None
-    my_datetime = None
-    try:
-      my_datetime = datetime.strptime(raw, '%m/%d/%y %H:%M:%S')
-    except ValueError:
-      try:
-        my_datetime = datetime.strptime(raw, '%a %b %d %H:%M:%S %Y')
-      except ValueError:
-        try:
-          my_datetime = datetime.strptime(raw, '%A, %B %d, %Y %I:%M:%S %p')
-        except ValueError:
-          pass
+    my_datetime = dates.strptime_any(raw, PDF_DATE_FORMATS)
     if my_datetime:
       return datetime.strftime(my_datetime, '%Y-%m-%d')
     else:
@@ -226,16 +667,13 @@ def parse_pdf_datetime(raw):
       return None
 
 def metadata_from_pdf(pdf_path):
-  try:
-    subprocess.Popen(["pdfinfo", "-v"], shell=False, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT).communicate()
-  except FileNotFoundError:
-    logging.warn("Install pdfinfo to extract metadata! The pdfinfo executable must be in a directory that is in your PATH environment variable.")
+  if not extractors.has_tool("pdfinfo"):
     return None
 
   real_pdf_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), pdf_path)))
 
   try:
-    output = subprocess.check_output(["pdfinfo", real_pdf_path], shell=False)
+    output = extraction_limits.run(["pdfinfo", real_pdf_path])
     output = output.decode('utf-8', errors='replace')
   except subprocess.CalledProcessError as exc:
     logging.warn("Error extracting metadata for %s:\n\n%s" % (pdf_path, format_exception(exc)))
@@ -271,6 +709,41 @@ def metadata_from_pdf(pdf_path):
     return metadata
   return None
 
+# Gets text and metadata out of a PDF in one pass, with one pdftotext
+# run (or one open with PyMuPDF), rather than running pdfinfo and then
+# pdftotext. Writes the text next to the PDF, and returns its
+# /data-relative path along with metadata in the same form as
+# metadata_from_pdf. Either can be None.
+#
+# Like the other extraction functions, raises limits.LimitExceeded if
+# the tool goes over the limits in extraction_limits.
+def text_and_metadata_from_pdf(pdf_path):
+  backend = text_backend("pdf")
+  if not backend:
+    return None, None
+
+  real_pdf_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), pdf_path)))
+  text_path = "%s.txt" % os.path.splitext(pdf_path)[0]
+  real_text_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), text_path)))
+
+  try:
+    text, info = extractors.pdf_with(backend, real_pdf_path, extraction_limits)
+  except limits.LimitExceeded:
+    raise
+  except Exception as exc:
+    logging.warn("Error extracting text and metadata from %s:\n\n%s" % (pdf_path, format_exception(exc)))
+    return None, None
+
+  write(text, real_text_path)
+
+  metadata = {}
+  for key, value in info.items():
+    if key in ('creation_date', 'modification_date'):
+      value = extractors.pdf_date(value)
+    metadata[key] = value
+
+  return text_path, (metadata or None)
+
 def check_report_url(report_url):
   res = scraper.request(method='HEAD', url=report_url)
   if not res.ok:
@@ -278,6 +751,18 @@ def check_report_url(report_url):
       (res.status_code, report_url)
     )
 
+def bad_urls_report(bad_urls):
+  lines = ["%i report URLs failed their check:" % len(bad_urls)]
+  for url, exception in bad_urls:
+    lines.append("\t%s\n\t\t%s" % (url, exception))
+  return "\n".join(lines)
+
+def failed_extractions_report(failed):
+  lines = ["%i reports failed extraction:" % len(failed)]
+  for report, exception in failed:
+    lines.append("\t%s\n\t\t%s" % (report.get('url'), exception))
+  return "\n".join(lines)
+
 DOC_PAGE_RE = re.compile("Number of Pages: ([0-9]*),")
 DOC_CREATION_DATE_RE = re.compile("Create Time/Date: ([A-Za-z 0-9:]*),")
 DOC_MOD_DATE_RE = re.compile("Last Saved Time/Date: ([A-Za-z 0-9:]*),")
@@ -287,11 +772,7 @@ DOC_AUTHOR_RE = re.compile("Author: ([^,]*),")
 def parse_doc_datetime(raw):
   if raw.strip() == "":
     return None
-  my_datetime = None
-  try:
-    my_datetime = datetime.strptime(raw, '%a %b %d %H:%M:%S %Y')
-  except ValueError:
-    pass
+  my_datetime = dates.strptime(raw, '%a %b %d %H:%M:%S %Y')
   if my_datetime:
     return datetime.strftime(my_datetime, '%Y-%m-%d')
   else:
@@ -299,16 +780,13 @@ def parse_doc_datetime(raw):
     return None
 
 def metadata_from_doc(doc_path):
-  try:
-    subprocess.Popen(["file", "-v"], shell=False, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT).communicate()
-  except FileNotFoundError:
-    logging.warn("Install file to extract metadata! The file executable must be in a directory that is in your PATH environment variable.")
+  if not extractors.has_tool("file"):
     return None
 
   real_doc_path = os.path.abspath(os.path.expandvars(os.path.join(data_dir(), doc_path)))
 
   try:
-    output = subprocess.check_output(["file", real_doc_path], shell=False)
+    output = extraction_limits.run(["file", real_doc_path])
     output = output.decode('utf-8', errors='replace')
   except subprocess.CalledProcessError as exc:
     logging.warn("Error extracting metadata for %s:\n\n%s" % (doc_path, format_exception(exc)))
@@ -352,6 +830,75 @@ def data_dir():
 def cache_dir():
   return "cache"
 
+# the catalog of reports in the data directory, see catalog.py
+catalogs = {}
+
+def report_catalog():
+  path = os.path.join(data_dir(), catalog.FILENAME)
+  if path not in catalogs:
+    catalogs[path] = catalog.Catalog(path)
+  return catalogs[path]
+
+# the reports each inspector has saved, see manifest.py
+manifests = {}
+
+def manifest_for(inspector):
+  if inspector not in manifests:
+    manifests[inspector] = manifest.Manifest(os.path.join(cache_dir(), inspector, manifest.FILENAME))
+  return manifests[inspector]
+
+# the full-text index of report text in the data directory, see search.py
+search_indexes = {}
+
+def search_index():
+  path = os.path.join(data_dir(), search.FILENAME)
+  if path not in search_indexes:
+    search_indexes[path] = search.SearchIndex(path)
+  return search_indexes[path]
+
+# reads reports in the data directory, loose or packed, see packed.py
+data_stores = {}
+
+def data_store():
+  path = data_dir()
+  if path not in data_stores:
+    data_stores[path] = packed.Store(path)
+  return data_stores[path]
+
+# with `storage: packed` in admin.yml, reports are kept packed, and only
+# loose while they're being saved
+def packed_storage():
+  return bool(admin.config) and (admin.config.get('storage') == "packed")
+
+# text responses (listing and landing pages) are cached across runs
+http_cache = response_cache.ResponseCache(
+  os.path.join(cache_dir(), "http"),
+  admin.config and admin.config.get('http_cache')
+)
+
+# how old a cached response can be and still get used, in seconds:
+# --cache-ttl if given, otherwise what's configured for the inspector
+def cache_ttl():
+  ttl = options().get('cache-ttl')
+  if ttl is not None:
+    return int(ttl)
+  return http_cache.ttl_for(current_inspector)
+
+# extraction tools run with limits, and files that keep going over
+# them are quarantined, see limits.py
+extraction_limits = limits.Limits(admin.config and admin.config.get('extraction'))
+extraction_quarantine = limits.Quarantine(
+  os.path.join(cache_dir(), "extraction_quarantine.sqlite"),
+  extraction_limits.max_failures
+)
+
+# report URLs are checked in the background, and good results remembered
+url_checker = url_checks.URLChecker(
+  os.path.join(cache_dir(), "url_checks.sqlite"),
+  check_report_url,
+  admin.config and admin.config.get('url_checks')
+)
+
 def write(content, destination, binary=False):
   mkdir_p(os.path.dirname(destination))
 
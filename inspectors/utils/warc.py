@@ -0,0 +1,223 @@
+import datetime
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import urllib.parse
+
+import requests
+
+from . import response_cache
+
+# Record and replay the HTTP traffic of a scraper run.
+#
+# With --record=DIR, every response the scraper gets (including ones
+# answered from the response cache) is written to a WARC file in DIR,
+# one file per scraper process:
+#
+#   DIR/usps-20150102T030405-1234.warc
+#
+# With --replay=DIR, requests are answered from all the WARC files in
+# DIR instead of the network, and a request that wasn't captured is an
+# error. This makes it possible to re-run parsing against exactly what the
+# sites served, without touching them.
+#
+# Each record carries an X-Request-Key field, the same hash of method,
+# URL, body and Range header that the response cache uses, to match
+# requests on replay.
+#
+# Streamed responses (binary reports) are copied to a temporary file as
+# the scraper reads them, and recorded once they've been read in full, so
+# a large report is never held in memory.
+
+WARC_VERSION = b"WARC/1.0"
+
+# the stored body is already decoded, so these no longer apply to it
+DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+class ReplayMiss(Exception):
+  pass
+
+
+def warc_date():
+  return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def record_id():
+  return "<urn:uuid:%s>" % uuid.uuid4()
+
+def header_block(fields):
+  lines = ["%s: %s" % (name, value) for name, value in fields]
+  return ("\r\n".join(lines) + "\r\n").encode('utf-8')
+
+
+class Recorder(object):
+  def __init__(self, directory, name):
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    self.path = os.path.join(directory, "%s-%s-%i.warc" % (name, stamp, os.getpid()))
+    self.file = open(self.path, 'ab')
+    self.lock = threading.Lock()
+
+    self.write_record([
+      ("WARC-Type", "warcinfo"),
+      ("WARC-Record-ID", record_id()),
+      ("WARC-Date", warc_date()),
+      ("WARC-Filename", os.path.basename(self.path)),
+      ("Content-Type", "application/warc-fields"),
+    ], b"software: unitedstates/inspectors-general\r\n")
+
+  # a record's block is `block`, followed by the contents of the file
+  # `rest` if given
+  def write_record(self, fields, block, rest=None):
+    length = len(block)
+    if rest:
+      rest.seek(0, os.SEEK_END)
+      length += rest.tell()
+      rest.seek(0)
+    fields = fields + [("Content-Length", length)]
+    with self.lock:
+      self.file.write(WARC_VERSION + b"\r\n")
+      self.file.write(header_block(fields))
+      self.file.write(b"\r\n")
+      self.file.write(block)
+      if rest:
+        shutil.copyfileobj(rest, self.file)
+      self.file.write(b"\r\n\r\n")
+      self.file.flush()
+
+  # write a request record and the response it got
+  def record(self, method, url, kwargs, response):
+    if kwargs.get('stream') and response.ok:
+      self.record_streamed(method, url, kwargs, response)
+    else:
+      self.write_exchange(method, url, kwargs, response, response.content)
+
+  # record a streamed response once the scraper has read all of it
+  def record_streamed(self, method, url, kwargs, response):
+    iter_content = response.iter_content
+
+    def tee(chunk_size=1, decode_unicode=False):
+      with tempfile.TemporaryFile() as spool:
+        for chunk in iter_content(chunk_size, decode_unicode):
+          spool.write(chunk)
+          yield chunk
+        self.write_exchange(method, url, kwargs, response, spool)
+    response.iter_content = tee
+
+  # `content` is the response's body, as bytes or in a file
+  def write_exchange(self, method, url, kwargs, response, content):
+    key = response_cache.request_key(method, url, **kwargs)
+    prepared = response_cache.prepare(method, url, **kwargs)
+    date = warc_date()
+    response_id = record_id()
+
+    # request record
+    parsed = urllib.parse.urlsplit(prepared.url)
+    target = parsed.path or "/"
+    if parsed.query:
+      target += "?" + parsed.query
+    request_headers = [("Host", parsed.netloc)] + list(prepared.headers.items())
+    block = ("%s %s HTTP/1.1\r\n" % (prepared.method, target)).encode('utf-8')
+    block += header_block(request_headers) + b"\r\n" + response_cache.body_of(prepared)
+    self.write_record([
+      ("WARC-Type", "request"),
+      ("WARC-Record-ID", record_id()),
+      ("WARC-Date", date),
+      ("WARC-Target-URI", prepared.url),
+      ("WARC-Concurrent-To", response_id),
+      ("X-Request-Key", key),
+      ("Content-Type", "application/http; msgtype=request"),
+    ], block)
+
+    # response record
+    if isinstance(content, bytes):
+      length, rest = len(content), None
+    else:
+      rest = content
+      rest.seek(0, os.SEEK_END)
+      length, content = rest.tell(), b""
+    response_headers = [(name, value) for name, value in response.headers.items()
+                        if name.lower() not in DROPPED_HEADERS]
+    response_headers.append(("Content-Length", length))
+    block = ("HTTP/1.1 %i %s\r\n" % (response.status_code, response.reason or "")).encode('utf-8')
+    block += header_block(response_headers) + b"\r\n" + content
+    self.write_record([
+      ("WARC-Type", "response"),
+      ("WARC-Record-ID", response_id),
+      ("WARC-Date", date),
+      ("WARC-Target-URI", prepared.url),
+      ("X-Request-Key", key),
+      ("X-Response-URL", response.url),
+      ("Content-Type", "application/http; msgtype=response"),
+    ], block, rest)
+
+  def close(self):
+    with self.lock:
+      self.file.close()
+
+
+class Replayer(object):
+  def __init__(self, directory):
+    self.directory = directory
+    self.index = {}
+    paths = sorted(glob.glob(os.path.join(directory, "*.warc")))
+    if not paths:
+      raise Exception("No WARC files to replay in %s" % directory)
+    for path in paths:
+      self.scan(path)
+    logging.info("## Replaying %i responses from %s" % (len(self.index), directory))
+
+  # index the response records in a WARC file by request key,
+  # with later captures of the same request winning
+  def scan(self, path):
+    with open(path, 'rb') as f:
+      while True:
+        line = f.readline()
+        if not line:
+          break
+        if line.strip() != WARC_VERSION:
+          continue
+
+        fields = {}
+        while True:
+          line = f.readline().decode('utf-8').strip()
+          if not line:
+            break
+          name, value = line.split(":", 1)
+          fields[name.strip().lower()] = value.strip()
+
+        length = int(fields['content-length'])
+        if (fields.get('warc-type') == "response") and fields.get('x-request-key'):
+          self.index[fields['x-request-key']] = (path, f.tell(), length, fields.get('x-response-url'))
+        f.seek(length, os.SEEK_CUR)
+
+  def response_for(self, method, url, **kwargs):
+    key = response_cache.request_key(method, url, **kwargs)
+    if key not in self.index:
+      raise ReplayMiss("%s %s was not captured in %s" % (method.upper(), url, self.directory))
+
+    path, offset, length, response_url = self.index[key]
+    with open(path, 'rb') as f:
+      f.seek(offset)
+      block = f.read(length)
+
+    head, content = block.split(b"\r\n\r\n", 1)
+    lines = head.decode('utf-8').split("\r\n")
+    status = lines[0].split(" ", 2)
+
+    response = requests.Response()
+    response.status_code = int(status[1])
+    response.reason = status[2] if len(status) > 2 else ""
+    for line in lines[1:]:
+      name, value = line.split(":", 1)
+      response.headers[name.strip()] = value.strip()
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = content
+    response._content_consumed = True
+    response.url = response_url or url
+    return response
@@ -0,0 +1,106 @@
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+# Runs CPU-bound work, like extracting text from downloaded reports, in a
+# pool of worker processes, so the scraper can go on fetching pages while
+# it happens. There's one worker per core by default; set the number with
+# --extract-workers, or use --extract-workers=0 to do the work inline.
+#
+# Each job is a function (which must be importable from a module, so it
+# can be sent to a worker) and an argument. When a job is done, its
+# callback is called with the function's result, in the scraper's own
+# thread rather than one of the pool's: finished jobs are collected each
+# time another is queued, and by finish(), which waits for everything
+# queued and is called at the end of a run.
+#
+# Workers are started fresh (through a fork server where there is one)
+# rather than forked from the scraper, which by then has threads of its
+# own running, and locks they might hold.
+
+
+# where worker processes are started from
+def start_method():
+  if "forkserver" in multiprocessing.get_all_start_methods():
+    return "forkserver"
+  return "spawn"
+
+def new_executor(workers):
+  # Python 3.7 and up can be told how to start workers
+  if sys.version_info >= (3, 7):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method()))
+  return ProcessPoolExecutor(max_workers=workers)
+
+
+class WorkerPool(object):
+  def __init__(self, workers=None):
+    self.workers = workers
+    self.executor = None
+    self.pending = []
+    self.failed = []
+    self.lock = threading.Lock()
+
+  def worker_count(self):
+    if self.workers is None:
+      return os.cpu_count() or 1
+    return int(self.workers)
+
+  def queue(self, function, argument, callback):
+    self.collect()
+    if self.worker_count() <= 0:
+      self.run_inline(function, argument, callback)
+      return
+
+    with self.lock:
+      if self.executor is None:
+        self.executor = new_executor(self.worker_count())
+      future = self.executor.submit(function, argument)
+      self.pending.append((future, argument, callback))
+
+  def run_inline(self, function, argument, callback):
+    try:
+      callback(function(argument))
+    except Exception as exception:
+      with self.lock:
+        self.failed.append((argument, exception))
+
+  # call back for the jobs that are done, in the order they were queued
+  def collect(self):
+    done, pending = [], []
+    with self.lock:
+      for job in self.pending:
+        (done if job[0].done() else pending).append(job)
+      self.pending = pending
+
+    for future, argument, callback in done:
+      try:
+        callback(future.result())
+      except Exception as exception:
+        logging.warn("Background job failed: %s" % exception)
+        with self.lock:
+          self.failed.append((argument, exception))
+
+  # how many jobs are queued or running
+  def backlog(self):
+    with self.lock:
+      return len([job for job in self.pending if not job[0].done()])
+
+  # wait for all queued jobs, and return (argument, error) for failed ones
+  def finish(self):
+    with self.lock:
+      futures = [job[0] for job in self.pending]
+      executor, self.executor = self.executor, None
+
+    if futures:
+      logging.warn("Waiting on %i background jobs..." % len(futures))
+      wait(futures)
+    self.collect()
+    if executor:
+      executor.shutdown()
+
+    with self.lock:
+      failed, self.failed = self.failed, []
+    return failed
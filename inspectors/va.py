@@ -5,7 +5,6 @@ import logging
 import os
 import time
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.va.gov/oig/apps/info/OversightReports.aspx
@@ -94,6 +93,10 @@ def report_from(result, year_range):
     logging.debug("[%s] Skipping, not in requested range." % landing_url)
     return
 
+  # with --incremental, skip reports saved by an earlier run
+  if inspector.already_have(landing_url=landing_url):
+    return
+
   # These pages occassionally return text indicating there was a temporary
   # error so we will retry if necessary.
   for attempt in range(MAX_ATTEMPTS):
@@ -179,7 +182,7 @@ def semiannual_report_from(result, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.soup(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -0,0 +1,139 @@
+import http.server
+import os
+import sys
+import threading
+
+import pytest
+
+# the scrapers import their helpers as `utils`, from the inspectors directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "inspectors"))
+
+
+# A clock that only moves when told to, for code that reads time.monotonic
+# or time.time.
+class Clock(object):
+  def __init__(self, now=1000.0):
+    self.now = now
+
+  def __call__(self):
+    return self.now
+
+  def advance(self, seconds):
+    self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+  clock = Clock()
+  monkeypatch.setattr("time.monotonic", clock)
+  monkeypatch.setattr("time.time", clock)
+  return clock
+
+
+# A local web server for tests that make requests. Set what a path
+# answers with server.pages[path] = (status, headers, body), and see the
+# headers of every request made in server.requests, as (path, headers).
+class Server(object):
+  def __init__(self):
+    self.pages = {}
+    self.requests = []
+    server = self
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+      def do_GET(self):
+        server.requests.append((self.path, dict(self.headers)))
+        status, headers, body = server.pages.get(self.path, (404, {}, b"not found"))
+        if callable(body):
+          status, headers, body = body(self.headers)
+        self.send_response(status)
+        for name, value in headers.items():
+          self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      def log_message(self, *args):
+        pass
+
+    self.httpd = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    self.thread = threading.Thread(target=self.httpd.serve_forever)
+    self.thread.daemon = True
+    self.thread.start()
+
+  def url(self, path):
+    return "http://127.0.0.1:%i%s" % (self.httpd.server_port, path)
+
+  def stop(self):
+    self.httpd.shutdown()
+    self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+  server = Server()
+  yield server
+  server.stop()
+
+
+# No admin.yml and no command line options, and relative paths (data/,
+# cache/) under a temporary directory, with nothing left open in the
+# last test's.
+@pytest.fixture
+def workdir(monkeypatch, tmp_path):
+  from utils import utils, admin
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(admin, "config", {})
+  monkeypatch.setattr(sys, "argv", ["test"])
+  for registry in ("catalogs", "manifests", "search_indexes", "data_stores"):
+    monkeypatch.setattr(utils, registry, {})
+  return tmp_path
+
+
+# The local server, with utils set up to fetch from it in isolation: no
+# rate limits or retries, and a fresh breaker, memo and response cache,
+# in a workdir.
+@pytest.fixture
+def web(server, workdir, monkeypatch, tmp_path):
+  from utils import utils, throttle, breaker, response_cache
+  monkeypatch.setattr(utils, "throttle", throttle.HostThrottle({'default': 0}))
+  monkeypatch.setattr(utils, "breaker", breaker.CircuitBreaker())
+  monkeypatch.setattr(utils, "http_cache", response_cache.ResponseCache(str(tmp_path / "cache" / "http")))
+  monkeypatch.setattr(utils, "page_memo", response_cache.Memo(utils.MEMO_MAX_SIZE))
+  monkeypatch.setattr(utils.scraper, "retry_attempts", 0)
+  return server
+
+
+# Fake command line tools, first on the PATH. Add one with
+# tools.add(name, script), where script is the body of a shell script;
+# each call to a tool is logged, and tools.calls(name) lists the
+# arguments of each.
+class Tools(object):
+  def __init__(self, path):
+    self.path = path
+    os.makedirs(path)
+
+  def add(self, name, script):
+    tool = os.path.join(self.path, name)
+    with open(tool, 'w') as f:
+      f.write('#!/bin/sh\necho "$@" >> "%s.calls"\n%s\n' % (tool, script))
+    os.chmod(tool, 0o755)
+
+  def calls(self, name):
+    try:
+      with open(os.path.join(self.path, name + ".calls")) as f:
+        return f.read().splitlines()
+    except FileNotFoundError:
+      return []
+
+@pytest.fixture
+def tools(monkeypatch, tmp_path):
+  from utils import extractors
+  tools = Tools(str(tmp_path / "bin"))
+  monkeypatch.setenv("PATH", tools.path + os.pathsep + os.environ.get("PATH", ""))
+  # only the fake tools are detected, and only within this test
+  monkeypatch.setattr(extractors, "TOOLS", dict((name, [os.path.join(tools.path, name)] + command[1:]) for name, command in extractors.TOOLS.items()))
+  for cached in (extractors.tool_version, extractors.has_tool, extractors.text_backend):
+    cached.cache_clear()
+  yield tools
+  for cached in (extractors.tool_version, extractors.has_tool, extractors.text_backend):
+    cached.cache_clear()
@@ -0,0 +1,97 @@
+import pytest
+import requests
+
+from utils import breaker, utils
+
+URL = "http://oig.gov/reports"
+
+
+def opened(circuit):
+  circuit = breaker.CircuitBreaker({'failures': 2, 'cooldown': 60})
+  circuit.failure(URL)
+  circuit.failure(URL)
+  return circuit
+
+def test_opens_after_consecutive_failures(clock):
+  circuit = breaker.CircuitBreaker({'failures': 3})
+  circuit.failure(URL)
+  circuit.failure(URL)
+  circuit.success(URL)
+  circuit.failure(URL)
+  circuit.failure(URL)
+  circuit.check(URL)
+  assert not circuit.is_open("oig.gov")
+
+  circuit.failure(URL)
+  assert circuit.is_open("oig.gov")
+  with pytest.raises(breaker.HostUnavailable):
+    circuit.check(URL)
+  # other hosts are unaffected
+  circuit.check("http://other.gov/")
+  assert circuit.breaker_stats() == {'oig.gov': {'opened': 1, 'rejected': 1}}
+
+def test_lets_one_trial_through_after_cooldown(clock):
+  circuit = opened(clock)
+  clock.advance(60)
+  circuit.check(URL)
+  with pytest.raises(breaker.HostUnavailable):
+    circuit.check(URL)
+
+def test_trial_success_closes(clock):
+  circuit = opened(clock)
+  clock.advance(60)
+  circuit.check(URL)
+  circuit.success(URL)
+  assert not circuit.is_open("oig.gov")
+  circuit.check(URL)
+  circuit.check(URL)
+
+def test_trial_failure_waits_another_cooldown(clock):
+  circuit = opened(clock)
+  clock.advance(60)
+  circuit.check(URL)
+  circuit.failure(URL)
+  with pytest.raises(breaker.HostUnavailable):
+    circuit.check(URL)
+  clock.advance(60)
+  circuit.check(URL)
+
+def test_abandoned_trial_lets_another_through(clock):
+  circuit = opened(clock)
+  clock.advance(60)
+  circuit.check(URL)
+  circuit.abandon(URL)
+  circuit.check(URL)
+
+def test_trip_opens_right_away(clock):
+  circuit = breaker.CircuitBreaker({'cooldown': 60})
+  circuit.trip(URL)
+  with pytest.raises(breaker.HostUnavailable):
+    circuit.check(URL)
+  clock.advance(60)
+  circuit.check(URL)
+
+def test_is_failure():
+  for status, failed in ((200, False), (404, False), (429, True), (500, True), (503, True)):
+    response = requests.Response()
+    response.status_code = status
+    assert breaker.is_failure(response) == failed
+
+
+def test_long_retry_after_gives_host_a_rest(web):
+  web.pages["/busy"] = (429, {'Retry-After': "86400"}, b"come back tomorrow")
+  with pytest.raises(Exception):
+    utils.scraper.get(web.url("/busy"))
+  assert utils.breaker.is_open("127.0.0.1")
+  assert utils.throttle.current_wait("127.0.0.1") == 0
+
+def test_trial_that_errors_is_abandoned(web, monkeypatch):
+  web.pages["/garbled"] = (200, {'Content-Encoding': "gzip"}, b"not gzip")
+  circuit = breaker.CircuitBreaker({'failures': 1, 'cooldown': 0})
+  monkeypatch.setattr(utils, "breaker", circuit)
+  circuit.failure(web.url("/"))
+
+  with pytest.raises(requests.exceptions.ContentDecodingError):
+    utils.scraper.get(web.url("/garbled"))
+  # the host isn't stuck waiting on a trial that will never finish
+  circuit.check(web.url("/"))
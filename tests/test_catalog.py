@@ -0,0 +1,71 @@
+import os
+
+from utils import utils, inspector, catalog
+
+
+def report_for(report_id, year=2014, **fields):
+  report = {
+    'inspector': "test", 'inspector_url': "https://oig.example.gov/", 'agency': "test", 'agency_name': "Test",
+    'report_id': report_id, 'title': "Report %s" % report_id, 'type': "audit",
+    'published_on': "%i-05-06" % year, 'year': year, 'url': "https://oig.example.gov/%s.pdf" % report_id, 'file_type': "pdf",
+  }
+  report.update(fields)
+  return report
+
+def rows(where=""):
+  conn = utils.report_catalog().connection()
+  fields = [field for field in catalog.FIELDS if field != "updated_at"]
+  return conn.execute("SELECT %s FROM reports %s ORDER BY inspector, year, report_id" % (", ".join(fields), where)).fetchall()
+
+def row(report_id, year=2014):
+  found = rows("WHERE report_id = '%s' AND year = %i" % (report_id, year))
+  return found[0] if found else None
+
+def column(name, values):
+  return values[[field for field in catalog.FIELDS if field != "updated_at"].index(name)]
+
+
+def test_write_report_updates_the_catalog(workdir):
+  inspector.write_report(report_for("one"))
+  assert column("title", row("one")) == "Report one"
+  assert column("has_text", row("one")) == 0
+  assert column("file_size", row("one")) is None
+
+  utils.write(b"%PDF-1.4", "data/test/2014/one/report.pdf", binary=True)
+  utils.write("text", "data/test/2014/one/report.txt")
+  inspector.write_report(report_for("one", title="Retitled", text_path="test/2014/one/report.txt",
+    extracted_with={'backend': "pdftotext", 'source_hash': "abc", 'config_hash': "def"}))
+  assert len(rows()) == 1
+  assert column("title", row("one")) == "Retitled"
+  assert (column("has_text", row("one")), column("file_size", row("one")), column("text_size", row("one"))) == (1, 8, 4)
+  assert (column("source_hash", row("one")), column("config_hash", row("one"))) == ("abc", "def")
+
+def test_same_report_id_in_different_years(workdir):
+  inspector.write_report(report_for("one", 2014))
+  inspector.write_report(report_for("one", 2015))
+  assert len(rows()) == 2
+
+def test_unreleased_reports(workdir):
+  inspector.write_report(report_for("secret", unreleased=True, url=None, file_type=None, landing_url="https://oig.example.gov/"))
+  assert (column("unreleased", row("secret")), column("file_size", row("secret"))) == (1, None)
+
+# a rebuild from the report.json files gives the same rows
+def test_rebuild(workdir):
+  utils.write(b"%PDF-1.4", "data/test/2014/one/report.pdf", binary=True)
+  utils.write("text", "data/test/2014/one/report.txt")
+  inspector.write_report(report_for("one", text_path="test/2014/one/report.txt"))
+  inspector.write_report(report_for("two", 2015))
+  inspector.write_report(dict(report_for("three"), inspector="other"))
+  written = rows()
+
+  conn = utils.report_catalog().connection()
+  with conn:
+    conn.execute("DELETE FROM reports")
+    conn.execute("INSERT INTO reports (inspector, year, report_id) VALUES ('gone', 2014, 'gone')")
+  assert utils.report_catalog().rebuild(utils.data_dir(), jobs=1) == 3
+  assert rows() == written
+
+  # only some inspectors, including one with nothing left on disk
+  os.remove("data/test/2015/two/report.json")
+  assert utils.report_catalog().rebuild(utils.data_dir(), ["test", "missing"], jobs=1) == 2
+  assert [values[:3] for values in rows()] == [("other", 2014, "three"), ("test", 2014, "one")]
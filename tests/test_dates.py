@@ -0,0 +1,95 @@
+import datetime
+import random
+
+import pytest
+
+from utils import dates
+
+FORMATS = dates.COMMON_FORMATS + (
+  "%d-%b-%y",
+  "%b. %d, %Y",
+  "%A, %B %d, %Y",
+  "%a %b %d %Y",
+  "%m/%d/%Y %I:%M %p",
+  "%Y-%m-%d %H:%M:%S",
+  "%Y%m%d",
+)
+
+SAMPLES = (
+  "November 30, 2012", "Nov 30, 2012", "november 30 2012", "NOV 30 2012",
+  "30 November 2012", "30 November  2012", "11/30/2012", "1/3/2012",
+  "11/30/12", "01/30/69", "01/30/68", "11-30-2012", "2012-11-30",
+  "12.01.2009", "June 2010", "Sep 2014", "Sept 2014", "May, 2014", "3/2014",
+  "2014", "Feb 29, 2012", "Feb 29, 2013", "February 30, 2012",
+  "13/01/2012", "00/10/2012", "11/31/2012", "11/ 3/2012", "11/003/2012",
+  "20121130", "30-Nov-12", "Nov. 30, 2012", "Friday, November 30, 2012",
+  "Fri Nov 30 2012", "11/30/2012 12:15 PM", "11/30/2012 12:15 am",
+  "2012-11-30 23:59:59", "2012-11-30 24:00:00", "November 30, 2012 ",
+  " November 30, 2012", "Novemb 30, 2012", "", "no date here", "FY 2014",
+)
+
+def strptime(text, format):
+  try:
+    return datetime.datetime.strptime(text, format)
+  except ValueError:
+    return None
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_strptime_matches_datetime(format):
+  for text in SAMPLES:
+    assert dates.strptime(text, format) == strptime(text, format), text
+
+# strings that fit each format, and strings that nearly do
+def test_strptime_matches_datetime_on_generated_dates():
+  generator = random.Random(1234)
+  start = datetime.datetime(1960, 1, 1)
+  for format in FORMATS:
+    for _ in range(200):
+      moment = start + datetime.timedelta(seconds=generator.randrange(80 * 365 * 86400))
+      text = moment.strftime(format)
+      assert dates.strptime(text, format) == strptime(text, format), (text, format)
+
+      # drop, double or swap a character
+      position = generator.randrange(len(text))
+      for mangled in (text[:position] + text[position + 1:], text[:position] + text[position] + text[position:], text[:position] + text[position:][::-1]):
+        assert dates.strptime(mangled, format) == strptime(mangled, format), (mangled, format)
+
+def test_strptime_any():
+  assert dates.strptime_any("Sep 2014", ("%B %Y", "%b %Y")) == datetime.datetime(2014, 9, 1)
+  assert dates.strptime_any("2014-09", ("%B %Y", "%b %Y")) is None
+  assert dates.strptime(None, "%Y") is None
+
+def test_parse_precision():
+  assert dates.parse("November 30, 2012") == (datetime.datetime(2012, 11, 30), dates.DAY)
+  assert dates.parse(" Sept 30, 2011 ") == (datetime.datetime(2011, 9, 30), dates.DAY)
+  assert dates.parse("June 2010") == (datetime.datetime(2010, 6, 1), dates.MONTH)
+  assert dates.parse("2010") == (datetime.datetime(2010, 1, 1), dates.YEAR)
+  assert dates.parse("FY 2014 Annual Plan") == (datetime.datetime(2013, 10, 1), dates.FISCAL_YEAR)
+  assert dates.parse("Fiscal Year 2009") == (datetime.datetime(2008, 10, 1), dates.FISCAL_YEAR)
+  assert dates.parse("no date here") is None
+
+# parse() gives the same date as trying each format with strptime in turn
+def test_parse_matches_strptime_chain():
+  for text in SAMPLES:
+    expected = None
+    for format in dates.COMMON_FORMATS:
+      expected = strptime(text.strip().replace("Sept", "Sep"), format)
+      if expected:
+        break
+    result = dates.parse(text)
+    if expected:
+      assert result.datetime == expected, text
+    else:
+      assert (result is None) or (result.precision == dates.FISCAL_YEAR), text
+
+def test_years():
+  assert dates.start_of_year(" 2014") == datetime.datetime(2014, 1, 1)
+  assert dates.start_of_year("twenty") is None
+  assert dates.start_of_fiscal_year("2014") == datetime.datetime(2013, 10, 1)
+  assert dates.start_of_fiscal_year("1") is None
+
+def test_all_directives_compile():
+  for directive in "dmyYHIMSpaAbBZ%":
+    dates.compiled("%" + directive)
+  with pytest.raises(ValueError):
+    dates.compiled("%j")
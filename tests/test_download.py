@@ -0,0 +1,16 @@
+from utils import utils
+
+
+def test_download_many_keeps_order(web):
+  for number in range(8):
+    web.pages["/page%i" % number] = (200, {'Content-Type': 'text/html'}, ("<p>page %i &amp; more</p>" % number).encode('utf-8'))
+  urls = [web.url("/page%i" % number) for number in range(8)]
+  urls.insert(3, web.url("/missing"))
+
+  bodies = utils.download_many(urls, per_host=2)
+  assert bodies[3] is None
+  del bodies[3]
+  assert bodies == ["<p>page %i & more</p>" % number for number in range(8)]
+
+def test_download_many_of_nothing(web):
+  assert utils.download_many([]) == []
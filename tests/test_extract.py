@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+from utils import utils, inspector, limits, extractors
+
+
+@pytest.fixture
+def report(workdir, monkeypatch):
+  monkeypatch.setattr(utils, "extraction_quarantine", limits.Quarantine(str(workdir / "cache" / "quarantine.sqlite")))
+  extractors.text_backend.cache_clear()
+  utils.write("<html><body><p>Findings</p></body></html>", "data/test/2014/report-1/report.html")
+  yield {
+    'inspector': "test", 'year': 2014, 'report_id': "report-1", 'file_type': "html",
+    'type': "audit", 'published_on': "2014-05-06",
+  }
+  extractors.text_backend.cache_clear()
+
+def test_unchanged_reports_are_skipped(report):
+  report, status, seconds = inspector.extract(report)
+  assert status == "extracted"
+  assert report['text_path'] == "test/2014/report-1/report.txt"
+  assert report['extracted_with']['backend'] == "htmlstream"
+  assert set(report['extracted_with']) == {'backend', 'version', 'source_hash', 'config_hash'}
+
+  report, status, seconds = inspector.extract(report)
+  assert (status, seconds) == ("unchanged", None)
+  assert report['text_path'] == "test/2014/report-1/report.txt"
+
+def test_changed_reports_are_extracted_again(report, monkeypatch):
+  report, status, seconds = inspector.extract(report)
+
+  # a different file
+  utils.write("<html><body><p>New findings</p></body></html>", "data/test/2014/report-1/report.html")
+  report, status, seconds = inspector.extract(report)
+  assert status == "extracted"
+  with open("data/test/2014/report-1/report.txt") as f:
+    assert f.read().strip() == "New findings"
+
+  # a different way of extracting it
+  monkeypatch.setattr(sys, "argv", ["test", "--html-backend=beautifulsoup"])
+  extractors.text_backend.cache_clear()
+  report, status, seconds = inspector.extract(report)
+  assert status == "extracted"
+  assert report['extracted_with']['backend'] == "beautifulsoup"
+
+  # text that has gone missing
+  os.remove("data/test/2014/report-1/report.txt")
+  report, status, seconds = inspector.extract(report)
+  assert status == "extracted"
+
+def test_force_extract(report, monkeypatch):
+  report, status, seconds = inspector.extract(report)
+  monkeypatch.setattr(sys, "argv", ["test", "--force-extract"])
+  report, status, seconds = inspector.extract(report)
+  assert status == "extracted"
+
+# saving a report again carries over what was extracted before, so an
+# unchanged file isn't extracted again
+def test_saving_again_reuses_extraction(report):
+  report, status, seconds = inspector.extract(report)
+  inspector.write_report(report)
+
+  saved = dict((key, value) for key, value in report.items() if key not in inspector.EXTRACTION_FIELDS)
+  saved.update(inspector.previous_extraction(saved))
+  assert saved == report
+  assert inspector.extract(saved)[1] == "unchanged"
+
+  assert inspector.previous_extraction(dict(report, report_id="report-2")) == {}
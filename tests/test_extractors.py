@@ -0,0 +1,86 @@
+from utils import extractors
+
+
+def test_tools_are_detected_once(tools):
+  tools.add("pdftotext", 'echo "pdftotext version 23.01.0" >&2')
+  assert extractors.tool_version("pdftotext") == "23.01.0"
+  assert extractors.tool_version("pdftotext") == "23.01.0"
+  assert extractors.has_tool("pdftotext")
+  assert tools.calls("pdftotext") == ["-v"]
+
+def test_missing_tools(tools):
+  assert extractors.tool_version("abiword") is None
+  assert not extractors.has_tool("abiword")
+  assert extractors.text_backend("doc") is None
+
+def test_tool_without_a_version(tools):
+  tools.add("file", 'echo "magic file from /usr/share/misc/magic"')
+  assert extractors.tool_version("file") == ""
+  assert extractors.is_available("file")
+
+def test_text_backends(tools, monkeypatch):
+  monkeypatch.setattr(extractors, "fitz", None)
+  assert extractors.text_backend("pdf") is None
+  assert extractors.text_backend("html") == "htmlstream"
+  assert extractors.text_backend("html", "beautifulsoup") == "beautifulsoup"
+  # a backend for some other kind of file is ignored
+  assert extractors.text_backend("html", "pdftotext") == "htmlstream"
+  assert extractors.text_backend("xls") is None
+
+  tools.add("pdftotext", 'echo "pdftotext version 23.01.0" >&2')
+  extractors.tool_version.cache_clear()
+  extractors.text_backend.cache_clear()
+  assert extractors.text_backend("pdf") == "pdftotext"
+  assert extractors.text_backend("pdf", "pymupdf") is None
+  assert extractors.described("pdftotext") == {'backend': "pdftotext", 'version': "23.01.0"}
+
+
+# what pdftotext -layout -htmlmeta writes out
+PDFTOTEXT_HTMLMETA = r"""printf '<!DOCTYPE html>\n<html>\n<head>\n<title>A &amp; Report</title>\n<meta name="Author" content="OIG"/>\n<meta name="Creator" content="Word"/>\n<meta name="CreationDate" content="D:20150105100203-05'"'"'00'"'"'"/>\n</head>\n<body>\n<pre>\npage one\fpage two\f</pre>\n</body>\n</html>\n'"""
+
+def test_pdf_text_and_info_in_one_pass(tools):
+  tools.add("pdftotext", PDFTOTEXT_HTMLMETA)
+  text, info = extractors.pdf_with_pdftotext("report.pdf")
+  assert text == "page one\fpage two\f"
+  assert info == {'page_count': 2, 'title': "A & Report", 'author': "OIG", 'creation_date': "D:20150105100203-05'00'"}
+  assert tools.calls("pdftotext") == ["-layout -htmlmeta report.pdf -"]
+
+def test_pdf_without_info(tools):
+  tools.add("pdftotext", r"""printf '<html>\n<head>\n<title></title>\n</head>\n<body>\n<pre>\n\f</pre>\n</body>\n</html>\n'""")
+  assert extractors.pdf_with_pdftotext("report.pdf") == ("\f", {'page_count': 1})
+
+def test_pdf_dates():
+  assert extractors.pdf_date("D:20150105100203-05'00'") == "2015-01-05"
+  assert extractors.pdf_date("20150105") == "2015-01-05"
+  assert extractors.pdf_date("D:2015") == "2015-01-01"
+  assert extractors.pdf_date("D:20151305") is None
+  assert extractors.pdf_date("Mon Jan  5 10:02:03 2015") is None
+
+def test_text_and_metadata_from_pdf(tools, workdir):
+  from utils import utils
+  tools.add("pdftotext", 'if [ "$1" = "-v" ]; then echo "pdftotext version 23.01.0" >&2; exit 0; fi\n' + PDFTOTEXT_HTMLMETA)
+  utils.write(b"%PDF-1.4", "data/test/2015/report-1/report.pdf", binary=True)
+
+  text_path, metadata = utils.text_and_metadata_from_pdf("test/2015/report-1/report.pdf")
+  assert text_path == "test/2015/report-1/report.txt"
+  assert metadata == {'page_count': 2, 'title': "A & Report", 'author': "OIG", 'creation_date': "2015-01-05"}
+  with open("data/test/2015/report-1/report.txt") as f:
+    assert f.read() == "page one\fpage two\f"
+  # one run for the version, and one for everything else
+  assert len(tools.calls("pdftotext")) == 2
+
+
+def test_config_hash_follows_tool_version(tools):
+  tools.add("pdftotext", 'echo "pdftotext version 23.01.0" >&2')
+  before = extractors.config_hash("pdf", "pdftotext")
+  assert extractors.config_hash("pdf", "pdftotext") == before
+
+  tools.add("pdftotext", 'echo "pdftotext version 24.02.0" >&2')
+  extractors.tool_version.cache_clear()
+  assert extractors.config_hash("pdf", "pdftotext") != before
+  assert extractors.config_hash("html", "htmlstream") != extractors.config_hash("html", "beautifulsoup")
+
+def test_file_hash(tmp_path):
+  path = tmp_path / "report.pdf"
+  path.write_bytes(b"%PDF-1.4")
+  assert extractors.file_hash(str(path)) == "e16fa5d9b51928755db85b917f0297babaf22c7a47e97d9212adab56e61ba04e"
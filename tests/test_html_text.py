@@ -0,0 +1,75 @@
+import random
+
+import pytest
+from bs4 import BeautifulSoup
+
+from utils import html_text
+
+CHUNK_SIZES = (1, 2, 3, 7, 64 * 1024)
+
+# the text utils.text_from_html gets from an html.parser tree
+def tree_text(html_path):
+  with open(html_path, encoding='utf-8') as f:
+    doc = BeautifulSoup(f.read(), "html.parser")
+  for node in doc.find_all(['script', 'style']):
+    node.extract()
+  lines = [line.strip() for line in doc.text.splitlines()]
+  return "\n".join(line for line in lines if line)
+
+# the streamed text of html, and the text of its tree
+def texts(html, chunk_size, tmp_path, monkeypatch):
+  monkeypatch.setattr(html_text, "CHUNK_SIZE", chunk_size)
+  html_path, text_path = str(tmp_path / "report.html"), str(tmp_path / "report.txt")
+  with open(html_path, 'w', encoding='utf-8') as f:
+    f.write(html)
+  html_text.extract(html_path, text_path)
+  with open(text_path, encoding='utf-8') as f:
+    return f.read(), tree_text(html_path)
+
+
+PAGES = (
+  "<html><head><title>A report</title><style>p { color: red }</style></head>\n"
+  "<body><h1>Findings</h1>\n<p>One &amp; two&nbsp;three &#8211; four</p>\n"
+  "<script>if (a < b) { document.write('</p>'); }</script><p>Five</p></body></html>",
+  "<pre>  keep\n\n  this  </pre><textarea>\n  and  this\n</textarea>",
+  "<p>line one\r\nline two\rline three</p>",
+  "<!DOCTYPE html><!-- a comment --><?pi?><![CDATA[cdata]]><p>after</p>",
+  "text &bogus; &amp &#x41; &#65 &#0; &#x110000; < > &",
+  # cut off
+  "<p>unclosed <b>tags",
+  "<script>var unclosed = '<p>';",
+  "<textarea>unclosed <b>textarea",
+  "<style>unclosed { }",
+  "<p title='quoted > bracket'>after</p>",
+  "<var x = '</p>';",
+  "<a href=\"/a<b\" title='it\"s'>link</a> and <a b=x'y>more</a>",
+)
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_pages_match_tree_text(tmp_path, monkeypatch, chunk_size):
+  for html in PAGES:
+    streamed, tree = texts(html, chunk_size, tmp_path, monkeypatch)
+    assert streamed == tree, html
+
+PIECES = (
+  "<p>", "</p>", "<script>", "</script>", "<style>", "</style>", "<textarea>", "</textarea>",
+  "<pre>", "</pre>", "<div class='x'>", "<div class=\"a>b\">", "</div>", "<br/>", "</", "<b", "<",
+  ">", "'", '"', "=", "text", " ", "\n", "\r\n", "\r", "&amp;", "&#65;", "&bogus;", "&", "&nbsp;",
+  "<!-- c -->", "<!DOCTYPE html>", "<![CDATA[x]]>", "<?pi?>", "a < b", "var x = '</p>';",
+)
+
+# random soups of the pieces HTML parsing tends to go wrong on
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_fuzzed_pages_match_tree_text(tmp_path, monkeypatch, chunk_size):
+  generator = random.Random(chunk_size)
+  for _ in range(500):
+    html = "".join(generator.choice(PIECES) for _ in range(generator.randrange(1, 16)))
+    streamed, tree = texts(html, chunk_size, tmp_path, monkeypatch)
+    assert streamed == tree, html
+
+def test_feed_end():
+  assert html_text.feed_end("text") == 0
+  assert html_text.feed_end("<p>text</p><b") == 11
+  assert html_text.feed_end("<p>a < b") == 5
+  assert html_text.feed_end("<p>text<a title='</p>") == 7
+  assert html_text.feed_end("<p>text<a title='</p>'>b<") == 24
@@ -0,0 +1,94 @@
+import subprocess
+import time
+
+import pytest
+
+from utils import utils, inspector, limits
+
+
+@pytest.fixture(params=["prlimit", "ulimit"])
+def wrapper(request, monkeypatch):
+  if request.param == "ulimit":
+    monkeypatch.setattr(limits, "prlimit", lambda: None)
+  elif not limits.prlimit():
+    pytest.skip("prlimit isn't installed")
+  return request.param
+
+def test_memory_is_capped(wrapper):
+  output = limits.Limits({'memory': 100}).run(["sh", "-c", "ulimit -v"])
+  assert output == b"102400\n"
+
+def test_no_memory_cap():
+  assert limits.Limits({'memory': 0}).limited(["pdftotext"]) == ["pdftotext"]
+
+def test_timeout_kills_the_whole_group(wrapper, tmp_path):
+  marker = tmp_path / "still-running"
+  started = time.time()
+  with pytest.raises(limits.LimitExceeded):
+    limits.Limits({'timeout': 1}).run(["sh", "-c", "(sleep 2; touch %s) & sleep 10" % marker])
+  assert time.time() - started < 5
+  time.sleep(1.5)
+  assert not marker.exists()
+
+def test_out_of_memory(wrapper):
+  with pytest.raises(limits.LimitExceeded):
+    limits.Limits().run(["sh", "-c", "kill -KILL $$"])
+  with pytest.raises(limits.LimitExceeded):
+    limits.Limits().run(["sh", "-c", "echo 'Error: Out of memory' >&2; kill -ABRT $$"])
+  with pytest.raises(limits.LimitExceeded):
+    limits.Limits().run(["sh", "-c", "echo 'std::bad_alloc' >&2; exit 1"])
+
+def test_crashes_and_failures_are_not_over_limits(wrapper):
+  with pytest.raises(limits.ToolCrashed) as crash:
+    limits.Limits().run(["sh", "-c", "kill -SEGV $$"])
+  assert str(crash.value) == "Command 'sh' crashed with SIGSEGV"
+  assert isinstance(crash.value, subprocess.CalledProcessError)
+
+  with pytest.raises(subprocess.CalledProcessError) as failure:
+    limits.Limits().run(["sh", "-c", "echo partial; exit 2"])
+  assert failure.value.returncode == 2
+  assert failure.value.output == b"partial\n"
+  assert not isinstance(failure.value, limits.ToolCrashed)
+
+
+def test_quarantine(tmp_path):
+  quarantine = limits.Quarantine(str(tmp_path / "quarantine.sqlite"), max_failures=2)
+  assert quarantine.record("abc", "report.pdf", "too slow") == 1
+  assert not quarantine.is_quarantined("abc")
+  assert quarantine.record("abc", "report.pdf", "too slow") == 2
+  assert quarantine.is_quarantined("abc")
+  assert not quarantine.is_quarantined("def")
+
+  quarantine.release("abc")
+  assert quarantine.failures("abc") == 0
+
+
+@pytest.fixture
+def pdf_report(tools, workdir, monkeypatch):
+  monkeypatch.setattr(utils, "extraction_limits", limits.Limits({'timeout': 1, 'max_failures': 2}))
+  monkeypatch.setattr(utils, "extraction_quarantine", limits.Quarantine(str(workdir / "cache" / "quarantine.sqlite"), 2))
+  utils.write(b"%PDF-1.4", "data/test/2014/report-1/report.pdf", binary=True)
+  return {
+    'inspector': "test", 'year': 2014, 'report_id': "report-1", 'file_type': "pdf",
+    'type': "audit", 'published_on': "2014-05-06",
+  }
+
+def fake_pdftotext(tools, script):
+  tools.add("pdftotext", 'if [ "$1" = "-v" ]; then echo "pdftotext version 23.01.0" >&2; exit 0; fi\n' + script)
+
+# reports whose tools go over the limits are quarantined, and skipped
+def test_reports_over_limits_are_quarantined(tools, pdf_report):
+  fake_pdftotext(tools, "sleep 10")
+  assert inspector.extract(dict(pdf_report))[1] == "over_limits"
+  assert inspector.extract(dict(pdf_report))[1] == "over_limits"
+  assert inspector.extract(dict(pdf_report))[1] == "quarantined"
+  assert len(tools.calls("pdftotext")) == 3
+
+# but a tool that crashes says nothing about the limits
+def test_crashed_tools_dont_quarantine(tools, pdf_report):
+  fake_pdftotext(tools, "kill -SEGV $$")
+  for attempt in range(3):
+    report, status, seconds = inspector.extract(dict(pdf_report))
+    assert status == "extracted"
+    assert 'text_path' not in report
+  assert not utils.extraction_quarantine.failures(utils.file_hash("test/2014/report-1/report.pdf"))
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import sys
+
+from utils import utils, inspector, manifest
+
+
+def report_for(report_id, year=2014, **fields):
+  report = {
+    'inspector': "test", 'report_id': report_id, 'year': year,
+    'url': "https://oig.example.gov/%i/%s.pdf" % (year, report_id),
+    'landing_url': "https://oig.example.gov/%i/%s" % (year, report_id),
+  }
+  report.update(fields)
+  return report
+
+# a report saved to disk, and to the manifest
+def save(report):
+  data_path = inspector.path_for(report, "json")
+  utils.write(utils.json_for(report), "data/" + data_path)
+  utils.manifest_for("test").seen(report, data_path)
+  return data_path
+
+
+def test_find(workdir):
+  found = utils.manifest_for("test")
+  save(report_for("one"))
+  assert found.find(report_id="one")['data_path'] == "test/2014/one/report.json"
+  assert found.find(url="https://oig.example.gov/2014/one.pdf")['report_id'] == "one"
+  assert found.find(landing_url="https://oig.example.gov/2014/one")['report_id'] == "one"
+  assert found.find(report_id="two", landing_url="https://oig.example.gov/2014/one")['report_id'] == "one"
+  assert found.find(report_id="two") is None
+  assert found.find() is None
+
+def test_same_report_id_in_different_years(workdir):
+  found = utils.manifest_for("test")
+  save(report_for("annual", 2014))
+  save(report_for("annual", 2015))
+  assert found.find(report_id="annual", year=2014)['data_path'] == "test/2014/annual/report.json"
+  assert found.find(report_id="annual", year=2015)['data_path'] == "test/2015/annual/report.json"
+  assert found.find(report_id="annual", year=2016) is None
+  assert found.connection().execute("SELECT COUNT(*) FROM reports").fetchone()[0] == 2
+
+def test_seen_again_keeps_first_seen_and_hash(workdir, clock):
+  found = utils.manifest_for("test")
+  data_path = save(report_for("one"))
+  found.seen(report_for("one"), data_path, "abc")
+  first = found.find(report_id="one", year=2014)
+
+  clock.advance(60)
+  found.seen(report_for("one"), data_path)
+  again = found.find(report_id="one", year=2014)
+  assert again['source_hash'] == "abc"
+  assert again['first_seen'] == first['first_seen']
+  assert again['last_seen'] == first['last_seen'] + 60
+
+def test_already_have(workdir, monkeypatch):
+  save(report_for("one"))
+  assert not inspector.already_have(report_id="one", inspector="test")
+
+  monkeypatch.setattr(sys, "argv", ["test", "--incremental"])
+  assert inspector.already_have(report_id="one", inspector="test")
+  assert inspector.already_have(report_id="one", year=2014, inspector="test")
+  assert not inspector.already_have(report_id="one", year=2015, inspector="test")
+  assert inspector.already_have(landing_url="https://oig.example.gov/2014/one", inspector="test")
+  assert not inspector.already_have(report_id="two", inspector="test")
+  assert utils.manifest_for("test").hits == 3
+
+# listed, but gone from disk since
+def test_already_have_needs_the_data(workdir, monkeypatch):
+  monkeypatch.setattr(sys, "argv", ["test", "--incremental"])
+  data_path = save(report_for("one"))
+  os.remove("data/" + data_path)
+  assert not inspector.already_have(report_id="one", year=2014, inspector="test")
+
+# manifests from before the year was part of the key are kept
+def test_old_manifests(workdir):
+  path = str(workdir / "old.sqlite")
+  conn = sqlite3.connect(path)
+  with conn:
+    conn.execute(
+      "CREATE TABLE reports (report_id TEXT PRIMARY KEY, url TEXT, landing_url TEXT, "
+      "year INTEGER, data_path TEXT, source_hash TEXT, first_seen REAL, last_seen REAL)"
+    )
+    conn.execute("CREATE INDEX reports_url ON reports (url)")
+    conn.execute("INSERT INTO reports (report_id, year, data_path) VALUES ('annual', 2014, 'test/2014/annual/report.json')")
+  conn.close()
+
+  found = manifest.Manifest(path)
+  assert found.find(report_id="annual", year=2014)['data_path'] == "test/2014/annual/report.json"
+  found.seen(report_for("annual", 2015), "test/2015/annual/report.json")
+  assert found.find(report_id="annual", year=2014) is not None
+  assert found.find(url="https://oig.example.gov/2015/annual.pdf")['year'] == 2015
@@ -0,0 +1,190 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+from utils import utils, packed
+
+
+def save(report_id, year=2014, title="A report", pdf=b"%PDF-1.4"):
+  report_dir = "data/test/%i/%s" % (year, report_id)
+  utils.write(utils.json_for({'report_id': report_id, 'title': title}), report_dir + "/report.json")
+  utils.write(pdf, report_dir + "/report.pdf", binary=True)
+  return report_dir
+
+def entries(store, year=2014):
+  return [info.filename for info in store.pack("test", year).zip.infolist()]
+
+
+def test_pack_and_read(workdir):
+  save("one")
+  save("two", 2015)
+  store = packed.Store("data")
+  assert store.pack_inspector("test") == 2
+  assert sorted(os.listdir("data/test")) == ["2014.zip", "2015.zip"]
+
+  assert store.exists("test/2014/one/report.json")
+  assert not store.exists("test/2014/one/report.txt")
+  assert store.read_json("test/2014/one/report.json")['title'] == "A report"
+  assert store.read("test/2014/one/report.pdf") == b"%PDF-1.4"
+  assert store.size("test/2014/one/report.pdf") == 8
+  assert store.years("test") == ["2014", "2015"]
+  assert list(store.report_dirs("test")) == ["test/2014/one", "test/2015/two"]
+
+# a report saved again is worked on loose, then packed again over the old copy
+def test_loose_copies_win(workdir):
+  save("one")
+  store = packed.Store("data")
+  store.pack_inspector("test")
+
+  assert store.unpack_report("test", 2014, "one")
+  assert not store.unpack_report("test", 2014, "one")
+  save("one", title="Saved again")
+  assert store.read_json("test/2014/one/report.json")['title'] == "Saved again"
+
+  assert store.pack_inspector("test") == 1
+  assert not os.path.exists("data/test/2014")
+  assert store.read_json("test/2014/one/report.json")['title'] == "Saved again"
+  assert entries(store) == ["one/", "one/report.json", "one/report.pdf"] * 2
+
+  assert store.compact_inspector("test") > 0
+  assert entries(store) == ["one/", "one/report.json", "one/report.pdf"]
+  assert store.read_json("test/2014/one/report.json")['title'] == "Saved again"
+
+# an interrupted download leaves only partial files, which don't hide the
+# packed report, and aren't packed over it
+def test_partial_downloads(workdir):
+  save("one")
+  store = packed.Store("data")
+  store.pack_inspector("test")
+
+  utils.write(b"%PDF", "data/test/2014/one/report.pdf.part", binary=True)
+  assert store.exists("test/2014/one/report.json")
+  assert store.read_json("test/2014/one/report.json")['title'] == "A report"
+
+  assert store.pack_inspector("test") == 0
+  assert os.listdir("data/test/2014/one") == ["report.pdf.part"]
+  os.remove("data/test/2014/one/report.pdf.part")
+  assert store.exists("test/2014/one/report.json")
+  assert store.read_json("test/2014/one/report.json")['title'] == "A report"
+
+  store.compact_inspector("test")
+  assert store.read("test/2014/one/report.pdf") == b"%PDF-1.4"
+
+  # and saving it again works from the packed copy
+  utils.write(b"%PDF", "data/test/2014/one/report.pdf.part", binary=True)
+  assert store.unpack_report("test", 2014, "one")
+  assert sorted(os.listdir("data/test/2014/one")) == ["report.json", "report.pdf", "report.pdf.part"]
+
+# packing with --keep again and again doesn't add the same reports each time
+def test_pack_keeping_loose_copies(workdir):
+  save("one")
+  save("two")
+  store = packed.Store("data")
+  assert store.pack_inspector("test", keep=True) == 2
+  size = os.path.getsize("data/test/2014.zip")
+
+  assert store.pack_inspector("test", keep=True) == 0
+  assert os.path.getsize("data/test/2014.zip") == size
+
+  save("two", pdf=b"%PDF-1.5")
+  assert store.pack_inspector("test", keep=True) == 1
+  assert entries(store).count("two/report.pdf") == 2
+
+  assert store.pack_inspector("test") == 0
+  assert not os.path.exists("data/test/2014")
+  assert store.read("test/2014/two/report.pdf") == b"%PDF-1.5"
+
+def test_unpack(workdir):
+  save("one")
+  save("two", 2015)
+  store = packed.Store("data")
+  store.pack_inspector("test")
+
+  assert store.unpack_inspector("test", keep=True) == 2
+  assert os.path.exists("data/test/2014.zip")
+  with open("data/test/2015/two/report.json") as f:
+    assert json.load(f)['report_id'] == "two"
+
+  assert store.unpack_inspector("test") == 0
+  assert sorted(os.listdir("data/test")) == ["2014", "2015"]
+
+# a run cut off while appending to a pack, before the zip's central
+# directory is written out
+def test_interrupted_pack(workdir, monkeypatch):
+  save("one")
+  store = packed.Store("data")
+  store.pack_inspector("test")
+  save("two")
+
+  close = zipfile.ZipFile.close
+  def cut_off(zip):
+    if zip.mode == 'a':
+      monkeypatch.setattr(zipfile.ZipFile, "close", close)
+      zip.fp.close()
+      zip.fp = None
+      raise KeyboardInterrupt
+    close(zip)
+  monkeypatch.setattr(zipfile.ZipFile, "close", cut_off)
+  with pytest.raises(KeyboardInterrupt):
+    store.pack_inspector("test")
+
+  assert sorted(os.listdir("data/test")) == ["2014", "2014.zip"]
+  assert store.read_json("test/2014/one/report.json")['title'] == "A report"
+  assert store.read_json("test/2014/two/report.json")['title'] == "A report"
+  assert store.pack_inspector("test") == 1
+  assert list(store.report_dirs("test")) == ["test/2014/one", "test/2014/two"]
+
+# a pack that's been cut short is left out, rather than breaking readers
+def test_unreadable_pack(workdir):
+  save("one")
+  store = packed.Store("data")
+  store.pack_inspector("test")
+  with open("data/test/2014.zip", 'r+b') as f:
+    f.truncate(os.path.getsize("data/test/2014.zip") // 2)
+
+  assert not store.exists("test/2014/one/report.json")
+  assert store.size("test/2014/one/report.json") is None
+  assert list(store.report_dirs("test")) == []
+
+  # and isn't packed over, or unpacked
+  save("two")
+  assert store.pack_inspector("test") == 0
+  assert os.path.exists("data/test/2014/two/report.json")
+  assert store.unpack_inspector("test") == 0
+
+# a report whose loose copy has no report.json yet is read all from its pack
+def test_half_saved_reports(workdir):
+  save("one")
+  store = packed.Store("data")
+  store.pack_inspector("test")
+
+  utils.write(b"%PDF-1.5", "data/test/2014/one/report.pdf", binary=True)
+  utils.write("text", "data/test/2014/one/report.txt")
+  assert store.read("test/2014/one/report.pdf") == b"%PDF-1.4"
+  assert store.size("test/2014/one/report.pdf") == 8
+  assert not store.exists("test/2014/one/report.txt")
+  with pytest.raises(IOError):
+    store.read("test/2014/one/report.txt")
+
+  # not yet packed at all, it's read loose
+  utils.write(b"%PDF-1.5", "data/test/2014/two/report.pdf", binary=True)
+  assert store.read("test/2014/two/report.pdf") == b"%PDF-1.5"
+
+def test_read_range(workdir):
+  report_dir = save("one")
+  utils.write("one two three", report_dir + "/report.txt")
+  utils.write("[0,14]", report_dir + "/report.pages.json")
+  utils.write("x" * 100 + "one two three", report_dir + "/notes.txt")
+  store = packed.Store("data")
+  assert store.read_range("test/2014/one/report.txt", 4, 3) == b"two"
+  store.pack_inspector("test")
+
+  infos = store.pack("test", 2014).open().reports["one"]
+  assert infos["report.txt"].compress_type == zipfile.ZIP_STORED
+  assert infos["notes.txt"].compress_type == zipfile.ZIP_DEFLATED
+  assert store.read_range("test/2014/one/report.txt", 4, 3) == b"two"
+  assert store.read_range("test/2014/one/report.txt", 8, 100) == b"three"
+  assert store.read_range("test/2014/one/notes.txt", 104, 3) == b"two"
+  assert store.read_range("test/2014/one/report.pdf", 1, 3) == b"PDF"
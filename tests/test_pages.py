@@ -0,0 +1,68 @@
+import pytest
+
+from utils import pages, packed
+
+TEXTS = (
+  "",
+  "\f",
+  "one page, no form feed",
+  "page one\fpage two\f",
+  "page one\fpage two\fand a trailing bit",
+  "\f\fthird\f",
+  "ünïcode\fpäges\f€",
+)
+
+# pages as reading the whole file and splitting it would give them
+def split(text):
+  pages = text.split("\f")
+  if pages[-1] == "":
+    pages.pop()
+  return pages
+
+@pytest.mark.parametrize("chunk_size", (1, 2, 3, 1024 * 1024))
+def test_pages_match_splitting_the_text(tmp_path, monkeypatch, chunk_size):
+  monkeypatch.setattr(pages, "CHUNK_SIZE", chunk_size)
+  for number, text in enumerate(TEXTS):
+    text_path = str(tmp_path / ("report%i.txt" % number))
+    with open(text_path, 'w', encoding='utf-8') as f:
+      f.write(text)
+    pages.write_index(text_path)
+
+    expected = split(text)
+    assert pages.page_count(text_path) == len(expected), text
+    for first in range(1, len(expected) + 1):
+      assert pages.page_text(text_path, first) == expected[first - 1], text
+      for last in range(first, len(expected) + 1):
+        assert pages.page_text(text_path, first, last) == "\f".join(expected[first - 1:last]), text
+
+def test_pages_out_of_range(tmp_path):
+  text_path = str(tmp_path / "report.txt")
+  with open(text_path, 'w') as f:
+    f.write("page one\fpage two\f")
+  index_path = pages.write_index(text_path)
+  assert index_path == str(tmp_path / "report.pages.json")
+
+  for first, last in ((0, None), (3, None), (2, 1), (1, 3)):
+    with pytest.raises(IndexError):
+      pages.page_text(text_path, first, last)
+
+# the same pages, read from a packed report
+def test_pages_from_a_pack(tmp_path):
+  report_dir = tmp_path / "data" / "test" / "2014" / "one"
+  report_dir.mkdir(parents=True)
+  (report_dir / "report.json").write_text("{}")
+  text = "page one\fpäge two\fpage three\f"
+  (report_dir / "report.txt").write_bytes(text.encode('utf-8'))
+  pages.write_index(str(report_dir / "report.txt"))
+
+  store = packed.Store(str(tmp_path / "data"))
+  assert store.pack_inspector("test") == 1
+  assert not report_dir.exists()
+
+  text_path = "test/2014/one/report.txt"
+  assert pages.page_count(text_path, store=store) == 3
+  for first in range(1, 4):
+    for last in range(first, 4):
+      assert pages.page_text(text_path, first, last, store=store) == "\f".join(split(text)[first - 1:last])
+  with pytest.raises(IndexError):
+    pages.page_text(text_path, 4, store=store)
@@ -0,0 +1,81 @@
+import sys
+
+import pytest
+
+from utils import utils, inspector
+
+
+# listings, newest first, of the report IDs on each page
+LISTING = [["new-1", "new-2"], ["new-3", "old-1"], ["old-2", "old-3"], ["old-4"], ["old-5"]]
+
+@pytest.fixture
+def known(monkeypatch):
+  reports = set(report_id for page in LISTING for report_id in page if report_id.startswith("old"))
+  monkeypatch.setattr(inspector, "already_have", lambda report_id=None, **kwargs: report_id in reports)
+  return reports
+
+# the pages walked, and the reports that would be saved
+def walk(paginator, listing=LISTING):
+  walked, saved = [], []
+  for page in paginator:
+    walked.append(page)
+    if page > len(listing):
+      paginator.stop()
+      continue
+    for report_id in listing[page - 1]:
+      if not paginator.already_have(report_id=report_id):
+        saved.append(report_id)
+  return walked, saved
+
+
+def test_pages(workdir):
+  assert list(inspector.Paginator(1, 3)) == [1, 2, 3]
+  assert list(inspector.Paginator(0, 2)) == [0, 1, 2]
+  assert list(inspector.Paginator(4, 3)) == []
+
+def test_stop(workdir):
+  walked, saved = walk(inspector.Paginator(1))
+  assert walked == [1, 2, 3, 4, 5, 6]
+  assert len(saved) == 8
+
+def test_stops_after_a_page_of_known_reports(workdir, known):
+  walked, saved = walk(inspector.Paginator(1, 10))
+  assert walked == [1, 2, 3]
+  assert saved == ["new-1", "new-2", "new-3"]
+
+def test_grace(workdir, known):
+  assert walk(inspector.Paginator(1, 10, grace=1))[0] == [1, 2, 3, 4]
+  assert walk(inspector.Paginator(1, 10, grace=10))[0] == [1, 2, 3, 4, 5, 6]
+
+def test_grace_pages_option(workdir, known, monkeypatch):
+  monkeypatch.setattr(sys, "argv", ["test", "--grace-pages=2"])
+  assert walk(inspector.Paginator(1, 10))[0] == [1, 2, 3, 4, 5]
+
+# a new report resets the count of pages with only known ones
+def test_new_reports_reset_grace(workdir, known):
+  listing = [["old-1"], ["new-1"], ["old-2"], ["old-3"], ["new-2"]]
+  walked, saved = walk(inspector.Paginator(1, 10, grace=1), listing)
+  assert walked == [1, 2, 3, 4]
+  assert saved == ["new-1"]
+
+# pages with nothing on them don't count as known
+def test_empty_pages(workdir, known):
+  listing = [["new-1"], [], ["old-1"], [], ["old-2"]]
+  assert walk(inspector.Paginator(1, 10), listing)[0] == [1, 2, 3]
+  assert walk(inspector.Paginator(1, 10, grace=1), listing)[0] == [1, 2, 3, 4, 5, 6]
+
+# the same, looking reports up in the manifest
+def test_incremental(workdir, monkeypatch):
+  for report_id in ("old-1", "old-2", "old-3"):
+    report = {'inspector': "test", 'report_id': report_id, 'year': 2014}
+    data_path = inspector.path_for(report, "json")
+    utils.write(utils.json_for(report), "data/" + data_path)
+    utils.manifest_for("test").seen(report, data_path)
+  monkeypatch.setattr(utils, "current_inspector", "test")
+
+  assert walk(inspector.Paginator(1, 10))[0] == [1, 2, 3, 4, 5, 6]
+  monkeypatch.setattr(sys, "argv", ["test", "--incremental"])
+  walked, saved = walk(inspector.Paginator(1, 10))
+  assert walked == [1, 2, 3]
+  assert saved == ["new-1", "new-2", "new-3"]
+  assert utils.manifest_for("test").hits == 3
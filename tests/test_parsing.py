@@ -0,0 +1,73 @@
+import pytest
+
+from utils import utils, parsing
+
+
+def installed(monkeypatch, *parsers):
+  monkeypatch.setattr(parsing, "is_installed", lambda parser: parser in parsers)
+
+def test_parsers_in_bs4_order(monkeypatch):
+  installed(monkeypatch, "lxml", "html5lib", "html.parser")
+  assert parsing.parser_for() == "lxml"
+  installed(monkeypatch, "html5lib", "html.parser")
+  assert parsing.parser_for() == "html5lib"
+  installed(monkeypatch, "html.parser")
+  assert parsing.parser_for() == "html.parser"
+
+def test_forced_parser(monkeypatch):
+  installed(monkeypatch, "html5lib", "html.parser")
+  assert parsing.parser_for("html.parser") == "html.parser"
+  with pytest.raises(parsing.ParserUnavailable):
+    parsing.parser_for("lxml")
+  installed(monkeypatch)
+  with pytest.raises(parsing.ParserUnavailable):
+    parsing.parser_for()
+
+
+def test_soup_never_fetches(web):
+  web.pages["/page"] = (200, {'Content-Type': 'text/html'}, b"<p>fetched</p>")
+  doc = utils.soup(web.url("/page"), parser="html.parser")
+  assert doc.get_text() == web.url("/page")
+  assert web.requests == []
+
+def test_fetch_soup(web):
+  web.pages["/page"] = (200, {'Content-Type': 'text/html'}, b"<div id='main'><p>fetched</p></div><p>skipped</p>")
+  doc = utils.fetch_soup(web.url("/page"), parser="html.parser", only="#main")
+  assert doc.get_text() == "fetched"
+  assert len(web.requests) == 1
+
+
+PAGE = """
+<ul>
+  <li class="pager-item"><a href="?page=2">2</a></li>
+  <li class="views-row odd"><a href="/one">One</a></li>
+</ul>
+<div class="views-row"><a href="/two">Two</a></div>
+<table summary="audit reports"><tr><td>Three</td></tr></table>
+<div id="content"><p>Four</p></div>
+"""
+
+def test_only_keeps_regions():
+  doc = utils.soup(PAGE, parser="html.parser", only="#content")
+  assert doc.get_text().strip() == "Four"
+
+  doc = utils.soup(PAGE, parser="html.parser", only="div.views-row")
+  assert [a['href'] for a in doc.find_all("a")] == ["/two"]
+
+  doc = utils.soup(PAGE, parser="html.parser", only=[".views-row", "li.pager-item"])
+  assert [a['href'] for a in doc.find_all("a")] == ["?page=2", "/one", "/two"]
+
+  doc = utils.soup(PAGE, parser="html.parser", only='table[summary~="reports"]')
+  assert doc.get_text().strip() == "Three"
+
+def test_only_wants_simple_selectors():
+  with pytest.raises(ValueError):
+    parsing.strainer("div > p")
+  with pytest.raises(ValueError):
+    parsing.strainer(("#content", ".views-row"))
+
+def test_select_matches_bs4():
+  doc = utils.soup(PAGE, parser="html.parser")
+  for selector in ("li a", ".views-row a", 'table[summary~="reports"] td', "#nothing"):
+    assert utils.select(doc, selector) == doc.select(selector)
+    assert utils.select_one(doc, selector) == doc.select_one(selector)
@@ -0,0 +1,131 @@
+import requests
+
+from utils import response_cache, utils
+
+
+def response_for(body, status=200, content_type="text/html", url="http://oig.gov/page", headers=None):
+  response = requests.Response()
+  response._content = body
+  response.status_code = status
+  response.encoding = "utf-8"
+  response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+  response.headers['Content-Type'] = content_type
+  response.url = url
+  return response
+
+def test_keys():
+  key = response_cache.key_for("GET", "http://oig.gov/page", params={'page': 2})
+  assert key == response_cache.key_for("get", "http://oig.gov/page?page=2")
+  assert key != response_cache.key_for("GET", "http://oig.gov/page?page=3")
+
+  # form data is keyed the same whatever order it's given in
+  assert response_cache.key_for("POST", "http://oig.gov/", data={'a': 1, 'b': 2}) == \
+    response_cache.key_for("POST", "http://oig.gov/", data={'b': 2, 'a': 1})
+
+  assert response_cache.key_for("GET", "http://oig.gov/report.pdf", stream=True) is None
+  assert response_cache.key_for("DELETE", "http://oig.gov/page") is None
+
+def test_stores_and_returns_pages(tmp_path, clock):
+  cache = response_cache.ResponseCache(str(tmp_path))
+  cache.set("key", response_for(b"<p>hi</p>", headers={'ETag': '"1"', 'Content-Encoding': 'gzip'}))
+
+  clock.advance(30)
+  cached = cache.get("key")
+  assert cached.content == b"<p>hi</p>"
+  assert cached.status_code == 200
+  assert cached.age == 30
+  assert cached.headers['etag'] == '"1"'
+  assert 'content-encoding' not in cached.headers
+  assert cache.validators(cached) == {'If-None-Match': '"1"'}
+
+  cache.revalidated("key")
+  assert cache.get("key").age == 0
+
+def test_only_stores_successful_text(tmp_path):
+  cache = response_cache.ResponseCache(str(tmp_path))
+  cache.set("missing", response_for(b"nope", status=404))
+  cache.set("pdf", response_for(b"%PDF", content_type="application/pdf"))
+  assert cache.get("missing") is None
+  assert cache.get("pdf") is None
+  assert cache.get(None) is None
+
+def test_identical_bodies_are_stored_once(tmp_path):
+  cache = response_cache.ResponseCache(str(tmp_path))
+  cache.set("a", response_for(b"same"))
+  cache.set("b", response_for(b"same"))
+  assert cache.total_size() == 4
+
+def test_reuses_an_existing_cache(tmp_path):
+  response_cache.ResponseCache(str(tmp_path)).set("a", response_for(b"same"))
+
+  # a later run storing a body that's already there
+  cache = response_cache.ResponseCache(str(tmp_path))
+  cache.set("b", response_for(b"same"))
+  assert cache.size == 4
+
+def test_evicts_least_recently_used(tmp_path, clock):
+  cache = response_cache.ResponseCache(str(tmp_path))
+  cache.max_size = 25
+  for key in ("a", "b"):
+    cache.set(key, response_for(key.encode('utf-8') * 10))
+    clock.advance(1)
+  cache.get("a")
+  clock.advance(1)
+
+  cache.set("c", response_for(b"c" * 10))
+  assert cache.get("b") is None
+  assert cache.get("a") and cache.get("c")
+  assert cache.total_size() == 20
+
+
+def test_fresh_pages_come_from_the_cache(web, monkeypatch):
+  monkeypatch.setattr(utils, "cache_ttl", lambda: 60)
+  web.pages["/list"] = (200, {'Content-Type': 'text/html'}, b"<p>reports</p>")
+
+  assert utils.scraper.get(web.url("/list")).text == "<p>reports</p>"
+  assert utils.scraper.get(web.url("/list")).text == "<p>reports</p>"
+  assert len(web.requests) == 1
+
+def test_stale_pages_are_revalidated(web, monkeypatch):
+  monkeypatch.setattr(utils, "cache_ttl", lambda: 0)
+
+  def page(headers):
+    if headers.get('If-None-Match') == '"v1"':
+      return 304, {'ETag': '"v1"'}, b""
+    return 200, {'Content-Type': 'text/html', 'ETag': '"v1"'}, b"<p>reports</p>"
+  web.pages["/list"] = (200, {}, page)
+
+  utils.scraper.get(web.url("/list"))
+  response = utils.scraper.get(web.url("/list"))
+  assert response.status_code == 200
+  assert response.text == "<p>reports</p>"
+  assert web.requests[1][1]['If-None-Match'] == '"v1"'
+
+def test_saved_reports_arent_cached(web, tmp_path):
+  web.pages["/report.htm"] = (200, {'Content-Type': 'text/html'}, b"<p>the report</p>")
+
+  destination = str(tmp_path / "data" / "report.html")
+  assert utils.download(web.url("/report.htm"), destination) == "<p>the report</p>"
+  assert utils.http_cache.total_size() == 0
+
+
+def test_memo_drops_least_recently_used():
+  memo = response_cache.Memo(10)
+  memo.set("http://oig.gov/a", "aaaa")
+  memo.set("http://oig.gov/b", "bbbb")
+  assert memo.get("http://oig.gov/a") == "aaaa"
+  memo.set("http://oig.gov/c", "cccc")
+  assert memo.get("http://oig.gov/b") is None
+  assert memo.get("http://oig.gov/a") == "aaaa"
+  assert memo.stats() == ({'oig.gov': 2}, 1)
+
+  # pages bigger than the whole memo aren't kept
+  memo.set("http://oig.gov/big", "x" * 11)
+  assert memo.get("http://oig.gov/big") is None
+
+def test_pages_are_fetched_once_per_run(web, monkeypatch):
+  monkeypatch.setattr(utils, "cache_ttl", lambda: 0)
+  web.pages["/list"] = (200, {'Content-Type': 'text/html'}, b"<p>reports</p>")
+  assert utils.download(web.url("/list")) == "<p>reports</p>"
+  assert utils.download(web.url("/list")) == "<p>reports</p>"
+  assert len(web.requests) == 1
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from utils import utils
+
+REPORT = b"%PDF-1.4 " + (b"0123456789" * 1000)
+
+
+# a report served with an ETag, supporting Range and If-Range
+def report(etag='"v1"', body=REPORT):
+  def respond(headers):
+    requested = headers.get('Range')
+    if requested and headers.get('If-Range') == etag:
+      start = int(requested.split("=")[1].rstrip("-"))
+      if start >= len(body):
+        return 416, {'Content-Range': "bytes */%i" % len(body)}, b""
+      return 206, {'ETag': etag, 'Content-Range': "bytes %i-%i/%i" % (start, len(body) - 1, len(body))}, body[start:]
+    return 200, {'ETag': etag, 'Content-Type': 'application/pdf'}, body
+  return 200, {}, respond
+
+def partial(destination, url, body, validator='"v1"'):
+  with open(destination + ".part", 'wb') as f:
+    f.write(body)
+  with open(destination + ".part.json", 'w') as f:
+    json.dump({'url': url, 'validator': validator}, f)
+
+def contents(path):
+  with open(path, 'rb') as f:
+    return f.read()
+
+def leftovers(destination):
+  return [path for path in (destination + ".part", destination + ".part.json") if os.path.exists(path)]
+
+
+@pytest.fixture
+def destination(tmp_path):
+  return str(tmp_path / "report.pdf")
+
+def test_downloads_whole_file(web, destination):
+  web.pages["/report.pdf"] = report()
+  utils.retrieve(web.url("/report.pdf"), destination)
+  assert contents(destination) == REPORT
+  assert leftovers(destination) == []
+
+def test_resumes_partial_file(web, destination):
+  web.pages["/report.pdf"] = report()
+  partial(destination, web.url("/report.pdf"), REPORT[:4000])
+
+  utils.retrieve(web.url("/report.pdf"), destination)
+  assert web.requests[0][1]['Range'] == "bytes=4000-"
+  assert contents(destination) == REPORT
+  assert leftovers(destination) == []
+
+def test_starts_over_when_file_changed(web, destination):
+  web.pages["/report.pdf"] = report(etag='"v2"')
+  partial(destination, web.url("/report.pdf"), b"something else")
+
+  utils.retrieve(web.url("/report.pdf"), destination)
+  assert contents(destination) == REPORT
+
+def test_finishes_partial_file_that_was_complete(web, destination):
+  web.pages["/report.pdf"] = report()
+  partial(destination, web.url("/report.pdf"), REPORT)
+
+  utils.retrieve(web.url("/report.pdf"), destination)
+  assert len(web.requests) == 1
+  assert contents(destination) == REPORT
+  assert leftovers(destination) == []
+
+def test_starts_over_when_partial_file_cant_be_resumed(web, destination):
+  web.pages["/report.pdf"] = report()
+  partial(destination, web.url("/report.pdf"), REPORT + b"junk at the end")
+
+  utils.retrieve(web.url("/report.pdf"), destination)
+  assert len(web.requests) == 2
+  assert 'Range' not in web.requests[1][1]
+  assert contents(destination) == REPORT
+  assert leftovers(destination) == []
+
+def test_content_range_total():
+  assert utils.content_range_total("bytes 1000-4999/5000") == 5000
+  assert utils.content_range_total("bytes */5000") == 5000
+  assert utils.content_range_total("bytes 0-99/*") is None
+  assert utils.content_range_total(None) is None
@@ -0,0 +1,70 @@
+import pytest
+
+from utils import utils, search
+
+TEXTS = {
+  ("dhs", 2014, "sandy"): ("Hurricane Sandy recovery", "FEMA's response to Hurricane Sandy was audited."),
+  ("dhs", 2013, "katrina"): ("Katrina claims", "Claims paid after Hurricane Katrina, years later."),
+  ("hhs", 2014, "medicare"): ("Medicare billing", "Improper payments in Medicare billing audits."),
+}
+
+@pytest.fixture
+def index(workdir):
+  try:
+    utils.search_index().connection()
+  except search.FTSUnavailable:
+    pytest.skip("SQLite doesn't have FTS5")
+
+  for (inspector, year, report_id), (title, text) in TEXTS.items():
+    text_path = "%s/%i/%s/report.txt" % (inspector, year, report_id)
+    utils.write(text, "data/" + text_path)
+    report = {
+      'inspector': inspector, 'year': year, 'report_id': report_id, 'type': "audit", 'title': title,
+      'published_on': "%i-01-01" % year, 'text_path': text_path, 'extracted_with': {'source_hash': report_id},
+    }
+    utils.write(utils.json_for(report), "data/%s/%i/%s/report.json" % (inspector, year, report_id))
+    assert utils.search_index().index(report, utils.data_dir())
+  return utils.search_index()
+
+def ids(results):
+  return [result['report_id'] for result in results]
+
+def test_search(index):
+  assert sorted(ids(index.search("hurricane"))) == ["katrina", "sandy"]
+  assert ids(index.search('"hurricane sandy"')) == ["sandy"]
+  assert ids(index.search("hurricane", year=2013)) == ["katrina"]
+  assert ids(index.search("audit*", inspector="hhs")) == ["medicare"]
+  assert ids(index.search("hurricane NOT sandy")) == ["katrina"]
+  assert ids(index.search("nothing")) == []
+
+  result = index.search("fema")[0]
+  assert (result['inspector'], result['year'], result['title']) == ("dhs", 2014, "Hurricane Sandy recovery")
+  assert result['snippet'] == "[FEMA]'s response to Hurricane Sandy was audited."
+
+def test_reindexing_replaces(index):
+  report = {
+    'inspector': "dhs", 'year': 2014, 'report_id': "sandy", 'title': "Sandy", 'text_path': "dhs/2014/sandy/report.txt",
+    'extracted_with': {'source_hash': "sandy"},
+  }
+  assert index.is_indexed(report)
+  assert not index.is_indexed(dict(report, extracted_with={'source_hash': "changed"}))
+  assert not index.is_indexed(dict(report, year=2015))
+
+  utils.write("Now about flooding.", "data/dhs/2014/sandy/report.txt")
+  index.index(report, utils.data_dir())
+  assert index.count() == 3
+  assert ids(index.search("flooding")) == ["sandy"]
+  assert ids(index.search("fema")) == []
+
+def test_reports_without_text(index):
+  assert not index.index({'inspector': "dhs", 'year': 2014, 'report_id': "none"}, utils.data_dir())
+  assert not index.index({'inspector': "dhs", 'year': 2014, 'report_id': "gone", 'text_path': "dhs/2014/gone/report.txt"}, utils.data_dir())
+  assert index.count() == 3
+
+def test_rebuild(index, monkeypatch):
+  monkeypatch.setattr(search, "CHUNK_SIZE", 1)
+  assert index.rebuild(utils.data_dir(), jobs=1) == 3
+  assert sorted(ids(index.search("hurricane"))) == ["katrina", "sandy"]
+
+  assert index.rebuild(utils.data_dir(), ["hhs"], jobs=1) == 3
+  assert ids(index.search("medicare")) == ["medicare"]
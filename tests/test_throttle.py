@@ -0,0 +1,69 @@
+from utils import throttle
+
+
+def test_first_request_goes_right_away(clock):
+  bucket = throttle.TokenBucket(60)
+  assert bucket.reserve() == 0
+
+def test_requests_are_spaced_at_the_rate(clock):
+  bucket = throttle.TokenBucket(120)
+  assert bucket.reserve() == 0
+  assert bucket.reserve() == 0.5
+  # a third caller at the same moment is queued behind the second
+  assert bucket.reserve() == 1.0
+
+def test_tokens_refill_over_time(clock):
+  bucket = throttle.TokenBucket(60)
+  bucket.reserve()
+  assert bucket.delay() == 1.0
+  clock.advance(1)
+  assert bucket.delay() == 0
+  assert bucket.reserve() == 0
+
+def test_tokens_dont_pile_up_past_the_burst(clock):
+  bucket = throttle.TokenBucket(60)
+  clock.advance(600)
+  assert bucket.reserve() == 0
+  assert bucket.reserve() == 1.0
+
+def test_zero_rate_is_unlimited(clock):
+  bucket = throttle.TokenBucket(0)
+  for i in range(10):
+    assert bucket.reserve() == 0
+
+def test_hosts_have_their_own_buckets(clock):
+  host_throttle = throttle.HostThrottle({'default': 60, 'hosts': {'Slow.gov': 30}})
+  assert host_throttle.requests_per_minute("slow.gov") == 30
+  assert host_throttle.requests_per_minute("fast.gov") == 60
+
+  host_throttle.bucket_for("slow.gov").reserve()
+  assert host_throttle.current_wait("SLOW.gov") == 2.0
+  assert host_throttle.current_wait("fast.gov") == 0
+
+def test_host_for():
+  assert throttle.host_for("https://OIG.hhs.gov/reports?page=2") == "oig.hhs.gov"
+  assert throttle.host_for("not a url") == ""
+def test_hold_delays_and_then_spaces_requests(clock):
+  bucket = throttle.TokenBucket(60)
+  bucket.hold(10)
+  assert bucket.delay() == 10
+  assert bucket.reserve() == 10
+  assert bucket.reserve() == 11
+
+def test_retry_after_seconds(clock):
+  assert throttle.retry_after_seconds("120") == 120
+  assert throttle.retry_after_seconds(" 5 ") == 5
+  assert throttle.retry_after_seconds(None) is None
+  assert throttle.retry_after_seconds("soon") is None
+
+  clock.now = 784111777
+  assert throttle.retry_after_seconds("Sun, 06 Nov 1994 08:49:47 GMT") == 10
+  # dates in the past mean now
+  assert throttle.retry_after_seconds("Sun, 06 Nov 1994 08:49:27 GMT") == 0
+
+def test_long_holds_are_refused(clock):
+  host_throttle = throttle.HostThrottle({'max_retry_after': 300})
+  assert host_throttle.hold("http://oig.gov/", 300)
+  assert host_throttle.current_wait("oig.gov") == 300
+  assert not host_throttle.hold("http://other.gov/", 86400)
+  assert host_throttle.current_wait("other.gov") == 0
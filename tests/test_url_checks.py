@@ -0,0 +1,57 @@
+import threading
+
+from utils import url_checks
+
+
+def test_collects_bad_urls(tmp_path):
+  checked = []
+  def check(url):
+    checked.append(url)
+    if "bad" in url:
+      raise Exception("404")
+
+  checker = url_checks.URLChecker(str(tmp_path / "checks.sqlite"), check)
+  for url in ("http://oig.gov/good.pdf", "http://oig.gov/bad.pdf", "http://oig.gov/good.pdf"):
+    checker.queue(url)
+  bad = checker.finish()
+
+  assert sorted(checked) == ["http://oig.gov/bad.pdf", "http://oig.gov/good.pdf"]
+  assert [(url, str(exception)) for url, exception in bad] == [("http://oig.gov/bad.pdf", "404")]
+
+def test_remembers_good_urls(tmp_path, clock):
+  checked = []
+  path = str(tmp_path / "checks.sqlite")
+
+  checker = url_checks.URLChecker(path, checked.append, {'ttl': 60})
+  checker.queue("http://oig.gov/good.pdf")
+  checker.finish()
+
+  # a later run, within the TTL and then after it
+  checker = url_checks.URLChecker(path, checked.append, {'ttl': 60})
+  checker.queue("http://oig.gov/good.pdf")
+  checker.finish()
+  assert len(checked) == 1
+
+  clock.advance(61)
+  checker.queue("http://oig.gov/good.pdf")
+  checker.finish()
+  assert len(checked) == 2
+
+def test_limits_checks_per_host(tmp_path):
+  lock = threading.Lock()
+  in_flight = {'now': 0, 'most': 0}
+  release = threading.Event()
+
+  def check(url):
+    with lock:
+      in_flight['now'] += 1
+      in_flight['most'] = max(in_flight['most'], in_flight['now'])
+    release.wait(0.05)
+    with lock:
+      in_flight['now'] -= 1
+
+  checker = url_checks.URLChecker(str(tmp_path / "checks.sqlite"), check, {'per_host': 2})
+  for number in range(10):
+    checker.queue("http://oig.gov/%i.pdf" % number)
+  assert checker.finish() == []
+  assert in_flight['most'] == 2
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from utils import response_cache, utils, warc
+
+from test_retrieve import REPORT, report
+
+
+def replay(monkeypatch, directory):
+  monkeypatch.setattr(utils, "recorder", None)
+  monkeypatch.setattr(utils, "replayer", warc.Replayer(directory))
+
+def test_records_and_replays(web, monkeypatch, tmp_path):
+  directory = str(tmp_path / "warcs")
+  monkeypatch.setattr(utils, "recorder", warc.Recorder(directory, "test"))
+  web.pages["/list"] = (200, {'Content-Type': 'text/html'}, b"<p>reports</p>")
+  web.pages["/report.pdf"] = report()
+
+  assert utils.scraper.get(web.url("/list")).text == "<p>reports</p>"
+  utils.retrieve(web.url("/report.pdf"), str(tmp_path / "recorded.pdf"))
+  utils.recorder.close()
+
+  replay(monkeypatch, directory)
+  assert utils.scraper.get(web.url("/list")).text == "<p>reports</p>"
+  utils.retrieve(web.url("/report.pdf"), str(tmp_path / "replayed.pdf"))
+  with open(str(tmp_path / "replayed.pdf"), 'rb') as f:
+    assert f.read() == REPORT
+  assert len(web.requests) == 2
+
+  with pytest.raises(warc.ReplayMiss):
+    utils.scraper.get(web.url("/other"))
+
+def test_streamed_reports_are_recorded_as_read(web, monkeypatch, tmp_path):
+  directory = str(tmp_path / "warcs")
+  recorder = warc.Recorder(directory, "test")
+  web.pages["/report.pdf"] = report()
+
+  response = utils.scraper.request('GET', web.url("/report.pdf"), stream=True)
+  recorder.record('GET', web.url("/report.pdf"), {'stream': True}, response)
+  assert not response._content_consumed
+  assert b"".join(response.iter_content(1000)) == REPORT
+  recorder.close()
+
+  replayed = warc.Replayer(directory).response_for('GET', web.url("/report.pdf"), stream=True)
+  assert replayed.content == REPORT
+
+def test_ranges_are_replayed_separately(web, monkeypatch, tmp_path):
+  directory = str(tmp_path / "warcs")
+  monkeypatch.setattr(utils, "recorder", warc.Recorder(directory, "test"))
+  web.pages["/report.pdf"] = report()
+
+  # a download resumed from byte 4000
+  destination = str(tmp_path / "recorded.pdf")
+  with open(destination + ".part", 'wb') as f:
+    f.write(REPORT[:4000])
+  with open(destination + ".part.json", 'w') as f:
+    json.dump({'url': web.url("/report.pdf"), 'validator': '"v1"'}, f)
+  utils.retrieve(web.url("/report.pdf"), destination)
+  utils.recorder.close()
+
+  replayer = warc.Replayer(directory)
+  ranged = replayer.response_for('GET', web.url("/report.pdf"), headers={'Range': "bytes=4000-", 'If-Range': '"v1"'})
+  assert ranged.status_code == 206
+  assert ranged.content == REPORT[4000:]
+  with pytest.raises(warc.ReplayMiss):
+    replayer.response_for('GET', web.url("/report.pdf"))
+
+def test_range_is_part_of_the_key():
+  whole = response_cache.request_key("GET", "http://oig.gov/report.pdf")
+  part = response_cache.request_key("GET", "http://oig.gov/report.pdf", headers={'Range': "bytes=10-"})
+  assert whole != part
+  assert whole == response_cache.request_key("GET", "http://oig.gov/report.pdf", headers={'Accept': "*/*"})
@@ -0,0 +1,84 @@
+import os
+import threading
+
+from utils import workers
+
+
+def pid_and(value):
+  return os.getpid(), value
+
+
+def test_callbacks_run_in_the_queueing_thread():
+  pool = workers.WorkerPool(2)
+  results = []
+  def callback(result):
+    results.append((threading.get_ident(), result))
+
+  for value in range(6):
+    pool.queue(pid_and, value, callback)
+  assert pool.finish() == []
+
+  assert [result[1] for thread, result in results] == list(range(6))
+  assert set(thread for thread, result in results) == {threading.get_ident()}
+  assert os.getpid() not in set(result[0] for thread, result in results)
+
+def test_finished_jobs_are_collected_when_more_are_queued():
+  pool = workers.WorkerPool(1)
+  results = []
+  pool.queue(pid_and, 1, results.append)
+  pool.pending[0][0].result()
+  pool.queue(pid_and, 2, results.append)
+  assert [value for pid, value in results] == [1]
+  pool.finish()
+  assert [value for pid, value in results] == [1, 2]
+
+def test_workers_are_not_forked():
+  pool = workers.WorkerPool(1)
+  pool.queue(pid_and, 1, lambda result: None)
+  assert pool.executor._mp_context.get_start_method() in ("forkserver", "spawn")
+  pool.finish()
+
+def test_failures():
+  pool = workers.WorkerPool(1)
+  pool.queue(int, "one", lambda result: None)
+  def bad_callback(result):
+    raise ValueError("callback")
+  pool.queue(int, "2", bad_callback)
+
+  failed = pool.finish()
+  assert [argument for argument, exception in failed] == ["one", "2"]
+  assert all(isinstance(exception, ValueError) for argument, exception in failed)
+  assert pool.finish() == []
+
+def test_inline():
+  pool = workers.WorkerPool(0)
+  results = []
+  pool.queue(pid_and, 1, results.append)
+  assert results == [(os.getpid(), 1)]
+  assert pool.executor is None
+  pool.queue(int, "one", results.append)
+  assert [argument for argument, exception in pool.finish()] == ["one"]
+
+
+# a report extracted in a worker process is written again, with its
+# text, from the scraper's thread
+def test_save_report_extracts_in_a_worker(web, monkeypatch):
+  from utils import utils, inspector
+  monkeypatch.setattr(utils, "extraction_pool", workers.WorkerPool(1))
+  written = []
+  write_report = inspector.write_report
+  def record_write(report):
+    written.append((threading.get_ident(), report.get('text_path')))
+    return write_report(report)
+  monkeypatch.setattr(inspector, "write_report", record_write)
+
+  web.pages["/report.html"] = (200, {'Content-Type': 'text/html'}, b"<html><body><p>Findings</p></body></html>")
+  assert inspector.save_report({
+    'inspector': "test", 'inspector_url': "https://oig.example.gov/", 'agency': "test", 'agency_name': "Test",
+    'report_id': "report-1", 'title': "A report", 'published_on': "2014-05-06", 'url': web.url("/report.html"),
+  })
+  assert utils.extraction_pool.finish() == []
+
+  assert written == [(threading.get_ident(), None), (threading.get_ident(), "test/2014/report-1/report.txt")]
+  with open("data/test/2014/report-1/report.txt") as text:
+    assert "Findings" in text.read()